@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Frontend/Backend Mode Benchmark
+
+Measures p50/p95/p99 latency and throughput of requests served by the frontend
+(pages/App.py) in both backend modes:
+
+    http       - the backend runs in its own uvicorn process (two-process deployment)
+    inprocess  - the backend FastAPI app is called in-process through httpx.ASGITransport
+
+The frontend app is driven in-process, so the numbers isolate the cost of the hop
+between frontend and backend. The database configured in .env is used; pass a valid
+session cookie (and a selected company for /api/funcionarios).
+
+Usage:
+    python benchmarks/backend_modes_benchmark.py --session <portal_grs_session> --company <empresa_id>
+    python benchmarks/backend_modes_benchmark.py --session ... --requests 2000 --concurrency 20
+    python benchmarks/backend_modes_benchmark.py --session ... --no-start-backend   # use a running backend
+"""
+
+import os
+import sys
+import time
+import asyncio
+import argparse
+import statistics
+import subprocess
+import importlib.util
+from pathlib import Path
+from urllib.parse import urlparse
+
+import httpx
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+FRONTEND_FILE = ROOT_DIR / "pages" / "App.py"
+
+DEFAULT_PATHS = [
+    "/api/user-profile",
+    "/api/user/companies",
+    "/api/funcionarios?page=1&limit=10",
+    "/dashboard",
+]
+
+def load_frontend():
+    spec = importlib.util.spec_from_file_location("portal_frontend", FRONTEND_FILE)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def start_backend(backend_url):
+    port = str(urlparse(backend_url).port or 8001)
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "App:app", "--port", port, "--log-level", "warning"],
+        cwd=ROOT_DIR / "src",
+    )
+    # Espera o backend aceitar conexões
+    for _ in range(100):
+        try:
+            httpx.get(f"{backend_url}/", timeout=0.5)
+            return process
+        except httpx.TransportError:
+            time.sleep(0.1)
+    process.terminate()
+    raise RuntimeError(f"Backend did not start at {backend_url}")
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+async def run_mode(frontend, mode, paths, total_requests, concurrency, cookies):
+    # O lifespan do frontend cria o cliente do backend conforme BACKEND_MODE e, no modo
+    # in-process, também executa o lifespan do backend (o ASGITransport não o executa)
+    frontend.BACKEND_MODE = mode
+    frontend.backend_client = None
+    frontend.auth_cache.clear()
+
+    latencies = {path: [] for path in paths}
+    errors = 0
+    transport = httpx.ASGITransport(app=frontend.app)
+
+    async with frontend.app.router.lifespan_context(frontend.app), \
+            httpx.AsyncClient(transport=transport, base_url="http://frontend", cookies=cookies) as client:
+        # Aquecimento: conexões, caches de template e de autenticação
+        for path in paths:
+            await client.get(path)
+
+        queue = asyncio.Queue()
+        for i in range(total_requests):
+            queue.put_nowait(paths[i % len(paths)])
+
+        async def worker():
+            nonlocal errors
+            while not queue.empty():
+                path = queue.get_nowait()
+                start = time.perf_counter()
+                response = await client.get(path)
+                await response.aread()
+                latencies[path].append(time.perf_counter() - start)
+                if response.status_code >= 400:
+                    errors += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    return latencies, errors, elapsed
+
+def report(mode, latencies, errors, elapsed, total_requests):
+    print(f"\n== {mode}: {total_requests / elapsed:.1f} req/s, {errors} errors")
+    print(f"{'path':<40} {'p50 (ms)':>10} {'p95 (ms)':>10} {'p99 (ms)':>10}")
+    every = []
+    for path, values in latencies.items():
+        every.extend(values)
+        print(f"{path:<40} {statistics.median(values) * 1000:>10.2f} "
+              f"{percentile(values, 95) * 1000:>10.2f} {percentile(values, 99) * 1000:>10.2f}")
+    print(f"{'(all)':<40} {statistics.median(every) * 1000:>10.2f} "
+          f"{percentile(every, 95) * 1000:>10.2f} {percentile(every, 99) * 1000:>10.2f}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare http and in-process backend modes")
+    parser.add_argument("--session", default=os.getenv("BENCH_SESSION"), help="portal_grs_session cookie value")
+    parser.add_argument("--company", default=os.getenv("BENCH_COMPANY"), help="selected_company cookie value")
+    parser.add_argument("--requests", type=int, default=1000, help="Requests per mode")
+    parser.add_argument("--concurrency", type=int, default=10, help="Concurrent clients")
+    parser.add_argument("--paths", nargs="+", default=DEFAULT_PATHS, help="Frontend paths to request")
+    parser.add_argument("--modes", nargs="+", default=["http", "inprocess"], choices=["http", "inprocess"])
+    parser.add_argument("--no-start-backend", action="store_true", help="Use a backend already running at BACKEND_API_URL")
+    args = parser.parse_args()
+
+    if not args.session:
+        parser.error("--session (or BENCH_SESSION) is required")
+
+    cookies = {"portal_grs_session": args.session}
+    if args.company:
+        cookies["selected_company"] = args.company
+
+    frontend = load_frontend()
+    backend_process = None
+    try:
+        if "http" in args.modes and not args.no_start_backend:
+            backend_process = start_backend(frontend.BACKEND_API_URL)
+
+        for mode in args.modes:
+            latencies, errors, elapsed = asyncio.run(
+                run_mode(frontend, mode, args.paths, args.requests, args.concurrency, cookies)
+            )
+            report(mode, latencies, errors, elapsed, args.requests)
+    finally:
+        if backend_process is not None:
+            backend_process.terminate()
+            backend_process.wait()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Employee Detail Latency Budget
+
+Seeds one company with one employee per history size (--sizes exams each, half as many
+certificates) in the database configured in .env (EXTERNAL_URL_DB) and calls
+GET /api/funcionarios/{id}/completo and the first and last pages of
+GET /api/funcionarios/{id}/linha-do-tempo in-process. For every size it reports the SQL
+statements per request and p50/p95/p99 latency, and fails (exit 1) when:
+
+    - the number of statements changes with the history size or the timeline page
+      (a lazy load or N+1 crept in)
+    - p95 goes over --budget-ms (the last timeline page must cost as much as the first)
+
+The seeded rows (company code BENCH_CODIGO_EMPRESA, user BENCH_EMAIL) are removed at the end.
+
+Usage:
+    python benchmarks/detalhe_funcionario_benchmark.py
+    python benchmarks/detalhe_funcionario_benchmark.py --sizes 10 500 2000 --requests 300 --budget-ms 30
+"""
+
+import sys
+import time
+import uuid
+import random
+import argparse
+import statistics
+from datetime import date, timedelta
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+sys.path.insert(0, str(ROOT_DIR / "src"))
+
+from sqlalchemy import event, insert, delete
+
+BENCH_CODIGO_EMPRESA = 8999001
+BENCH_EMAIL = "detalhe-benchmark@loadtest.example.com"
+DEFAULT_SIZES = [10, 100, 1000]
+
+PERCENTIS = (50, 95, 99)
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+def limpar(conn, modelos):
+    Usuario, Empresa, Funcionario, Exame, Atestado = modelos
+    for modelo in (Exame, Atestado, Funcionario):
+        conn.execute(delete(modelo).where(modelo.codigo_empresa == BENCH_CODIGO_EMPRESA))
+    conn.execute(delete(Empresa).where(Empresa.codigo == BENCH_CODIGO_EMPRESA))
+    conn.execute(delete(Usuario).where(Usuario.email == BENCH_EMAIL))
+
+def semear(engine, modelos, tamanhos, rng):
+    """
+    Returns:
+        (id da empresa, {tamanho: id do funcionário})
+    """
+    Usuario, Empresa, Funcionario, Exame, Atestado = modelos
+    empresa_id = uuid.uuid4()
+    funcionarios = {}
+    hoje = date.today()
+
+    with engine.begin() as conn:
+        limpar(conn, modelos)
+        conn.execute(insert(Usuario), [{
+            "id": uuid.uuid4(), "nome": "Detalhe Benchmark", "email": BENCH_EMAIL,
+            "senha": "-", "type_user": "admin", "active": True,
+        }])
+        conn.execute(insert(Empresa), [{
+            "id": empresa_id, "codigo": BENCH_CODIGO_EMPRESA, "nome_abreviado": "BENCH DETALHE",
+            "razao_social": "Benchmark Detalhe Funcionario", "ativo": True,
+        }])
+
+        for indice, tamanho in enumerate(tamanhos):
+            funcionario_id = uuid.uuid4()
+            funcionarios[tamanho] = funcionario_id
+            conn.execute(insert(Funcionario), [{
+                "id": funcionario_id, "empresa_id": empresa_id, "codigo_empresa": BENCH_CODIGO_EMPRESA,
+                "codigo": indice + 1, "nome": f"FUNCIONARIO {tamanho}", "cpf": f"{indice + 1:011d}",
+                "situacao": "Ativo", "data_admissao": hoje - timedelta(days=3650),
+            }])
+            conn.execute(insert(Exame), [{
+                "id": uuid.uuid4(), "funcionario_id": funcionario_id, "codigo_empresa": BENCH_CODIGO_EMPRESA,
+                "codigo_funcionario": indice + 1, "codigo_exame": str(rng.randint(1, 80)),
+                "exame": f"EXAME {i % 80}", "ultimo_pedido": hoje - timedelta(days=rng.randint(0, 3650)),
+                "data_resultado": hoje - timedelta(days=rng.randint(0, 3650)), "periodicidade": "12",
+            } for i in range(tamanho)])
+            atestados = [{
+                "id": uuid.uuid4(), "funcionario_id": funcionario_id, "codigo_empresa": BENCH_CODIGO_EMPRESA,
+                "tipo_atestado": rng.randint(1, 5), "dt_inicio_atestado": hoje - timedelta(days=rng.randint(0, 3650)),
+                "dias_afastados": rng.randint(1, 15), "cid_principal": f"M{rng.randint(10, 99)}",
+            } for _ in range(tamanho // 2)]
+            if atestados:
+                conn.execute(insert(Atestado), atestados)
+
+    return empresa_id, funcionarios
+
+def main():
+    parser = argparse.ArgumentParser(description="Latency budget for the employee detail and timeline endpoints")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Exams per seeded employee (certificates: half)")
+    parser.add_argument("--requests", type=int, default=200, help="Measured requests per size")
+    parser.add_argument("--warmup", type=int, default=20, help="Unmeasured requests per size")
+    parser.add_argument("--page-size", type=int, default=20, help="exames_limit/atestados_limit")
+    parser.add_argument("--budget-ms", type=float, default=50.0, help="Maximum p95 latency per size")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    from fastapi.testclient import TestClient
+
+    import App
+    from database.Base import Base
+    from database.Engine import engine
+    from models.all_models import Usuario, Empresa, Funcionario, Exame, Atestado
+    from src.autenticacao.Login import create_access_token, COOKIE_NAME
+
+    modelos = (Usuario, Empresa, Funcionario, Exame, Atestado)
+    if engine.dialect.name == "sqlite":
+        Base.metadata.create_all(engine)
+
+    print(f"Seeding {len(args.sizes)} employees ({', '.join(map(str, args.sizes))} exams)...")
+    empresa_id, funcionarios = semear(engine, modelos, args.sizes, random.Random(args.seed))
+
+    consultas = [0]
+    def contar(*_):
+        consultas[0] += 1
+    event.listen(engine, "before_cursor_execute", contar)
+
+    client = TestClient(App.app)
+    client.cookies.set(COOKIE_NAME, create_access_token({"sub": BENCH_EMAIL}, timedelta(minutes=30)))
+    client.cookies.set("selected_company", str(empresa_id))
+    params = {"exames_limit": args.page_size, "atestados_limit": args.page_size}
+
+    def medir(url, parametros):
+        for _ in range(args.warmup):
+            client.get(url, params=parametros)
+
+        duracoes, por_requisicao = [], []
+        for _ in range(args.requests):
+            antes = consultas[0]
+            inicio = time.perf_counter()
+            response = client.get(url, params=parametros)
+            duracoes.append((time.perf_counter() - inicio) * 1000)
+            por_requisicao.append(consultas[0] - antes)
+            if response.status_code != 200:
+                raise RuntimeError(f"{url} returned {response.status_code}: {response.text[:200]}")
+        # Mínimo: o estado estável, sem recargas ocasionais dos caches de acesso/versão
+        return response.json(), min(por_requisicao), [percentile(duracoes, p) for p in PERCENTIS] + [statistics.mean(duracoes)]
+
+    falhas = []
+    resultados = []
+    try:
+        for tamanho in args.sizes:
+            base = f"/api/funcionarios/{funcionarios[tamanho]}"
+
+            corpo, n_consultas, tempos = medir(f"{base}/completo", params)
+            resultados.append(("completo", tamanho, n_consultas, tempos))
+            if corpo["exames"]["total"] != tamanho or corpo["atestados"]["total"] != tamanho // 2:
+                falhas.append(f"completo size {tamanho}: totals {corpo['exames']['total']}/{corpo['atestados']['total']}")
+
+            _, n_consultas, tempos = medir(f"{base}/linha-do-tempo", {"limit": args.page_size})
+            resultados.append(("timeline p1", tamanho, n_consultas, tempos))
+
+            # Percorre a linha do tempo até a última página: ela deve custar o mesmo que a primeira
+            cursor, itens = None, 0
+            while True:
+                corpo = client.get(f"{base}/linha-do-tempo", params={"limit": args.page_size, **({"cursor": cursor} if cursor else {})}).json()
+                itens += len(corpo["items"])
+                if not corpo["next_cursor"]:
+                    break
+                cursor = corpo["next_cursor"]
+            if itens != tamanho + tamanho // 2:
+                falhas.append(f"timeline size {tamanho}: {itens} items")
+            if cursor:
+                _, n_consultas, tempos = medir(f"{base}/linha-do-tempo", {"limit": args.page_size, "cursor": cursor})
+                resultados.append(("timeline last", tamanho, n_consultas, tempos))
+    finally:
+        event.remove(engine, "before_cursor_execute", contar)
+        with engine.begin() as conn:
+            limpar(conn, modelos)
+
+    print(f"\n{'endpoint':<14} {'exams':>8} {'queries':>8} " + " ".join(f"{f'p{p} ms':>9}" for p in PERCENTIS) + f" {'mean ms':>9}")
+    for endpoint, tamanho, n_consultas, tempos in resultados:
+        print(f"{endpoint:<14} {tamanho:>8} {n_consultas:>8} " + " ".join(f"{t:>9.2f}" for t in tempos))
+        if tempos[PERCENTIS.index(95)] > args.budget_ms:
+            falhas.append(f"{endpoint} size {tamanho}: p95 {tempos[PERCENTIS.index(95)]:.2f} ms > budget {args.budget_ms} ms")
+
+    for grupo in ("completo", "timeline"):
+        if len({n_consultas for endpoint, _, n_consultas, _ in resultados if endpoint.startswith(grupo)}) > 1:
+            falhas.append(f"{grupo}: statements per request change with the history size or the page")
+
+    if falhas:
+        print("\nFAILED:\n  " + "\n  ".join(falhas))
+        sys.exit(1)
+    print(f"\nOK: constant statements per request, p95 within {args.budget_ms} ms")
+
+if __name__ == "__main__":
+    main()
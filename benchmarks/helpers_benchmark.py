@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+"""
+Hot Helper Micro-Benchmarks
+
+Times the helpers that run once per imported record or once per request, over
+synthetic inputs of several sizes:
+
+    import     - parse_date, parse_int, map_employee_to_db_schema and map_api_to_db_schema
+                 (jobs/ImportarFuncionarios.py), map_api_to_db_schema (jobs/ImportarEmpresas.py)
+    access     - verificar_acesso_empresa and filtrar_empresas_usuario (src/utils/acesso_empresas.py)
+                 against an in-memory database (or --database-url) with users linked to many companies
+
+Like pytest-benchmark, each case is calibrated so a round lasts at least --min-time,
+runs --rounds rounds and reports min/median/mean/stddev per call. Results can be saved
+as a baseline and later runs compared against it; --compare exits with status 1 when
+any case's median is more than --threshold slower than the baseline, so the script can
+gate CI. Baselines are machine-specific: save them on the same runner that compares.
+
+Usage:
+    python benchmarks/helpers_benchmark.py
+    python benchmarks/helpers_benchmark.py --save benchmarks/baselines/helpers.json
+    python benchmarks/helpers_benchmark.py --compare benchmarks/baselines/helpers.json --threshold 0.15
+    python benchmarks/helpers_benchmark.py --filter parse_ --sizes 100 10000
+"""
+
+import os
+import sys
+import json
+import time
+import uuid
+import random
+import logging
+import argparse
+import platform
+import statistics
+import importlib
+from datetime import date, timedelta
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.append(str(ROOT_DIR))
+
+from sqlalchemy import create_engine, insert, delete
+from sqlalchemy.orm import sessionmaker
+
+from database.Base import Base
+from models.all_models import Usuario, Empresa, UsuarioEmpresa
+from src.utils.acesso_empresas import verificar_acesso_empresa, filtrar_empresas_usuario
+
+DEFAULT_SIZES = [100, 1000, 10000]
+
+def carregar_job(nome):
+    # Os jobs leem argparse, configuram logging e resolvem a URL do banco ao serem importados;
+    # os helpers medidos não acessam o banco
+    os.environ.setdefault("DATABASE_URL", "sqlite://")
+    argv = sys.argv
+    sys.argv = [nome]
+    try:
+        modulo = importlib.import_module(f"jobs.{nome}")
+    finally:
+        sys.argv = argv
+    # O "Processed N ..." de cada chamada distorceria a medição
+    modulo.logger.setLevel(logging.WARNING)
+    return modulo
+
+def gerar_funcionarios_api(rng, quantidade):
+    """
+    Registros no formato devolvido pela exportação de funcionários do SOC.
+    """
+    base = date(2000, 1, 1)
+    registros = []
+    for i in range(quantidade):
+        registros.append({
+            "NOMEEMPRESA": "EMPRESA EXEMPLO LTDA",
+            "CODIGO": str(i),
+            "NOME": f"FUNCIONARIO {i:06d}",
+            "CODIGOUNIDADE": str(i % 20),
+            "NOMEUNIDADE": "UNIDADE CENTRAL",
+            "CODIGOSETOR": str(i % 40),
+            "NOMESETOR": "ADMINISTRATIVO",
+            "CODIGOCARGO": str(i % 60),
+            "NOMECARGO": "ANALISTA",
+            "CBOCARGO": "252105",
+            "MATRICULAFUNCIONARIO": f"M{i:08d}",
+            "CPF": f"{i:011d}",
+            "RG": f"{i:09d}",
+            "SITUACAO": rng.choice(["Ativo", "Ativo", "Ativo", "Inativo", "Afastado"]),
+            "SEXO": rng.choice(["1", "2", ""]),
+            "ESTADOCIVIL": rng.choice(["1", "2", "3", None]),
+            "TIPOCONTATACAO": "1",
+            "DATA_NASCIMENTO": (base - timedelta(days=rng.randint(0, 15000))).strftime("%d/%m/%Y"),
+            "DATA_ADMISSAO": (base + timedelta(days=rng.randint(0, 9000))).strftime("%d/%m/%Y"),
+            "DATA_DEMISSAO": rng.choice(["", "", "", (base + timedelta(days=rng.randint(0, 9000))).strftime("%d/%m/%Y")]),
+            "ENDERECO": "RUA EXEMPLO",
+            "NUMERO_ENDERECO": str(i % 1000),
+            "BAIRRO": "CENTRO",
+            "CIDADE": "SAO PAULO",
+            "UF": "SP",
+            "CEP": "01000000",
+            "EMAIL": f"funcionario{i}@example.com",
+            "DEFICIENTE": rng.choice(["N", "N", "S"]),
+            "DATAULTALTERACAO": (base + timedelta(days=rng.randint(0, 9000))).strftime("%Y-%m-%d"),
+            "COR": rng.choice(["1", "2", "3", "null"]),
+            "ESCOLARIDADE": rng.choice(["1", "5", "7", ""]),
+            "REGIMEREVEZAMENTO": "0",
+            "TURNOTRABALHO": rng.choice(["1", "2", "3"]),
+        })
+    return registros
+
+def gerar_empresas_api(rng, quantidade):
+    return [{
+        "CODIGO": str(100000 + i),
+        "NOMEABREVIADO": f"EMPRESA {i}",
+        "RAZAOSOCIALINICIAL": f"EMPRESA {i} LTDA",
+        "RAZAOSOCIAL": f"EMPRESA {i} LTDA",
+        "ENDERECO": "RUA EXEMPLO",
+        "NUMEROENDERECO": str(i % 1000),
+        "BAIRRO": "CENTRO",
+        "CIDADE": "SAO PAULO",
+        "CEP": "01000000",
+        "UF": "SP",
+        "CNPJ": f"{i:014d}",
+        "ATIVO": rng.choice(["1", "1", "1", "0"]),
+    } for i in range(quantidade)]
+
+def gerar_datas(rng, quantidade):
+    # Mistura de formatos como vem da API: dd/mm/aaaa, aaaa-mm-dd, vazios e inválidos
+    formatos = ["%d/%m/%Y", "%d/%m/%Y", "%Y-%m-%d"]
+    valores = []
+    for _ in range(quantidade):
+        sorteio = rng.random()
+        if sorteio < 0.1:
+            valores.append(rng.choice(["", None, "None", "null"]))
+        elif sorteio < 0.12:
+            valores.append("31/02/2020")
+        else:
+            valores.append((date(1970, 1, 1) + timedelta(days=rng.randint(0, 20000))).strftime(rng.choice(formatos)))
+    return valores
+
+def gerar_inteiros(rng, quantidade):
+    return [rng.choice([str(rng.randint(0, 99999)), "", None, "null", "abc", rng.randint(0, 9)]) for _ in range(quantidade)]
+
+class BaseAcesso:
+    """
+    Banco com usuários vinculados a `tamanho` empresas (e vínculos de outros usuários ao redor),
+    para medir as checagens de acesso feitas a cada requisição.
+    """
+    def __init__(self, database_url, tamanho, rng):
+        self.engine = create_engine(database_url)
+        Base.metadata.create_all(self.engine, tables=[Usuario.__table__, Empresa.__table__, UsuarioEmpresa.__table__])
+        self.db = sessionmaker(bind=self.engine)()
+
+        empresas = [{
+            "id": uuid.UUID(int=rng.getrandbits(128), version=4),
+            "codigo": 800000000 + tamanho * 10 + i,
+            "nome_abreviado": f"E{i}",
+            "razao_social": f"Empresa {i}",
+            "ativo": True,
+        } for i in range(tamanho * 2)]
+
+        def usuario(tipo):
+            return {
+                "id": uuid.UUID(int=rng.getrandbits(128), version=4),
+                "nome": tipo,
+                "email": f"{tipo}-{tamanho}-{uuid.uuid4().hex[:8]}@benchmark.example.com",
+                "senha": "x",
+                "type_user": tipo,
+                "active": True,
+            }
+
+        linhas_usuarios = [usuario("user"), usuario("admin")] + [usuario("outro") for _ in range(10)]
+        vinculos = [{"usuario_id": linhas_usuarios[0]["id"], "empresa_id": e["id"]} for e in empresas[:tamanho]]
+        for outro in linhas_usuarios[2:]:
+            vinculos.extend({"usuario_id": outro["id"], "empresa_id": e["id"]} for e in rng.sample(empresas, tamanho))
+
+        with self.engine.begin() as conn:
+            conn.execute(insert(Usuario.__table__), linhas_usuarios)
+            conn.execute(insert(Empresa.__table__), empresas)
+            conn.execute(insert(UsuarioEmpresa.__table__), vinculos)
+
+        self.ids_usuarios = [u["id"] for u in linhas_usuarios]
+        self.ids_empresas = [e["id"] for e in empresas]
+        self.usuario = self.db.get(Usuario, linhas_usuarios[0]["id"])
+        self.admin = self.db.get(Usuario, linhas_usuarios[1]["id"])
+        self.empresas = self.db.query(Empresa).filter(Empresa.id.in_([e["id"] for e in empresas])).all()
+        self.empresa_com_acesso = empresas[0]["id"]
+        self.empresa_sem_acesso = empresas[-1]["id"]
+
+    def fechar(self):
+        # Com --database-url apontando para um banco real, remove o que foi criado
+        self.db.close()
+        with self.engine.begin() as conn:
+            conn.execute(delete(UsuarioEmpresa.__table__).where(UsuarioEmpresa.usuario_id.in_(self.ids_usuarios)))
+            conn.execute(delete(Empresa.__table__).where(Empresa.id.in_(self.ids_empresas)))
+            conn.execute(delete(Usuario.__table__).where(Usuario.id.in_(self.ids_usuarios)))
+        self.engine.dispose()
+
+def montar_casos(args):
+    """
+    Returns:
+        Lista de (nome, tamanho, função sem argumentos, itens processados por chamada, finalizador)
+    """
+    rng = random.Random(args.seed)
+    funcionarios = carregar_job("ImportarFuncionarios")
+    empresas_job = carregar_job("ImportarEmpresas")
+    company_id = str(uuid.uuid4())
+
+    casos = []
+    for tamanho in args.sizes:
+        datas = gerar_datas(rng, tamanho)
+        inteiros = gerar_inteiros(rng, tamanho)
+        registros = gerar_funcionarios_api(rng, tamanho)
+        registros_empresas = gerar_empresas_api(rng, tamanho)
+
+        casos.extend([
+            ("parse_date", tamanho, lambda v=datas: [funcionarios.parse_date(d) for d in v], tamanho, None),
+            ("parse_int", tamanho, lambda v=inteiros: [funcionarios.parse_int(i) for i in v], tamanho, None),
+            ("map_employee_to_db_schema", tamanho,
+             lambda v=registros: [funcionarios.map_employee_to_db_schema(r, company_id, "1001") for r in v], tamanho, None),
+            ("funcionarios.map_api_to_db_schema", tamanho,
+             lambda v=registros: funcionarios.map_api_to_db_schema({"data": v}, company_id, "1001"), tamanho, None),
+            ("empresas.map_api_to_db_schema", tamanho,
+             lambda v=registros_empresas: empresas_job.map_api_to_db_schema(v), tamanho, None),
+        ])
+
+    # Checagens de acesso: custo por chamada, com usuários vinculados a N empresas
+    for tamanho in args.access_sizes:
+        base = BaseAcesso(args.database_url, tamanho, rng)
+        casos.extend([
+            ("verificar_acesso_empresa[admin]", tamanho,
+             lambda b=base: verificar_acesso_empresa(b.admin, b.empresa_com_acesso, b.db), 1, None),
+            ("verificar_acesso_empresa[permitido]", tamanho,
+             lambda b=base: verificar_acesso_empresa(b.usuario, b.empresa_com_acesso, b.db), 1, None),
+            ("verificar_acesso_empresa[negado]", tamanho,
+             lambda b=base: verificar_acesso_empresa(b.usuario, b.empresa_sem_acesso, b.db, throw_exception=False), 1, None),
+            ("filtrar_empresas_usuario", tamanho,
+             lambda b=base: filtrar_empresas_usuario(b.usuario, b.empresas, b.db), len(base.empresas), base.fechar),
+        ])
+    return casos
+
+def calibrar(funcao, min_time):
+    """
+    Chamadas por round para que cada round dure pelo menos min_time (como o pytest-benchmark).
+    """
+    chamadas = 1
+    while True:
+        inicio = time.perf_counter()
+        for _ in range(chamadas):
+            funcao()
+        if time.perf_counter() - inicio >= min_time or chamadas >= 1_000_000:
+            return chamadas
+        chamadas *= 2 if chamadas < 16 else 4
+
+def medir(funcao, args):
+    for _ in range(args.warmup):
+        funcao()
+    chamadas = calibrar(funcao, args.min_time)
+    tempos = []
+    for _ in range(args.rounds):
+        inicio = time.perf_counter()
+        for _ in range(chamadas):
+            funcao()
+        tempos.append((time.perf_counter() - inicio) / chamadas)
+    return {
+        "min_us": round(min(tempos) * 1e6, 3),
+        "median_us": round(statistics.median(tempos) * 1e6, 3),
+        "mean_us": round(statistics.fmean(tempos) * 1e6, 3),
+        "stddev_us": round(statistics.stdev(tempos) * 1e6, 3) if len(tempos) > 1 else 0.0,
+        "rounds": args.rounds,
+        "calls_per_round": chamadas,
+    }
+
+def chave(nome, tamanho):
+    return f"{nome}[{tamanho}]"
+
+def comparar(resultados, baseline, threshold, filtro=None):
+    """
+    Returns:
+        Lista de casos cuja mediana piorou mais que o threshold
+    """
+    anteriores = baseline["results"]
+    regressoes = []
+    print(f"\n== Comparison with baseline ({baseline.get('python')}, {baseline.get('machine')}), threshold {threshold:.0%}")
+    print(f"{'case':<48} {'base (us)':>12} {'now (us)':>12} {'delta':>8}")
+    for caso, dados in resultados.items():
+        anterior = anteriores.get(caso)
+        if anterior is None:
+            print(f"{caso:<48} {'-':>12} {dados['median_us']:>12.2f}      new")
+            continue
+        delta = (dados["median_us"] - anterior["median_us"]) / anterior["median_us"]
+        marca = "  REGRESSION" if delta > threshold else ""
+        print(f"{caso:<48} {anterior['median_us']:>12.2f} {dados['median_us']:>12.2f} {delta:>+7.1%}{marca}")
+        if delta > threshold:
+            regressoes.append(caso)
+    for caso in sorted(c for c in set(anteriores) - set(resultados) if not filtro or filtro in c):
+        print(f"{caso:<48} {anteriores[caso]['median_us']:>12.2f} {'-':>12}  missing")
+    return regressoes
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmark the import and access-control helpers")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Input sizes for the import helpers")
+    parser.add_argument("--access-sizes", type=int, nargs="+", default=[10, 100, 1000], help="Companies linked to the user in the access benchmarks")
+    parser.add_argument("--database-url", default="sqlite://", help="Database for the access benchmarks (default: in-memory SQLite)")
+    parser.add_argument("--filter", help="Only run cases whose name contains this text")
+    parser.add_argument("--rounds", type=int, default=7, help="Measured rounds per case")
+    parser.add_argument("--warmup", type=int, default=1, help="Unmeasured calls before calibration")
+    parser.add_argument("--min-time", type=float, default=0.05, help="Minimum seconds per round")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed of the synthetic inputs")
+    parser.add_argument("--save", type=Path, help="Write the results as a baseline to this file")
+    parser.add_argument("--compare", type=Path, help="Baseline to compare with; exit 1 on regression")
+    parser.add_argument("--threshold", type=float, default=0.20, help="Allowed median slowdown before failing (0.20 = 20%%)")
+    args = parser.parse_args()
+
+    resultados = {}
+    print(f"{'case':<48} {'median (us)':>12} {'min (us)':>12} {'stddev':>10} {'per item (us)':>14}")
+    for nome, tamanho, funcao, itens, finalizar in montar_casos(args):
+        if args.filter and args.filter not in nome:
+            if finalizar:
+                finalizar()
+            continue
+        dados = medir(funcao, args)
+        resultados[chave(nome, tamanho)] = dados
+        print(f"{chave(nome, tamanho):<48} {dados['median_us']:>12.2f} {dados['min_us']:>12.2f} "
+              f"{dados['stddev_us']:>10.2f} {dados['median_us'] / itens:>14.3f}")
+        if finalizar:
+            finalizar()
+
+    if args.save:
+        args.save.parent.mkdir(parents=True, exist_ok=True)
+        args.save.write_text(json.dumps({
+            "python": platform.python_version(),
+            "machine": f"{platform.system()} {platform.machine()}",
+            "results": resultados,
+        }, indent=2), encoding="utf-8")
+        print(f"\nBaseline saved to {args.save}")
+
+    if args.compare:
+        regressoes = comparar(resultados, json.loads(args.compare.read_text(encoding="utf-8")), args.threshold, args.filter)
+        if regressoes:
+            print(f"\n{len(regressoes)} case(s) regressed more than {args.threshold:.0%}: {', '.join(regressoes)}")
+            sys.exit(1)
+        print("\nNo regressions")
+
+if __name__ == "__main__":
+    main()
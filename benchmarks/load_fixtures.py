@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+"""
+Load-Test Fixture Generator
+
+Fills the database configured in .env (EXTERNAL_URL_DB, meant to be a local
+Postgres) with a synthetic multi-tenant data set for benchmarks/load_test.py:
+
+    companies  - codes from LOADTEST_CODIGO_BASE upwards
+    employees  - split across companies with a Zipf skew: a few huge tenants, many small ones
+    exams      - exponential number per employee (most have a few, some have many)
+    certificates (atestados) - same, with a lower mean
+    users      - one admin plus regular users linked to 1-3 companies, biased towards big tenants
+
+Every generated row is recognisable (company codes >= LOADTEST_CODIGO_BASE, e-mails at
+LOADTEST_EMAIL_DOMAIN), so --reset removes only load-test data. The same --seed always
+produces the same data set. A manifest with the accounts, companies and search terms is
+written for the load test.
+
+Usage:
+    python benchmarks/load_fixtures.py --companies 200 --employees 200000
+    python benchmarks/load_fixtures.py --companies 50 --employees 20000 --skew 1.5 --reset
+    python benchmarks/load_fixtures.py --reset-only
+"""
+
+import sys
+import json
+import time
+import uuid
+import random
+import argparse
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from sqlalchemy import text
+
+from database.Engine import engine
+from database.Base import Base
+from models.all_models import Usuario, Empresa, Funcionario, Atestado, Exame, UsuarioEmpresa
+from src.utils.senhas import hasher
+
+LOADTEST_CODIGO_BASE = 9_000_000
+LOADTEST_EMAIL_DOMAIN = "loadtest.example.com"
+DEFAULT_MANIFEST = ROOT_DIR / "benchmarks" / "results" / "load_fixtures.json"
+
+PRIMEIROS_NOMES = [
+    "Ana", "Maria", "Joao", "Jose", "Carlos", "Paulo", "Lucas", "Pedro", "Juliana", "Fernanda",
+    "Marcos", "Rafael", "Bruno", "Camila", "Patricia", "Aline", "Gabriel", "Mateus", "Larissa", "Renata",
+    "Rodrigo", "Felipe", "Tiago", "Vanessa", "Leticia", "Eduardo", "Sandra", "Marcia", "Antonio", "Francisco",
+]
+SOBRENOMES = [
+    "Silva", "Santos", "Oliveira", "Souza", "Rodrigues", "Ferreira", "Alves", "Pereira", "Lima", "Gomes",
+    "Costa", "Ribeiro", "Martins", "Carvalho", "Almeida", "Lopes", "Soares", "Fernandes", "Vieira", "Barbosa",
+    "Rocha", "Dias", "Nascimento", "Andrade", "Moreira", "Nunes", "Marques", "Machado", "Mendes", "Freitas",
+]
+SETORES = ["Administrativo", "Producao", "Logistica", "Manutencao", "Comercial", "Financeiro", "TI", "RH"]
+CARGOS = ["Auxiliar", "Assistente", "Analista", "Operador", "Tecnico", "Supervisor", "Coordenador", "Gerente"]
+EXAMES = [
+    ("0001", "Exame clinico"), ("0002", "Audiometria"), ("0003", "Hemograma"), ("0004", "Glicemia"),
+    ("0005", "Acuidade visual"), ("0006", "Espirometria"), ("0007", "Raio X torax"), ("0008", "Eletrocardiograma"),
+]
+CIDS = [("J11", "Influenza"), ("M54.5", "Dor lombar"), ("A09", "Diarreia"), ("Z76.3", "Acompanhante"), ("S93.4", "Entorse")]
+
+def distribuir_funcionarios(total, empresas, skew):
+    """
+    Zipf: o peso da empresa de posição i é 1 / (i + 1) ** skew (mínimo de um funcionário por empresa).
+    """
+    pesos = [1 / (i + 1) ** skew for i in range(empresas)]
+    soma = sum(pesos)
+    return [max(1, round(total * peso / soma)) for peso in pesos]
+
+def quantidade_exponencial(rng, media, teto):
+    if media <= 0:
+        return 0
+    return min(teto, int(rng.expovariate(1 / media)))
+
+def data_aleatoria(rng, inicio, fim):
+    return inicio + timedelta(days=rng.randint(0, (fim - inicio).days))
+
+def inserir(conn, tabela, linhas, batch_size):
+    for inicio in range(0, len(linhas), batch_size):
+        conn.execute(tabela.insert(), linhas[inicio:inicio + batch_size])
+
+def reset(conn):
+    filtro = {"base": LOADTEST_CODIGO_BASE}
+    for tabela in ("exames", "atestados", "funcionarios"):
+        resultado = conn.execute(text(f"DELETE FROM {tabela} WHERE codigo_empresa >= :base"), filtro)
+        print(f"  {tabela}: {resultado.rowcount} removidos")
+    # Explícito em vez de depender do ON DELETE CASCADE (ausente em bancos criados antes da tabela)
+    conn.execute(text("DELETE FROM usuario_empresas WHERE empresa_id IN (SELECT id FROM empresas WHERE codigo >= :base)"), filtro)
+    resultado = conn.execute(text("DELETE FROM empresas WHERE codigo >= :base"), filtro)
+    print(f"  empresas: {resultado.rowcount} removidas")
+    resultado = conn.execute(text("DELETE FROM usuarios WHERE email LIKE :dominio"), {"dominio": f"%@{LOADTEST_EMAIL_DOMAIN}"})
+    print(f"  usuarios: {resultado.rowcount} removidos")
+
+def gerar_empresas(rng, args):
+    tamanhos = distribuir_funcionarios(args.employees, args.companies, args.skew)
+    empresas = []
+    for i, tamanho in enumerate(tamanhos):
+        codigo = LOADTEST_CODIGO_BASE + i
+        empresas.append({
+            "id": uuid.UUID(int=rng.getrandbits(128), version=4),
+            "codigo": codigo,
+            "nome_abreviado": f"LT {codigo}",
+            "razao_social": f"Load Test {codigo} Ltda",
+            "cidade": "Sao Paulo",
+            "uf": "SP",
+            "ativo": True,
+        })
+    return empresas, tamanhos
+
+def gerar_usuarios(rng, args, empresas, tamanhos):
+    """
+    Returns:
+        (linhas de usuarios, linhas de usuario_empresas, contas para o manifesto)
+    """
+    # Um hash para todas as contas: o bcrypt é caro e a senha é a mesma
+    senha_hash = hasher.hash(args.password)
+    agora = datetime.utcnow()
+
+    def usuario(nome, email, tipo):
+        return {
+            "id": uuid.UUID(int=rng.getrandbits(128), version=4),
+            "nome": nome,
+            "email": email,
+            "senha": senha_hash,
+            "type_user": tipo,
+            "active": True,
+            "dt_criacao": agora,
+        }
+
+    def empresas_da_conta(indices):
+        return [{"id": str(empresas[i]["id"]), "codigo": empresas[i]["codigo"], "funcionarios": tamanhos[i]} for i in indices]
+
+    admin = usuario("Load Test Admin", f"admin@{LOADTEST_EMAIL_DOMAIN}", "admin")
+    usuarios = [admin]
+    contas = [{"email": admin["email"], "type_user": "admin", "companies": empresas_da_conta(range(min(3, len(empresas))))}]
+    vinculos = []
+
+    # Empresas grandes têm mais usuários, como na base real
+    for i in range(args.users):
+        linha = usuario(f"Load Test User {i}", f"user{i}@{LOADTEST_EMAIL_DOMAIN}", "user")
+        indices = sorted(set(rng.choices(range(len(empresas)), weights=tamanhos, k=rng.randint(1, 3))))
+        usuarios.append(linha)
+        vinculos.extend({"usuario_id": linha["id"], "empresa_id": empresas[j]["id"]} for j in indices)
+        contas.append({"email": linha["email"], "type_user": "user", "companies": empresas_da_conta(indices)})
+
+    return usuarios, vinculos, contas
+
+def gerar_funcionarios(rng, args, empresa, quantidade, sequencia):
+    """
+    Gera os funcionários de uma empresa com seus exames e atestados.
+
+    Yields:
+        (funcionario, lista de exames, lista de atestados)
+    """
+    hoje = date.today()
+    for codigo in range(1, quantidade + 1):
+        nome = f"{rng.choice(PRIMEIROS_NOMES)} {rng.choice(SOBRENOMES)} {rng.choice(SOBRENOMES)}"
+        funcionario_id = uuid.UUID(int=rng.getrandbits(128), version=4)
+        matricula = f"{codigo:06d}"
+        setor = rng.choice(SETORES)
+        cargo = rng.choice(CARGOS)
+        # CPF fictício: o prefixo LT não colide com CPFs reais (somente dígitos)
+        cpf = f"LT{sequencia + codigo:09d}"
+        admissao = data_aleatoria(rng, date(2005, 1, 1), hoje)
+        demitido = rng.random() < 0.15
+        funcionario = {
+            "id": funcionario_id,
+            "empresa_id": empresa["id"],
+            "codigo_empresa": empresa["codigo"],
+            "nome_empresa": empresa["razao_social"],
+            "codigo": codigo,
+            "nome": nome,
+            "codigo_unidade": "1",
+            "nome_unidade": "Matriz",
+            "codigo_setor": str(SETORES.index(setor)),
+            "nome_setor": setor,
+            "codigo_cargo": str(CARGOS.index(cargo)),
+            "nome_cargo": cargo,
+            "matricula_funcionario": matricula,
+            "cpf": cpf,
+            "situacao": "Inativo" if demitido else "Ativo",
+            "sexo": rng.choice([1, 2]),
+            "data_nascimento": data_aleatoria(rng, date(1960, 1, 1), date(2004, 12, 31)),
+            "data_admissao": admissao,
+            "data_demissao": data_aleatoria(rng, admissao, hoje) if demitido else None,
+            "cidade": "Sao Paulo",
+            "uf": "SP",
+        }
+
+        exames = []
+        for _ in range(quantidade_exponencial(rng, args.exams, int(args.exams * 10))):
+            codigo_exame, exame = rng.choice(EXAMES)
+            pedido = data_aleatoria(rng, admissao, hoje)
+            exames.append({
+                "id": uuid.UUID(int=rng.getrandbits(128), version=4),
+                "codigo_empresa": empresa["codigo"],
+                "nome_abreviado": empresa["nome_abreviado"],
+                "unidade": "Matriz",
+                "setor": setor,
+                "cargo": cargo,
+                "codigo_funcionario": codigo,
+                "funcionario_id": funcionario_id,
+                "cpf_funcionario": cpf,
+                "matricula": matricula,
+                "data_admissao": admissao,
+                "nome": nome,
+                "codigo_exame": codigo_exame,
+                "exame": exame,
+                "ultimo_pedido": pedido,
+                "data_resultado": min(hoje, pedido + timedelta(days=rng.randint(0, 10))),
+                "periodicidade": "12",
+            })
+
+        atestados = []
+        for _ in range(quantidade_exponencial(rng, args.certificates, int(args.certificates * 10))):
+            cid, descricao = rng.choice(CIDS)
+            inicio = data_aleatoria(rng, admissao, hoje)
+            dias = rng.randint(1, 15)
+            atestados.append({
+                "id": uuid.UUID(int=rng.getrandbits(128), version=4),
+                "funcionario_id": funcionario_id,
+                "codigo_empresa": empresa["codigo"],
+                "unidade": "Matriz",
+                "setor": setor,
+                "matricula_func": matricula,
+                "tipo_atestado": 1,
+                "dt_inicio_atestado": inicio,
+                "dt_fim_atestado": inicio + timedelta(days=dias - 1),
+                "dias_afastados": dias,
+                "cid_principal": cid,
+                "descricao_cid": descricao,
+            })
+
+        yield funcionario, exames, atestados
+
+class Lotes:
+    """
+    Acumula linhas por tabela e insere em lotes, sem manter o conjunto inteiro em memória.
+    """
+    def __init__(self, conn, batch_size):
+        self.conn = conn
+        self.batch_size = batch_size
+        self.pendentes = {}
+        self.totais = {}
+
+    def adicionar(self, tabela, linhas):
+        pendentes = self.pendentes.setdefault(tabela, [])
+        pendentes.extend(linhas)
+        if len(pendentes) >= self.batch_size:
+            self.descarregar(tabela)
+
+    def descarregar(self, tabela):
+        # Exames e atestados referenciam funcionários: os pendentes vão antes
+        if tabela is not Funcionario.__table__:
+            self.descarregar(Funcionario.__table__)
+        linhas = self.pendentes.get(tabela)
+        if linhas:
+            self.conn.execute(tabela.insert(), linhas)
+            self.totais[tabela.name] = self.totais.get(tabela.name, 0) + len(linhas)
+            linhas.clear()
+
+    def finalizar(self):
+        # Funcionários antes de exames/atestados por causa das chaves estrangeiras
+        for tabela in (Funcionario.__table__, Exame.__table__, Atestado.__table__):
+            self.descarregar(tabela)
+
+def main():
+    parser = argparse.ArgumentParser(description="Seed the database with multi-tenant load-test fixtures")
+    parser.add_argument("--companies", type=int, default=200, help="Number of companies")
+    parser.add_argument("--employees", type=int, default=200000, help="Total employees (split with a Zipf skew)")
+    parser.add_argument("--skew", type=float, default=1.1, help="Zipf exponent; higher means fewer, bigger tenants")
+    parser.add_argument("--exams", type=float, default=4.0, help="Mean exams per employee")
+    parser.add_argument("--certificates", type=float, default=1.0, help="Mean certificates (atestados) per employee")
+    parser.add_argument("--users", type=int, default=50, help="Regular (non-admin) user accounts")
+    parser.add_argument("--password", default="loadtest", help="Password of every generated account")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed (same seed, same data set)")
+    parser.add_argument("--batch-size", type=int, default=5000, help="Rows per INSERT batch")
+    parser.add_argument("--manifest", type=Path, default=DEFAULT_MANIFEST, help="Where to write the manifest for load_test.py")
+    parser.add_argument("--reset", action="store_true", help="Remove previous load-test data before seeding")
+    parser.add_argument("--reset-only", action="store_true", help="Only remove previous load-test data")
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+
+    if args.reset or args.reset_only:
+        print("Removendo dados de teste de carga anteriores...")
+        with engine.begin() as conn:
+            reset(conn)
+        if args.reset_only:
+            return
+
+    rng = random.Random(args.seed)
+    empresas, tamanhos = gerar_empresas(rng, args)
+    usuarios, vinculos, contas = gerar_usuarios(rng, args, empresas, tamanhos)
+
+    inicio = time.perf_counter()
+    termos = []
+    with engine.begin() as conn:
+        inserir(conn, Usuario.__table__, usuarios, args.batch_size)
+        inserir(conn, Empresa.__table__, empresas, args.batch_size)
+        inserir(conn, UsuarioEmpresa.__table__, vinculos, args.batch_size)
+
+        lotes = Lotes(conn, args.batch_size)
+        sequencia = 0
+        for empresa, quantidade in zip(empresas, tamanhos):
+            for funcionario, exames, atestados in gerar_funcionarios(rng, args, empresa, quantidade, sequencia):
+                lotes.adicionar(Funcionario.__table__, [funcionario])
+                lotes.adicionar(Exame.__table__, exames)
+                lotes.adicionar(Atestado.__table__, atestados)
+                # Nomes completos como termos de busca seletivos
+                if len(termos) < 20 and rng.random() < 0.001:
+                    termos.append(funcionario["nome"])
+            sequencia += quantidade
+            print(f"  empresa {empresa['codigo']}: {quantidade} funcionários", end="\r")
+        lotes.finalizar()
+
+    totais = lotes.totais
+    print(f"\nInseridos em {time.perf_counter() - inicio:.1f}s: {len(empresas)} empresas, "
+          f"{totais.get('funcionarios', 0)} funcionários, {totais.get('exames', 0)} exames, "
+          f"{totais.get('atestados', 0)} atestados, {len(usuarios)} usuários")
+
+    # Estatísticas atualizadas para que os planos de consulta reflitam o novo volume
+    if engine.dialect.name == "postgresql":
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            for tabela in ("empresas", "usuario_empresas", "funcionarios", "exames", "atestados", "usuarios"):
+                conn.execute(text(f"ANALYZE {tabela}"))
+
+    manifesto = {
+        "created_at": datetime.utcnow().isoformat(timespec="seconds"),
+        "database": engine.url.render_as_string(hide_password=True),
+        "args": {k: v for k, v in vars(args).items() if k not in ("manifest", "password")},
+        "password": args.password,
+        "summary": {
+            "companies": len(empresas),
+            "employees": totais.get("funcionarios", 0),
+            "exams": totais.get("exames", 0),
+            "certificates": totais.get("atestados", 0),
+            "largest_tenants": tamanhos[:5],
+            "median_tenant": sorted(tamanhos)[len(tamanhos) // 2],
+        },
+        "accounts": contas,
+        # Sobrenomes (muitos resultados) e nomes completos (poucos)
+        "search_terms": SOBRENOMES[:10] + termos,
+    }
+    args.manifest.parent.mkdir(parents=True, exist_ok=True)
+    args.manifest.write_text(json.dumps(manifesto, indent=2, ensure_ascii=False), encoding="utf-8")
+    print(f"Manifesto gravado em {args.manifest}")
+
+if __name__ == "__main__":
+    main()
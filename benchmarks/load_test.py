@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+"""
+Backend Load Test
+
+Drives the backend (src/App.py) with virtual users following scripted journeys over
+the data set created by benchmarks/load_fixtures.py:
+
+    login -> list companies -> select company -> paginate funcionarios -> search -> open detail
+          -> open detail with exam/certificate history
+
+Each virtual user logs in once per session, runs --journeys-per-session journeys with
+--think-ms pauses between requests and logs in again. Concurrency is given as one or
+more stages (--users 10,25,50); each stage runs for --duration seconds and only samples
+taken after its --ramp-up are counted. Throughput and p50/p90/p95/p99 latency are
+reported per endpoint and the run is saved as JSON, so runs before and after a change
+can be compared with --compare.
+
+Usage:
+    python benchmarks/load_test.py --base-url http://localhost:8001 --users 10,25,50 --duration 60
+    python benchmarks/load_test.py --inprocess --users 20 --duration 30 --label baseline
+    python benchmarks/load_test.py --inprocess --users 20 --duration 30 --label after --compare benchmarks/results/<baseline>.json
+"""
+
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import statistics
+import subprocess
+from datetime import datetime
+from pathlib import Path
+
+import httpx
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+RESULTS_DIR = ROOT_DIR / "benchmarks" / "results"
+DEFAULT_MANIFEST = RESULTS_DIR / "load_fixtures.json"
+
+AUTH_COOKIE = "portal_grs_session"
+COMPANY_COOKIE = "selected_company"
+
+PERCENTIS = (50, 90, 95, 99)
+
+def load_backend():
+    sys.path.insert(0, str(ROOT_DIR))
+    sys.path.insert(0, str(ROOT_DIR / "src"))
+    import App
+    return App.app
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+class Amostras:
+    """
+    Latências e erros por endpoint de um estágio.
+    """
+    def __init__(self):
+        self.latencias = {}
+        self.erros = {}
+        self.status = {}
+        self.medindo = False
+
+    def registrar(self, endpoint, duracao, status_code):
+        if not self.medindo:
+            return
+        self.latencias.setdefault(endpoint, []).append(duracao)
+        self.status.setdefault(endpoint, {})
+        self.status[endpoint][status_code] = self.status[endpoint].get(status_code, 0) + 1
+        if status_code >= 400 or status_code == 0:
+            self.erros[endpoint] = self.erros.get(endpoint, 0) + 1
+
+async def medir(client, amostras, endpoint, method, url, **kwargs):
+    inicio = time.perf_counter()
+    try:
+        response = await client.request(method, url, **kwargs)
+        await response.aread()
+    except httpx.HTTPError:
+        amostras.registrar(endpoint, time.perf_counter() - inicio, 0)
+        return None
+    amostras.registrar(endpoint, time.perf_counter() - inicio, response.status_code)
+    return response
+
+def guardar_cookie(client, response, nome):
+    # O cookie pode vir com Secure (SECURE_COOKIES); reaplicado sem a flag para valer também em http
+    valor = response.cookies.get(nome)
+    if valor:
+        client.cookies.set(nome, valor)
+
+async def pausa(rng, args):
+    if args.think_ms:
+        await asyncio.sleep(rng.uniform(0.5, 1.5) * args.think_ms / 1000)
+
+async def jornada(client, amostras, conta, termos, rng, args):
+    """
+    Uma visita: escolher empresa, paginar, buscar e abrir um funcionário (detalhe e histórico).
+    """
+    response = await medir(client, amostras, "GET /api/user/companies", "GET", "/api/user/companies")
+    if response is None or response.status_code != 200:
+        return
+    await pausa(rng, args)
+
+    empresa = rng.choice(conta["companies"])
+    response = await medir(
+        client, amostras, "POST /api/user/select-company", "POST", "/api/user/select-company",
+        json={"company_id": empresa["id"]}
+    )
+    if response is None or response.status_code != 200:
+        return
+    guardar_cookie(client, response, COMPANY_COOKIE)
+    await pausa(rng, args)
+
+    itens = []
+    paginas = max(1, (empresa["funcionarios"] + args.page_size - 1) // args.page_size)
+    for page in range(1, rng.randint(1, min(args.max_pages, paginas)) + 1):
+        response = await medir(
+            client, amostras, "GET /api/funcionarios", "GET", "/api/funcionarios",
+            params={"page": page, "limit": args.page_size}
+        )
+        if response is not None and response.status_code == 200:
+            itens = response.json().get("items", []) or itens
+        await pausa(rng, args)
+
+    response = await medir(
+        client, amostras, "GET /api/funcionarios?search", "GET", "/api/funcionarios",
+        params={"page": 1, "limit": args.page_size, "search": rng.choice(termos)}
+    )
+    if response is not None and response.status_code == 200:
+        itens = response.json().get("items", []) or itens
+    await pausa(rng, args)
+
+    if itens:
+        funcionario_id = rng.choice(itens)['id']
+        await medir(
+            client, amostras, "GET /api/funcionarios/{id}", "GET", f"/api/funcionarios/{funcionario_id}"
+        )
+        await pausa(rng, args)
+        await medir(
+            client, amostras, "GET /api/funcionarios/{id}/completo", "GET", f"/api/funcionarios/{funcionario_id}/completo"
+        )
+        await pausa(rng, args)
+
+async def usuario_virtual(numero, criar_cliente, manifesto, amostras, fim, atraso, args):
+    rng = random.Random(args.seed * 1000 + numero)
+    contas = [c for c in manifesto["accounts"] if c["companies"] and (args.include_admin or c["type_user"] != "admin")]
+    termos = manifesto["search_terms"]
+    await asyncio.sleep(atraso)
+
+    while time.perf_counter() < fim:
+        conta = rng.choice(contas)
+        async with criar_cliente() as client:
+            response = await medir(
+                client, amostras, "POST /api/login", "POST", "/api/login",
+                data={"username": conta["email"], "password": manifesto["password"]}
+            )
+            if response is None or response.status_code != 200:
+                await asyncio.sleep(1)
+                continue
+            guardar_cookie(client, response, AUTH_COOKIE)
+            await pausa(rng, args)
+
+            for _ in range(args.journeys_per_session):
+                if time.perf_counter() >= fim:
+                    break
+                await jornada(client, amostras, conta, termos, rng, args)
+
+async def executar_estagio(criar_cliente, manifesto, usuarios, args):
+    amostras = Amostras()
+    inicio = time.perf_counter()
+    fim = inicio + args.ramp_up + args.duration
+
+    async def iniciar_medicao():
+        await asyncio.sleep(args.ramp_up)
+        amostras.medindo = True
+
+    tarefas = [
+        usuario_virtual(i, criar_cliente, manifesto, amostras, fim, args.ramp_up * i / usuarios, args)
+        for i in range(usuarios)
+    ]
+    await asyncio.gather(iniciar_medicao(), *tarefas)
+    # Requisições que terminaram depois do fim da janela entram na conta do tempo real
+    decorrido = max(args.duration, time.perf_counter() - inicio - args.ramp_up)
+    return resumir(amostras, usuarios, decorrido)
+
+def resumir(amostras, usuarios, decorrido):
+    endpoints = {}
+    todas = []
+    for endpoint, valores in sorted(amostras.latencias.items()):
+        todas.extend(valores)
+        endpoints[endpoint] = {
+            "requests": len(valores),
+            "errors": amostras.erros.get(endpoint, 0),
+            "rps": round(len(valores) / decorrido, 2),
+            "mean_ms": round(statistics.fmean(valores) * 1000, 2),
+            **{f"p{p}_ms": round(percentile(valores, p) * 1000, 2) for p in PERCENTIS},
+            "max_ms": round(max(valores) * 1000, 2),
+            "status": {str(k): v for k, v in sorted(amostras.status[endpoint].items())},
+        }
+    total = {
+        "requests": len(todas),
+        "errors": sum(amostras.erros.values()),
+        "rps": round(len(todas) / decorrido, 2),
+        **({f"p{p}_ms": round(percentile(todas, p) * 1000, 2) for p in PERCENTIS} if todas else {}),
+    }
+    return {"users": usuarios, "duration_s": round(decorrido, 2), "total": total, "endpoints": endpoints}
+
+def report(estagio):
+    total = estagio["total"]
+    print(f"\n== {estagio['users']} users, {estagio['duration_s']:.0f}s: "
+          f"{total['rps']:.1f} req/s, {total['requests']} requests, {total['errors']} errors")
+    print(f"{'endpoint':<32} {'n':>7} {'err':>5} {'req/s':>8} {'p50':>8} {'p90':>8} {'p95':>8} {'p99':>8} {'max':>8}")
+    for endpoint, dados in estagio["endpoints"].items():
+        print(f"{endpoint:<32} {dados['requests']:>7} {dados['errors']:>5} {dados['rps']:>8.2f} "
+              f"{dados['p50_ms']:>8.1f} {dados['p90_ms']:>8.1f} {dados['p95_ms']:>8.1f} "
+              f"{dados['p99_ms']:>8.1f} {dados['max_ms']:>8.1f}")
+
+def variacao(atual, anterior):
+    if not anterior:
+        return "     n/a"
+    return f"{(atual - anterior) / anterior * 100:>+7.1f}%"
+
+def compare(resultado, baseline):
+    print(f"\n== Comparison with {baseline.get('label')} ({baseline.get('git_commit')}, {baseline.get('created_at')})")
+    anteriores = {estagio["users"]: estagio for estagio in baseline["stages"]}
+    for estagio in resultado["stages"]:
+        anterior = anteriores.get(estagio["users"])
+        if anterior is None:
+            print(f"-- {estagio['users']} users: not in baseline")
+            continue
+        print(f"-- {estagio['users']} users: throughput {anterior['total']['rps']:.1f} -> {estagio['total']['rps']:.1f} req/s "
+              f"({variacao(estagio['total']['rps'], anterior['total']['rps']).strip()})")
+        print(f"{'endpoint':<32} {'p50 before':>10} {'p50 after':>10} {'delta':>8} {'p95 before':>10} {'p95 after':>10} {'delta':>8}")
+        for endpoint, dados in estagio["endpoints"].items():
+            antes = anterior["endpoints"].get(endpoint)
+            if antes is None:
+                continue
+            print(f"{endpoint:<32} {antes['p50_ms']:>10.1f} {dados['p50_ms']:>10.1f} {variacao(dados['p50_ms'], antes['p50_ms'])} "
+                  f"{antes['p95_ms']:>10.1f} {dados['p95_ms']:>10.1f} {variacao(dados['p95_ms'], antes['p95_ms'])}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the backend with multi-tenant user journeys")
+    parser.add_argument("--base-url", default="http://localhost:8001", help="Backend URL (ignored with --inprocess)")
+    parser.add_argument("--inprocess", action="store_true", help="Call the backend app in-process through httpx.ASGITransport")
+    parser.add_argument("--manifest", type=Path, default=DEFAULT_MANIFEST, help="Manifest written by load_fixtures.py")
+    parser.add_argument("--users", default="10", help="Concurrent virtual users; comma-separated for several stages")
+    parser.add_argument("--duration", type=float, default=60, help="Measured seconds per stage")
+    parser.add_argument("--ramp-up", type=float, default=10, help="Seconds to start all users (not measured)")
+    parser.add_argument("--think-ms", type=float, default=500, help="Mean pause between requests of a user")
+    parser.add_argument("--journeys-per-session", type=int, default=5, help="Journeys between logins")
+    parser.add_argument("--page-size", type=int, default=20, help="limit used when paginating funcionarios")
+    parser.add_argument("--max-pages", type=int, default=5, help="Maximum pages visited per journey")
+    parser.add_argument("--include-admin", action="store_true", help="Also use the admin account")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed of the journeys")
+    parser.add_argument("--timeout", type=float, default=30, help="Request timeout in seconds")
+    parser.add_argument("--label", default="run", help="Name of this run (used in the results file name)")
+    parser.add_argument("--output", type=Path, help="Results file (default: benchmarks/results/<timestamp>-<label>.json)")
+    parser.add_argument("--compare", type=Path, help="Previous results file to compare with")
+    args = parser.parse_args()
+
+    if not args.manifest.exists():
+        parser.error(f"{args.manifest} not found; run benchmarks/load_fixtures.py first")
+    manifesto = json.loads(args.manifest.read_text(encoding="utf-8"))
+    estagios = [int(u) for u in args.users.split(",")]
+
+    if args.inprocess:
+        transport = httpx.ASGITransport(app=load_backend())
+        criar_cliente = lambda: httpx.AsyncClient(transport=transport, base_url="http://backend", timeout=args.timeout)
+    else:
+        limites = httpx.Limits(max_connections=max(estagios) * 2)
+        criar_cliente = lambda: httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout, limits=limites)
+
+    resultado = {
+        "label": args.label,
+        "created_at": datetime.utcnow().isoformat(timespec="seconds"),
+        "git_commit": git_commit(),
+        "target": "inprocess" if args.inprocess else args.base_url,
+        "args": {k: str(v) if isinstance(v, Path) else v for k, v in vars(args).items()},
+        "fixtures": manifesto.get("summary"),
+        "stages": [],
+    }
+    for usuarios in estagios:
+        print(f"Running {usuarios} users: {args.ramp_up:.0f}s ramp-up + {args.duration:.0f}s...")
+        estagio = asyncio.run(executar_estagio(criar_cliente, manifesto, usuarios, args))
+        resultado["stages"].append(estagio)
+        report(estagio)
+
+    saida = args.output or RESULTS_DIR / f"{datetime.now():%Y%m%d-%H%M%S}-{args.label}.json"
+    saida.parent.mkdir(parents=True, exist_ok=True)
+    saida.write_text(json.dumps(resultado, indent=2), encoding="utf-8")
+    print(f"\nResults saved to {saida}")
+
+    if args.compare:
+        compare(resultado, json.loads(args.compare.read_text(encoding="utf-8")))
+
+if __name__ == "__main__":
+    main()
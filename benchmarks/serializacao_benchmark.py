@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Serialization Benchmark
+
+Compares the legacy response path (per-field dicts with manual isoformat()/str(uuid)
+conversions encoded by the stdlib json module) against the shared serialization layer
+in src/utils/serializacao.py (rows converted with _asdict() and encoded by orjson, or
+MessagePack when available).
+
+Usage:
+    python benchmarks/serializacao_benchmark.py
+    python benchmarks/serializacao_benchmark.py --rows 1000 10000 --repeat 5
+"""
+
+import sys
+import json
+import uuid
+import time
+import argparse
+from collections import namedtuple
+from datetime import date, timedelta
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.append(str(ROOT_DIR))
+
+import orjson
+
+from src.utils.serializacao import (
+    ORJSON_OPTIONS, _orjson_default, _msgpack_default, linhas_para_dicts, msgpack
+)
+
+CAMPOS_FUNCIONARIO = (
+    "id", "nome", "codigo", "cpf", "matricula_funcionario", "codigo_empresa",
+    "nome_empresa", "codigo_unidade", "nome_unidade", "codigo_setor", "nome_setor",
+    "codigo_cargo", "nome_cargo", "situacao", "data_admissao", "data_demissao",
+)
+
+# Simula as linhas retornadas por query.with_entities(...) (também expõem _asdict)
+LinhaFuncionario = namedtuple("LinhaFuncionario", CAMPOS_FUNCIONARIO)
+
+def gerar_linhas(quantidade):
+    base = date(2015, 1, 1)
+    linhas = []
+    for i in range(quantidade):
+        linhas.append(LinhaFuncionario(
+            id=uuid.uuid4(),
+            nome=f"FUNCIONARIO {i:06d}",
+            codigo=i,
+            cpf=f"{i:011d}",
+            matricula_funcionario=f"M{i:08d}",
+            codigo_empresa=1000 + (i % 50),
+            nome_empresa="EMPRESA EXEMPLO LTDA",
+            codigo_unidade=str(i % 20),
+            nome_unidade="UNIDADE CENTRAL",
+            codigo_setor=str(i % 40),
+            nome_setor="ADMINISTRATIVO",
+            codigo_cargo=str(i % 60),
+            nome_cargo="ANALISTA",
+            situacao="Ativo",
+            data_admissao=base + timedelta(days=i % 3000),
+            data_demissao=None if i % 7 else base + timedelta(days=3000 + i % 300),
+        ))
+    return linhas
+
+def serializar_legado(linhas):
+    items = []
+    for f in linhas:
+        items.append({
+            "id": str(f.id),
+            "nome": f.nome,
+            "codigo": f.codigo,
+            "cpf": f.cpf,
+            "matricula_funcionario": f.matricula_funcionario,
+            "codigo_empresa": f.codigo_empresa,
+            "nome_empresa": f.nome_empresa,
+            "codigo_unidade": f.codigo_unidade,
+            "nome_unidade": f.nome_unidade,
+            "codigo_setor": f.codigo_setor,
+            "nome_setor": f.nome_setor,
+            "codigo_cargo": f.codigo_cargo,
+            "nome_cargo": f.nome_cargo,
+            "situacao": f.situacao,
+            "data_admissao": f.data_admissao.isoformat() if f.data_admissao else None,
+            "data_demissao": f.data_demissao.isoformat() if f.data_demissao else None,
+        })
+    return json.dumps({"items": items, "total": len(items)}).encode("utf-8")
+
+def serializar_orjson(linhas):
+    conteudo = {"items": linhas_para_dicts(linhas), "total": len(linhas)}
+    return orjson.dumps(conteudo, default=_orjson_default, option=ORJSON_OPTIONS)
+
+def serializar_msgpack(linhas):
+    conteudo = {"items": linhas_para_dicts(linhas), "total": len(linhas)}
+    return msgpack.packb(conteudo, default=_msgpack_default, use_bin_type=True)
+
+def medir(funcao, linhas, repeticoes):
+    tempos = []
+    tamanho = 0
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        saida = funcao(linhas)
+        tempos.append(time.perf_counter() - inicio)
+        tamanho = len(saida)
+    return min(tempos), tamanho
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark response serialization")
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000], help="Row counts to benchmark")
+    parser.add_argument("--repeat", type=int, default=5, help="Repetitions per measurement (best is reported)")
+    args = parser.parse_args()
+
+    serializadores = [("legacy dict + json", serializar_legado), ("orjson", serializar_orjson)]
+    if msgpack is not None:
+        serializadores.append(("msgpack", serializar_msgpack))
+
+    print(f"{'rows':>8}  {'serializer':<20} {'best (ms)':>10} {'bytes':>12} {'speedup':>8}")
+    for quantidade in args.rows:
+        linhas = gerar_linhas(quantidade)
+        referencia = None
+        for nome, funcao in serializadores:
+            melhor, tamanho = medir(funcao, linhas, args.repeat)
+            referencia = referencia or melhor
+            print(f"{quantidade:>8}  {nome:<20} {melhor * 1000:>10.2f} {tamanho:>12} {referencia / melhor:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
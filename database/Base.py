@@ -1,3 +1,23 @@
+from sqlalchemy.dialects import postgresql
 from sqlalchemy.orm import declarative_base
 
-Base = declarative_base()
\ No newline at end of file
+Base = declarative_base()
+
+def fora_do_postgresql(ddl, target, bind, dialect, **kw) -> bool:
+    # Para ddl_if: variante de um índice para os outros bancos (ex.: SQLite em desenvolvimento)
+    return dialect.name != "postgresql"
+
+def criado_no_postgresql(indice) -> bool:
+    """
+    Se o índice é criado no PostgreSQL, respeitando o ddl_if declarado no modelo.
+    """
+    condicao = indice._ddl_if
+    if condicao is None:
+        return True
+    if isinstance(condicao.dialect, str) and condicao.dialect != "postgresql":
+        return False
+    if isinstance(condicao.dialect, (tuple, list, set)) and "postgresql" not in condicao.dialect:
+        return False
+    return condicao.callable_ is None or condicao.callable_(
+        None, indice, None, state=condicao.state, dialect=postgresql.dialect(), compiler=None
+    )
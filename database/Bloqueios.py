@@ -0,0 +1,38 @@
+"""
+Advisory locks do PostgreSQL para os jobs de importação.
+
+Os bloqueios são de sessão: valem enquanto a conexão que os obteve estiver aberta e
+somem sozinhos se o processo morrer, então um job que caiu no meio nunca deixa a
+empresa bloqueada. Chave: hash de (job, empresa), com empresa 0 para o job inteiro.
+
+    - execução completa de um job: (job, 0); outra execução completa sai com
+      CODIGO_SAIDA_BLOQUEADO em vez de esperar
+    - cada empresa processada: (job, codigo da empresa); execuções parciais
+      (--empresa) disputam só as empresas que tocam
+
+Usado por psycopg2 nos jobs, como database/Invalidacao.notificar.
+"""
+
+# Código de saída de um job que não rodou porque outra execução tem o bloqueio
+# (EX_TEMPFAIL); o agendador registra a execução como ignorada, não como falha
+CODIGO_SAIDA_BLOQUEADO = 75
+
+# Chave bigint única com hash de "job:empresa": Empresa.codigo é BigInteger e não cabe
+# no segundo argumento de pg_try_advisory_lock(int4, int4)
+CHAVE_BLOQUEIO = "hashtextextended(%(job)s || ':' || %(empresa)s, 0)"
+TRY_LOCK_QUERY = f"SELECT pg_try_advisory_lock({CHAVE_BLOQUEIO})"
+UNLOCK_QUERY = f"SELECT pg_advisory_unlock({CHAVE_BLOQUEIO})"
+
+def _parametros(job: str, empresa: int) -> dict:
+    return {"job": job, "empresa": str(int(empresa))}
+
+def tentar_bloqueio(cursor, job: str, empresa: int = 0) -> bool:
+    """
+    Tenta obter o bloqueio sem esperar. Returns: True se obteve.
+    """
+    cursor.execute(TRY_LOCK_QUERY, _parametros(job, empresa))
+    return bool(cursor.fetchone()[0])
+
+def liberar_bloqueio(cursor, job: str, empresa: int = 0) -> None:
+    cursor.execute(UNLOCK_QUERY, _parametros(job, empresa))
+    cursor.fetchone()
@@ -12,14 +12,32 @@ from database.Engine import engine
 from database.Base import Base
 
 # Importe todos os modelos
-from models.all_models import Usuario, Empresa, Funcionario, Atestado, Exame
+from models.all_models import Usuario, Empresa, Funcionario, Atestado, Exame, VersaoDados, UsuarioEmpresa, ExecucaoJob, ItemFilaImportacao, LimiteTaxa
+
+# Copia o vínculo antigo (empresas.usuario_id, um usuário por empresa) para usuario_empresas.
+# A coluna antiga não é removida aqui; pode ser descartada depois de conferida a migração.
+MIGRATE_LEGACY_ACCESS_QUERY = """
+INSERT INTO usuario_empresas (usuario_id, empresa_id)
+SELECT usuario_id, id FROM empresas WHERE usuario_id IS NOT NULL
+ON CONFLICT DO NOTHING
+"""
+
+def migrate_legacy_access(inspector):
+    columns = [column["name"] for column in inspector.get_columns("empresas")]
+    if "usuario_id" not in columns:
+        return
+
+    from sqlalchemy import text
+    with engine.begin() as connection:
+        result = connection.execute(text(MIGRATE_LEGACY_ACCESS_QUERY))
+    print(f"Vínculos usuário/empresa migrados de empresas.usuario_id: {result.rowcount}")
 
 def create_tables():
     print("🔧 Criando tabelas no banco de dados...")
     print(f"Connection URL: {str(engine.url).replace(':senha@', ':***@')}")
     
     # Lista todas as classes de modelo para verificação
-    models = [Usuario, Empresa, Funcionario, Atestado, Exame]
+    models = [Usuario, Empresa, Funcionario, Atestado, Exame, VersaoDados, UsuarioEmpresa, ExecucaoJob, ItemFilaImportacao, LimiteTaxa]
     print(f"Modelos carregados: {len(models)}")
     
     for model in models:
@@ -35,6 +53,8 @@ def create_tables():
     tables = inspector.get_table_names()
     print(f"Tabelas encontradas no banco: {tables}")
     
+    migrate_legacy_access(inspector)
+    
     print("✅ Tabelas criadas com sucesso!")
 
 if __name__ == "__main__":
@@ -1,12 +1,39 @@
+from fastapi import Request
 from sqlalchemy.orm import Session
 from database.Engine import engine
 from sqlalchemy.orm import sessionmaker
+from database.Replicas import pool_replicas, sessao_leitura
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
-def get_db():
+def get_db(request: Request):
+    # Sub-requisições do /api/batch reutilizam a sessão aberta pela requisição do lote
+    batch_db = getattr(request.state, "batch_db", None)
+    if batch_db is not None:
+        yield batch_db
+        return
+
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+def get_read_db(request: Request):
+    """
+    Sessão das rotas só de leitura: lê de uma réplica quando configurada (dentro do
+    lag aceito e sem escrita recente do usuário) e envia qualquer escrita ao primário.
+    """
+    batch_db = getattr(request.state, "batch_db", None)
+    if batch_db is not None:
+        yield batch_db
+        return
+
+    if not pool_replicas.replicas:
+        db = SessionLocal()
+    else:
+        db = sessao_leitura()
+    try:
+        yield db
+    finally:
+        db.close()
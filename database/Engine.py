@@ -7,3 +7,8 @@ load_dotenv()
 DATABASE_URL = os.getenv("EXTERNAL_URL_DB")
 
 engine = create_engine(DATABASE_URL)
+
+# Réplicas de leitura (opcional), separadas por vírgula; usadas pelas rotas com get_read_db
+REPLICA_URLS = [url.strip() for url in os.getenv("EXTERNAL_URL_DB_REPLICAS", "").split(",") if url.strip()]
+
+replica_engines = [create_engine(url) for url in REPLICA_URLS]
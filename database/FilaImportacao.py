@@ -0,0 +1,161 @@
+"""
+Fila de importação compartilhada entre workers (tabela fila_importacao).
+
+Cada empresa de um lote é uma linha. Os workers, em um ou mais processos e máquinas,
+reservam uma empresa por vez com SELECT ... FOR UPDATE SKIP LOCKED: a reserva não
+espera por linhas que outro worker está reservando no mesmo instante, e duas reservas
+nunca devolvem a mesma empresa.
+
+    pendente -> processando -> concluida
+                            -> pendente (nova tentativa após FILA_RETRY_SECONDS * tentativas)
+                            -> falha (após FILA_MAX_TENTATIVAS)
+
+A reserva vale FILA_LEASE_SECONDS. Se o worker morrer, outro assume a empresa quando a
+reserva expira; se o worker ainda estiver vivo (só lento), ele ainda tem o advisory lock
+da empresa (database/Bloqueios.py) e quem assumiu devolve a empresa à fila.
+
+Usado por psycopg2 nos jobs, como database/Bloqueios.py.
+"""
+
+import os
+
+FILA_LEASE_SECONDS = int(os.getenv("FILA_LEASE_SECONDS", "3600"))
+FILA_MAX_TENTATIVAS = int(os.getenv("FILA_MAX_TENTATIVAS", "3"))
+FILA_RETRY_SECONDS = int(os.getenv("FILA_RETRY_SECONDS", "60"))
+
+# Mesmo relógio das colunas DateTime do ORM (UTC sem fuso)
+AGORA_UTC = "(NOW() AT TIME ZONE 'UTC')"
+
+# Empresas que já estão na fila (pendente/processando) não entram de novo
+ENQUEUE_QUERY = f"""
+INSERT INTO fila_importacao (id, lote, job, empresa_id, codigo_empresa, peso, status, tentativas, disponivel_em, dt_criacao)
+SELECT gen_random_uuid(), %(lote)s, %(job)s, e.id, e.codigo, COALESCE(f.total, 0), 'pendente', 0, {AGORA_UTC}, {AGORA_UTC}
+FROM empresas e
+LEFT JOIN (
+    SELECT codigo_empresa, COUNT(*) AS total FROM funcionarios GROUP BY codigo_empresa
+) f ON f.codigo_empresa = e.codigo
+WHERE e.id = ANY(%(empresas)s::uuid[])
+AND NOT EXISTS (
+    SELECT 1 FROM fila_importacao q
+    WHERE q.job = %(job)s AND q.codigo_empresa = e.codigo AND q.status IN ('pendente', 'processando')
+)
+"""
+
+# Maiores primeiro: as empresas pequenas preenchem o fim e os workers terminam juntos
+CLAIM_QUERY = f"""
+UPDATE fila_importacao SET
+    status = 'processando',
+    tentativas = tentativas + 1,
+    worker = %(worker)s,
+    dt_inicio = {AGORA_UTC},
+    expira_em = {AGORA_UTC} + %(lease)s * INTERVAL '1 second'
+WHERE id = (
+    SELECT id FROM fila_importacao
+    WHERE job = %(job)s
+    AND (
+        (status = 'pendente' AND disponivel_em <= {AGORA_UTC})
+        OR (status = 'processando' AND expira_em < {AGORA_UTC})
+    )
+    ORDER BY peso DESC, codigo_empresa
+    LIMIT 1
+    FOR UPDATE SKIP LOCKED
+)
+RETURNING id, lote, empresa_id, codigo_empresa, tentativas
+"""
+
+# "AND worker = ..." em todas as transições: um worker cuja reserva expirou e foi
+# assumida por outro não sobrescreve o resultado
+COMPLETE_QUERY = f"""
+UPDATE fila_importacao SET
+    status = 'concluida', dt_fim = {AGORA_UTC}, expira_em = NULL,
+    inseridos = %(inseridos)s, atualizados = %(atualizados)s, erros = %(erros)s, detalhe = NULL
+WHERE id = %(id)s AND worker = %(worker)s AND status = 'processando'
+"""
+
+FAIL_QUERY = f"""
+UPDATE fila_importacao SET
+    status = CASE WHEN tentativas >= %(max_tentativas)s THEN 'falha' ELSE 'pendente' END,
+    disponivel_em = {AGORA_UTC} + tentativas * %(retry)s * INTERVAL '1 second',
+    dt_fim = CASE WHEN tentativas >= %(max_tentativas)s THEN {AGORA_UTC} END,
+    expira_em = NULL,
+    detalhe = %(detalhe)s
+WHERE id = %(id)s AND worker = %(worker)s AND status = 'processando'
+RETURNING status
+"""
+
+# Empresa bloqueada por outra execução: volta para a fila sem gastar uma tentativa
+RELEASE_QUERY = f"""
+UPDATE fila_importacao SET
+    status = 'pendente', tentativas = tentativas - 1, expira_em = NULL,
+    disponivel_em = {AGORA_UTC} + %(retry)s * INTERVAL '1 second'
+WHERE id = %(id)s AND worker = %(worker)s AND status = 'processando'
+"""
+
+# Pendentes ainda não disponíveis (esperando nova tentativa) e reservas de outros workers
+OPEN_ITEMS_QUERY = """
+SELECT
+    COUNT(*) FILTER (WHERE status = 'pendente') AS pendentes,
+    COUNT(*) FILTER (WHERE status = 'processando') AS processando
+FROM fila_importacao
+WHERE job = %(job)s AND status IN ('pendente', 'processando')
+"""
+
+SUMMARY_QUERY = """
+SELECT status, COUNT(*) AS empresas, COALESCE(SUM(inseridos), 0) AS inseridos,
+       COALESCE(SUM(atualizados), 0) AS atualizados, COALESCE(SUM(erros), 0) AS erros
+FROM fila_importacao
+WHERE lote = %(lote)s
+GROUP BY status
+"""
+
+def enfileirar(cursor, lote: str, job: str, empresas_ids) -> int:
+    """
+    Returns: empresas enfileiradas (as que já estavam na fila ficam de fora)
+    """
+    cursor.execute(ENQUEUE_QUERY, {"lote": lote, "job": job, "empresas": [str(e) for e in empresas_ids]})
+    return cursor.rowcount
+
+def reservar(cursor, job: str, worker: str):
+    """
+    Returns: (id, lote, empresa_id, codigo_empresa, tentativas) da empresa reservada, ou None
+    """
+    cursor.execute(CLAIM_QUERY, {"job": job, "worker": worker, "lease": FILA_LEASE_SECONDS})
+    return cursor.fetchone()
+
+def concluir(cursor, item_id, worker: str, inseridos: int, atualizados: int, erros: int) -> bool:
+    """
+    Returns: False se a reserva foi perdida para outro worker
+    """
+    cursor.execute(COMPLETE_QUERY, {
+        "id": item_id, "worker": worker, "inseridos": inseridos, "atualizados": atualizados, "erros": erros
+    })
+    return cursor.rowcount == 1
+
+def falhar(cursor, item_id, worker: str, detalhe: str):
+    """
+    Returns: o novo status ("pendente" ou "falha"), ou None se a reserva foi perdida
+    """
+    cursor.execute(FAIL_QUERY, {
+        "id": item_id, "worker": worker, "detalhe": detalhe[:4000],
+        "max_tentativas": FILA_MAX_TENTATIVAS, "retry": FILA_RETRY_SECONDS
+    })
+    row = cursor.fetchone()
+    return row[0] if row else None
+
+def devolver(cursor, item_id, worker: str) -> None:
+    cursor.execute(RELEASE_QUERY, {"id": item_id, "worker": worker, "retry": FILA_RETRY_SECONDS})
+
+def pendencias(cursor, job: str):
+    """
+    Returns: (pendentes, processando) ainda abertos
+    """
+    cursor.execute(OPEN_ITEMS_QUERY, {"job": job})
+    row = cursor.fetchone()
+    return row[0], row[1]
+
+def resumo(cursor, lote: str):
+    """
+    Returns: {status: (empresas, inseridos, atualizados, erros)}
+    """
+    cursor.execute(SUMMARY_QUERY, {"lote": lote})
+    return {row[0]: tuple(row[1:]) for row in cursor.fetchall()}
@@ -0,0 +1,398 @@
+"""
+Auditoria e manutenção de índices sem downtime (PostgreSQL).
+
+    audit  - lista índices duplicados, redundantes (prefixo de outro), não usados
+             (pg_stat_user_indexes), inválidos, chaves estrangeiras sem índice e
+             diferenças entre o banco e os índices declarados nos modelos
+    plan   - mostra o SQL que levaria o banco ao estado dos modelos
+    apply  - executa o plano com CREATE/DROP INDEX CONCURRENTLY
+
+Os modelos são a fonte da verdade: índices declarados e ausentes são criados, e
+índices não declarados nas tabelas dos modelos são removidos. Índices únicos, de
+chave primária ou que sustentam constraints nunca são removidos. Todos os CREATE
+rodam antes dos DROP, e um DROP só acontece se os CREATE da mesma tabela deram certo.
+
+Tabelas particionadas (database/ParticionarFuncionarios.py) e suas partições ficam
+de fora: CONCURRENTLY não funciona na tabela particionada e os índices das
+partições são herdados dela.
+
+Uso:
+    python database/GerenciarIndices.py audit
+    python database/GerenciarIndices.py plan --tables funcionarios
+    python database/GerenciarIndices.py apply --yes
+    python database/GerenciarIndices.py apply --yes --include-unused --keep-undeclared
+"""
+
+import sys
+import argparse
+from collections import defaultdict
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.append(str(ROOT_DIR))
+
+from sqlalchemy import text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.schema import CreateIndex
+
+from database.Engine import engine
+from database.Base import Base, criado_no_postgresql
+import models.all_models  # noqa: F401 - registra todas as tabelas em Base.metadata
+
+INDEXES_QUERY = """
+SELECT
+    t.relname AS tabela,
+    i.relname AS indice,
+    ix.indisunique AS unico,
+    ix.indisprimary AS primario,
+    ix.indisvalid AS valido,
+    c.conname AS constraint_nome,
+    ix.indkey::text AS chave,
+    ix.indclass::text AS classes,
+    ix.indoption::text AS opcoes,
+    coalesce(pg_get_expr(ix.indexprs, ix.indrelid), '') AS expressoes,
+    coalesce(pg_get_expr(ix.indpred, ix.indrelid), '') AS predicado,
+    am.amname AS metodo,
+    array(
+        SELECT a.attname
+        FROM unnest(ix.indkey) WITH ORDINALITY AS k(attnum, ordem)
+        JOIN pg_attribute a ON a.attrelid = ix.indrelid AND a.attnum = k.attnum
+        ORDER BY k.ordem
+    ) AS colunas,
+    pg_relation_size(ix.indexrelid) AS tamanho,
+    coalesce(s.idx_scan, 0) AS scans
+FROM pg_index ix
+JOIN pg_class i ON i.oid = ix.indexrelid
+JOIN pg_class t ON t.oid = ix.indrelid
+JOIN pg_namespace n ON n.oid = t.relnamespace
+JOIN pg_am am ON am.oid = i.relam
+LEFT JOIN pg_constraint c ON c.conindid = ix.indexrelid AND c.contype IN ('p', 'u', 'x')
+LEFT JOIN pg_stat_user_indexes s ON s.indexrelid = ix.indexrelid
+WHERE n.nspname = current_schema() AND t.relkind = 'r' AND NOT t.relispartition
+ORDER BY t.relname, i.relname
+"""
+
+FOREIGN_KEYS_QUERY = """
+SELECT
+    t.relname AS tabela,
+    c.conname AS constraint_nome,
+    array(
+        SELECT a.attname
+        FROM unnest(c.conkey) WITH ORDINALITY AS k(attnum, ordem)
+        JOIN pg_attribute a ON a.attrelid = c.conrelid AND a.attnum = k.attnum
+        ORDER BY k.ordem
+    ) AS colunas
+FROM pg_constraint c
+JOIN pg_class t ON t.oid = c.conrelid
+JOIN pg_namespace n ON n.oid = t.relnamespace
+WHERE c.contype = 'f' AND n.nspname = current_schema() AND t.relkind = 'r' AND NOT t.relispartition
+ORDER BY t.relname, c.conname
+"""
+
+STATS_RESET_QUERY = "SELECT stats_reset FROM pg_stat_database WHERE datname = current_database()"
+
+INDEX_VALID_QUERY = "SELECT indisvalid FROM pg_index WHERE indexrelid = to_regclass(:nome)"
+
+def tamanho_legivel(tamanho):
+    for unidade in ("B", "kB", "MB", "GB"):
+        if tamanho < 1024:
+            return f"{tamanho:.0f} {unidade}"
+        tamanho /= 1024
+    return f"{tamanho:.1f} TB"
+
+def carregar_indices(conn):
+    indices = [dict(linha._mapping) for linha in conn.execute(text(INDEXES_QUERY))]
+    for indice in indices:
+        indice["colunas"] = list(indice["colunas"])
+        # Índices que o DROP não pode remover (ou que não devem ser removidos automaticamente)
+        indice["protegido"] = bool(indice["primario"] or indice["unico"] or indice["constraint_nome"])
+    return indices
+
+def indices_declarados(tabelas):
+    """
+    Índices declarados nos modelos, por tabela: {tabela: {nome: Index}}.
+    """
+    declarados = {}
+    for tabela in Base.metadata.sorted_tables:
+        if tabelas and tabela.name not in tabelas:
+            continue
+        declarados[tabela.name] = {indice.name: indice for indice in tabela.indexes if criado_no_postgresql(indice)}
+    return declarados
+
+def expressoes_declaradas(indice):
+    # Compiladas, não só os nomes: mantém a ordem declarada (ex.: DESC NULLS LAST)
+    return [
+        str(expressao.compile(dialect=postgresql.dialect(), compile_kwargs={"include_table": False}))
+        for expressao in indice.expressions
+    ]
+
+def assinatura(indice):
+    # opcoes: DESC/NULLS FIRST por coluna, (a, b) e (a, b DESC) não são duplicatas
+    return (
+        indice["tabela"], indice["chave"], indice["classes"], indice["opcoes"],
+        indice["expressoes"], indice["predicado"], indice["metodo"]
+    )
+
+def analisar(indices, chaves_estrangeiras, declarados, tabelas):
+    """
+    Returns:
+        Dict com as listas de achados por categoria
+    """
+    if tabelas:
+        indices = [i for i in indices if i["tabela"] in tabelas]
+        chaves_estrangeiras = [fk for fk in chaves_estrangeiras if fk["tabela"] in tabelas]
+
+    def preferencia(indice):
+        # Entre duplicatas fica o protegido, depois o declarado no modelo, depois o de nome menor
+        declarado = indice["indice"] in declarados.get(indice["tabela"], {})
+        return (not indice["protegido"], not declarado, indice["indice"])
+
+    duplicados = []
+    grupos = defaultdict(list)
+    for indice in indices:
+        if indice["valido"]:
+            grupos[assinatura(indice)].append(indice)
+    for grupo in grupos.values():
+        if len(grupo) > 1:
+            grupo.sort(key=preferencia)
+            duplicados.append({"mantido": grupo[0], "duplicados": grupo[1:]})
+
+    # Índice B-tree simples cujas colunas são o início de outro índice B-tree da mesma tabela
+    redundantes = []
+    candidatos = [i for i in indices if i["valido"] and i["metodo"] == "btree" and not i["expressoes"] and not i["predicado"]]
+    nomes_duplicados = {d["indice"] for grupo in duplicados for d in grupo["duplicados"]}
+    for indice in candidatos:
+        if indice["protegido"] or indice["indice"] in nomes_duplicados:
+            continue
+        for outro in candidatos:
+            if (outro["tabela"] == indice["tabela"] and outro["indice"] != indice["indice"]
+                    and len(outro["colunas"]) > len(indice["colunas"])
+                    and outro["colunas"][:len(indice["colunas"])] == indice["colunas"]):
+                redundantes.append({"indice": indice, "coberto_por": outro})
+                break
+
+    nao_usados = [i for i in indices if i["valido"] and not i["protegido"] and i["scans"] == 0]
+    invalidos = [i for i in indices if not i["valido"]]
+
+    # Chaves estrangeiras cujas colunas não iniciam nenhum índice (DELETE no pai e joins varrem a tabela)
+    fks_sem_indice = []
+    for fk in chaves_estrangeiras:
+        cobertas = any(
+            i["tabela"] == fk["tabela"] and i["colunas"][:len(fk["colunas"])] == list(fk["colunas"])
+            for i in indices if i["valido"]
+        )
+        if not cobertas:
+            fks_sem_indice.append(fk)
+
+    existentes = defaultdict(dict)
+    for indice in indices:
+        existentes[indice["tabela"]][indice["indice"]] = indice
+    ausentes = []
+    nao_declarados = []
+    for tabela, por_nome in declarados.items():
+        # Tabelas ainda inexistentes são criadas (com os índices) pelo CreateTables.py
+        if tabela not in existentes:
+            continue
+        for nome, indice in por_nome.items():
+            if nome not in existentes.get(tabela, {}) or not existentes[tabela][nome]["valido"]:
+                ausentes.append(indice)
+        for nome, indice in existentes.get(tabela, {}).items():
+            if nome not in por_nome and not indice["protegido"]:
+                nao_declarados.append(indice)
+
+    return {
+        "duplicados": duplicados,
+        "redundantes": redundantes,
+        "nao_usados": nao_usados,
+        "invalidos": invalidos,
+        "fks_sem_indice": fks_sem_indice,
+        "ausentes": ausentes,
+        "nao_declarados": nao_declarados,
+    }
+
+def sql_create(indice):
+    # CONCURRENTLY não bloqueia escritas; IF NOT EXISTS torna o plano reexecutável
+    indice.dialect_options["postgresql"]["concurrently"] = True
+    try:
+        return str(CreateIndex(indice, if_not_exists=True).compile(dialect=postgresql.dialect()))
+    finally:
+        indice.dialect_options["postgresql"]["concurrently"] = False
+
+def sql_drop(nome):
+    return f"DROP INDEX CONCURRENTLY IF EXISTS {nome}"
+
+def planejar(achados, declarados, include_unused, keep_undeclared):
+    """
+    Returns:
+        Listas de (tabela, índice, sql, motivo): inválidos a remover antes de tudo
+        (o IF NOT EXISTS não recriaria um índice declarado inválido), a criar e a remover
+    """
+    preparar = [
+        (indice["tabela"], indice["indice"], sql_drop(indice["indice"]), "inválido (build interrompido)")
+        for indice in achados["invalidos"]
+    ]
+    criar = [
+        (indice.table.name, indice.name, sql_create(indice), "declarado no modelo")
+        for indice in achados["ausentes"]
+    ]
+    remover = {}
+
+    def propor_remocao(indice, motivo):
+        # Declarados nos modelos, únicos, PK e constraints ficam
+        if indice["indice"] in declarados.get(indice["tabela"], {}) or indice["protegido"]:
+            return
+        remover.setdefault(indice["indice"], (indice["tabela"], indice["indice"], sql_drop(indice["indice"]), motivo))
+
+    for grupo in achados["duplicados"]:
+        for indice in grupo["duplicados"]:
+            propor_remocao(indice, f"duplicata de {grupo['mantido']['indice']}")
+    if not keep_undeclared:
+        for indice in achados["nao_declarados"]:
+            propor_remocao(indice, "não declarado no modelo")
+    if include_unused:
+        for indice in achados["nao_usados"]:
+            propor_remocao(indice, "sem uso (idx_scan = 0)")
+    # Por último: o índice que cobre o prefixo precisa continuar existindo
+    for item in achados["redundantes"]:
+        if item["coberto_por"]["indice"] not in remover:
+            propor_remocao(item["indice"], f"prefixo de {item['coberto_por']['indice']}")
+
+    return preparar, criar, list(remover.values())
+
+def imprimir_auditoria(achados, stats_reset):
+    print(f"Estatísticas de uso desde: {stats_reset or 'desconhecido'}")
+
+    print("\n🔁 Índices duplicados (mesmas colunas, classes, expressões e predicado):")
+    for grupo in achados["duplicados"] or []:
+        mantido = grupo["mantido"]
+        print(f"  {mantido['tabela']}({', '.join(mantido['colunas'])}): mantém {mantido['indice']}")
+        for indice in grupo["duplicados"]:
+            protegido = " [protegido]" if indice["protegido"] else ""
+            print(f"    - {indice['indice']} ({tamanho_legivel(indice['tamanho'])}, {indice['scans']} scans){protegido}")
+    if not achados["duplicados"]:
+        print("  nenhum")
+
+    print("\n📐 Índices redundantes (colunas são o início de outro índice):")
+    for item in achados["redundantes"]:
+        indice = item["indice"]
+        print(f"  {indice['tabela']}.{indice['indice']}({', '.join(indice['colunas'])}) coberto por "
+              f"{item['coberto_por']['indice']}({', '.join(item['coberto_por']['colunas'])}), {tamanho_legivel(indice['tamanho'])}")
+    if not achados["redundantes"]:
+        print("  nenhum")
+
+    print("\n💤 Índices sem uso (idx_scan = 0, exceto únicos/PK/constraints):")
+    for indice in achados["nao_usados"]:
+        print(f"  {indice['tabela']}.{indice['indice']}({', '.join(indice['colunas'])}) {tamanho_legivel(indice['tamanho'])}")
+    if not achados["nao_usados"]:
+        print("  nenhum")
+
+    print("\n⚠️  Índices inválidos:")
+    for indice in achados["invalidos"]:
+        print(f"  {indice['tabela']}.{indice['indice']}")
+    if not achados["invalidos"]:
+        print("  nenhum")
+
+    print("\n🔗 Chaves estrangeiras sem índice:")
+    for fk in achados["fks_sem_indice"]:
+        print(f"  {fk['tabela']}({', '.join(fk['colunas'])}) [{fk['constraint_nome']}]")
+    if not achados["fks_sem_indice"]:
+        print("  nenhuma")
+
+    print("\n📋 Declarados nos modelos e ausentes no banco:")
+    for indice in achados["ausentes"]:
+        print(f"  {indice.table.name}.{indice.name}({', '.join(expressoes_declaradas(indice))})")
+    if not achados["ausentes"]:
+        print("  nenhum")
+
+    print("\n🗂️  No banco e não declarados nos modelos:")
+    for indice in achados["nao_declarados"]:
+        print(f"  {indice['tabela']}.{indice['indice']}({', '.join(indice['colunas'])}) "
+              f"{tamanho_legivel(indice['tamanho'])}, {indice['scans']} scans")
+    if not achados["nao_declarados"]:
+        print("  nenhum")
+
+def imprimir_plano(preparar, criar, remover):
+    if not preparar and not criar and not remover:
+        print("-- Nada a fazer: índices do banco conferem com os modelos")
+        return
+    for tabela, nome, sql, motivo in preparar + criar + remover:
+        print(f"-- {tabela}.{nome}: {motivo}\n{sql};")
+
+def aplicar(preparar, criar, remover, lock_timeout):
+    """
+    Executa o plano fora de transação (exigência do CONCURRENTLY). Um CREATE que
+    termina inválido é removido e cancela os DROP da mesma tabela.
+    """
+    tabelas_com_falha = set()
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        # lock_timeout evita que a espera pelo lock enfileire as consultas da aplicação atrás do DDL
+        conn.execute(text(f"SET lock_timeout = '{lock_timeout}'"))
+        conn.execute(text("SET statement_timeout = 0"))
+
+        for tabela, nome, sql, motivo in preparar:
+            print(f"▶️  {sql}  -- {motivo}")
+            conn.execute(text(sql))
+
+        for tabela, nome, sql, motivo in criar:
+            print(f"▶️  {sql}")
+            try:
+                conn.execute(text(sql))
+            except Exception as e:
+                print(f"❌ Falha: {str(e).splitlines()[0]}")
+            if not conn.execute(text(INDEX_VALID_QUERY), {"nome": nome}).scalar():
+                print(f"❌ {nome} ficou inválido; removendo e mantendo os índices atuais de {tabela}")
+                conn.execute(text(sql_drop(nome)))
+                tabelas_com_falha.add(tabela)
+
+        for tabela, nome, sql, motivo in remover:
+            if tabela in tabelas_com_falha:
+                print(f"⏭️  {sql} (pulado: falha ao criar índice em {tabela})")
+                continue
+            print(f"▶️  {sql}  -- {motivo}")
+            try:
+                conn.execute(text(sql))
+            except Exception as e:
+                print(f"❌ Falha: {str(e).splitlines()[0]}")
+
+    return not tabelas_com_falha
+
+def main():
+    parser = argparse.ArgumentParser(description="Auditoria e manutenção de índices com CONCURRENTLY")
+    parser.add_argument("comando", choices=["audit", "plan", "apply"])
+    parser.add_argument("--tables", nargs="+", help="Limita às tabelas informadas")
+    parser.add_argument("--include-unused", action="store_true", help="Também remove índices sem uso (idx_scan = 0)")
+    parser.add_argument("--keep-undeclared", action="store_true", help="Não remove índices ausentes dos modelos")
+    parser.add_argument("--lock-timeout", default="5s", help="lock_timeout de cada comando (padrão: 5s)")
+    parser.add_argument("--yes", action="store_true", help="Confirma a execução do apply")
+    args = parser.parse_args()
+
+    if engine.dialect.name != "postgresql":
+        print(f"❌ Ferramenta específica do PostgreSQL (banco atual: {engine.dialect.name})")
+        sys.exit(2)
+
+    tabelas = set(args.tables or [])
+    with engine.connect() as conn:
+        indices = carregar_indices(conn)
+        chaves_estrangeiras = [dict(linha._mapping) for linha in conn.execute(text(FOREIGN_KEYS_QUERY))]
+        stats_reset = conn.execute(text(STATS_RESET_QUERY)).scalar()
+
+    declarados = indices_declarados(tabelas)
+    achados = analisar(indices, chaves_estrangeiras, declarados, tabelas)
+
+    if args.comando == "audit":
+        imprimir_auditoria(achados, stats_reset)
+        return
+
+    preparar, criar, remover = planejar(achados, declarados, args.include_unused, args.keep_undeclared)
+    imprimir_plano(preparar, criar, remover)
+
+    if args.comando == "apply":
+        if not args.yes:
+            print("\nNada foi executado: use --yes para aplicar o plano.")
+            sys.exit(1)
+        if not aplicar(preparar, criar, remover, args.lock_timeout):
+            sys.exit(1)
+        print("✅ Plano aplicado")
+
+if __name__ == "__main__":
+    main()
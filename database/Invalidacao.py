@@ -0,0 +1,95 @@
+"""
+Eventos de invalidação de cache entre processos (PostgreSQL LISTEN/NOTIFY).
+
+Quem escreve publica o evento na mesma transação da escrita: o PostgreSQL só entrega
+o NOTIFY no commit (e o descarta no rollback), então nenhum worker invalida antes da
+hora nem deixa de invalidar. Cada worker da API escuta o canal (src/utils/cache.py)
+e remove as entradas correspondentes dos seus caches.
+
+Payload: JSON {"tipo": ..., "chave": ...}; chave nula vale para todas as chaves do tipo.
+"""
+
+import json
+import logging
+from typing import Any, Iterable, Optional, Tuple
+
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger("invalidacao")
+
+CANAL_INVALIDACAO = "portal_invalidacao"
+
+# Tipos de evento
+EMPRESA_DADOS = "empresa_dados"        # chave: id da empresa (funcionários, exames, atestados)
+DIRETORIO_EMPRESAS = "empresas"        # sem chave: cadastro de empresas
+ACESSO_USUARIO = "acesso_usuario"      # chave: id do usuário (vínculos com empresas)
+USUARIO = "usuario"                    # chave: id do usuário (cadastro, tipo, ativo, exclusão)
+
+TIPOS_EVENTO = (EMPRESA_DADOS, DIRETORIO_EMPRESAS, ACESSO_USUARIO, USUARIO)
+
+NOTIFY_QUERY = "SELECT pg_notify(%(canal)s, %(payload)s)"
+
+def montar_payload(tipo: str, chave: Any = None) -> str:
+    if tipo not in TIPOS_EVENTO:
+        raise ValueError(f"Tipo de evento de invalidação desconhecido: {tipo}")
+    return json.dumps({"tipo": tipo, "chave": str(chave) if chave is not None else None}, separators=(",", ":"))
+
+def ler_payload(payload: str) -> Optional[Tuple[str, Optional[str]]]:
+    """
+    Returns:
+        (tipo, chave), ou None se o payload não for um evento válido
+    """
+    try:
+        evento = json.loads(payload)
+        tipo = evento["tipo"]
+    except (ValueError, TypeError, KeyError):
+        return None
+    if tipo not in TIPOS_EVENTO:
+        return None
+    return tipo, evento.get("chave")
+
+def notificar(cursor, tipo: str, chave: Any = None) -> None:
+    """
+    Publica um evento por um cursor psycopg2 (jobs), na transação aberta no cursor.
+    """
+    cursor.execute(NOTIFY_QUERY, {"canal": CANAL_INVALIDACAO, "payload": montar_payload(tipo, chave)})
+
+# Handlers dos caches deste processo (preenchido por src/utils/cache.py). Recebem os
+# eventos no commit da sessão que publicou: fora do PostgreSQL (ex.: SQLite em
+# desenvolvimento) é a única entrega; no PostgreSQL evita que o próprio worker sirva o
+# valor antigo até o NOTIFY voltar pelo ouvinte
+entrega_local = []
+
+PENDENTES = "invalidacoes_pendentes"
+
+def publicar(db: Session, tipo: str, chaves: Iterable[Any] = (None,)) -> None:
+    """
+    Publica um evento por chave na transação da sessão (use a mesma sessão da escrita).
+    """
+    chaves = [str(chave) if chave is not None else None for chave in chaves]
+    db.info.setdefault(PENDENTES, []).extend((tipo, chave) for chave in chaves)
+
+    if db.get_bind().dialect.name != "postgresql":
+        return
+
+    # Sempre no primário: numa sessão de leitura (database/Replicas.py) o SELECT iria para a réplica
+    for chave in chaves:
+        db.execute(
+            text("SELECT pg_notify(:canal, :payload)"),
+            {"canal": CANAL_INVALIDACAO, "payload": montar_payload(tipo, chave)},
+            bind_arguments={"primario": True}
+        )
+
+@event.listens_for(Session, "after_commit")
+def entregar_pendentes(session: Session) -> None:
+    for tipo, chave in session.info.pop(PENDENTES, ()):
+        for entregar in entrega_local:
+            try:
+                entregar(tipo, chave)
+            except Exception as e:
+                logger.error(f"Erro ao invalidar cache local ({tipo}, {chave}): {str(e)}")
+
+@event.listens_for(Session, "after_rollback")
+def descartar_pendentes(session: Session) -> None:
+    session.info.pop(PENDENTES, None)
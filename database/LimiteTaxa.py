@@ -0,0 +1,26 @@
+"""
+Limite de taxa compartilhado pelo banco (tabela limites_taxa).
+
+Cada chamada reserva o próximo horário livre do recurso, atomicamente em uma linha:
+o horário avança um intervalo por chamada, então N processos em qualquer máquina
+juntos não passam de 1/intervalo chamadas por segundo, e quem reservou só espera
+até o seu horário. Não há rajada acumulada: um recurso parado recomeça do agora.
+
+Usado por psycopg2 nos jobs (conexão em autocommit: a linha fica bloqueada só
+durante o UPDATE), como database/Bloqueios.py.
+"""
+
+RESERVE_QUERY = """
+INSERT INTO limites_taxa (nome, proxima_chamada)
+VALUES (%(nome)s, clock_timestamp() + %(intervalo)s * INTERVAL '1 second')
+ON CONFLICT (nome) DO UPDATE SET
+    proxima_chamada = GREATEST(limites_taxa.proxima_chamada, clock_timestamp()) + %(intervalo)s * INTERVAL '1 second'
+RETURNING EXTRACT(EPOCH FROM (proxima_chamada - clock_timestamp()))::float - %(intervalo)s
+"""
+
+def reservar_chamada(cursor, nome: str, intervalo: float) -> float:
+    """
+    Reserva a próxima chamada do recurso. Returns: segundos a esperar antes de chamar
+    """
+    cursor.execute(RESERVE_QUERY, {"nome": nome, "intervalo": intervalo})
+    return max(0.0, cursor.fetchone()[0])
@@ -0,0 +1,497 @@
+"""
+Particionamento de funcionarios, exames e atestados por codigo_empresa (PostgreSQL).
+
+    status   - mostra se as tabelas já estão particionadas e o tamanho de cada partição
+    plan     - mostra o SQL da migração sem executar nada
+    migrate  - converte as tabelas atuais em tabelas particionadas
+    verify   - roda EXPLAIN nas consultas da API e da importação e confere se o
+               planejador lê uma única partição de cada tabela
+
+Esquema: LIST (codigo_empresa), com uma partição própria para cada empresa grande
+(--dedicated / --dedicated-share) e uma partição DEFAULT subdividida por
+HASH (codigo_empresa) em --buckets partições para as demais. As três tabelas usam o
+mesmo esquema, então os dados de uma empresa ficam em partições equivalentes.
+
+Consequências no esquema (por exigência do PostgreSQL, toda chave única precisa
+conter a chave de partição):
+    - a chave primária passa a ser (id, codigo_empresa)
+    - o CPF passa a ser único por empresa: (codigo_empresa, cpf)
+    - exames e atestados referenciam funcionarios por (funcionario_id, codigo_empresa)
+    - codigo_empresa passa a ser NOT NULL nas três tabelas
+
+A migração roda em uma única transação: as tabelas atuais ficam com lock SHARE
+durante a cópia (leituras continuam, importações esperam) e a troca de nomes no
+final é instantânea. Antes da troca, o lock ACCESS EXCLUSIVE é pedido à parte, em um
+SAVEPOINT: se uma leitura estiver em andamento e o lock_timeout estourar, só essa
+tentativa é desfeita e o pedido se repete (--swap-retries), sem perder a cópia. As tabelas antigas ficam como <tabela>_legado para conferência
+e rollback; remova-as manualmente (DROP TABLE ... _legado) depois de validar.
+
+Uso:
+    python database/ParticionarFuncionarios.py status
+    python database/ParticionarFuncionarios.py plan --buckets 16 --dedicated 1001 1002
+    python database/ParticionarFuncionarios.py migrate --yes
+    python database/ParticionarFuncionarios.py verify --empresa 1001
+"""
+
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.append(str(ROOT_DIR))
+
+from sqlalchemy import text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.exc import OperationalError
+
+from database.Engine import engine
+from database.Base import Base, criado_no_postgresql
+import models.all_models  # noqa: F401 - registra todas as tabelas em Base.metadata
+
+CHAVE_PARTICAO = "codigo_empresa"
+
+# Pai primeiro: exames e atestados referenciam funcionarios
+TABELAS = ("funcionarios", "exames", "atestados")
+
+SUFIXO_NOVA = "_particionada"
+SUFIXO_LEGADO = "_legado"
+SUFIXO_TEMPORARIO = "_novo"
+
+# Limite de identificadores do PostgreSQL (NAMEDATALEN - 1)
+TAMANHO_MAXIMO_NOME = 63
+
+TABLE_KIND_QUERY = """
+SELECT relkind FROM pg_class
+WHERE relname = :tabela AND relnamespace = current_schema()::regnamespace
+"""
+
+PARTITIONS_QUERY = """
+SELECT
+    c.relname AS particao,
+    coalesce(pg_get_expr(c.relpartbound, c.oid), '') AS limite,
+    greatest(c.reltuples, 0)::bigint AS linhas,
+    pg_total_relation_size(c.oid) AS tamanho
+FROM pg_partition_tree(CAST(:tabela AS regclass)) pt
+JOIN pg_class c ON c.oid = pt.relid
+WHERE pt.isleaf
+ORDER BY c.relname
+"""
+
+PARTITION_ROOTS_QUERY = """
+SELECT c.relname AS particao, pg_partition_root(c.oid)::regclass::text AS raiz
+FROM pg_class c
+WHERE c.relispartition AND c.relnamespace = current_schema()::regnamespace
+"""
+
+TABLE_INDEXES_QUERY = """
+SELECT i.relname AS indice
+FROM pg_index ix
+JOIN pg_class i ON i.oid = ix.indexrelid
+WHERE ix.indrelid = CAST(:tabela AS regclass)
+ORDER BY i.relname
+"""
+
+FOREIGN_KEYS_QUERY = """
+SELECT
+    c.conname AS constraint_nome,
+    c.confrelid::regclass::text AS referenciada,
+    pg_get_constraintdef(c.oid) AS definicao,
+    array(
+        SELECT a.attname
+        FROM unnest(c.conkey) WITH ORDINALITY AS k(attnum, ordem)
+        JOIN pg_attribute a ON a.attrelid = c.conrelid AND a.attnum = k.attnum
+        ORDER BY k.ordem
+    ) AS colunas,
+    array(
+        SELECT a.attname
+        FROM unnest(c.confkey) WITH ORDINALITY AS k(attnum, ordem)
+        JOIN pg_attribute a ON a.attrelid = c.confrelid AND a.attnum = k.attnum
+        ORDER BY k.ordem
+    ) AS colunas_referenciadas
+FROM pg_constraint c
+WHERE c.conrelid = CAST(:tabela AS regclass) AND c.contype = 'f'
+ORDER BY c.conname
+"""
+
+TENANT_SIZES_QUERY = """
+SELECT codigo_empresa, count(*) AS linhas
+FROM funcionarios
+GROUP BY codigo_empresa
+ORDER BY linhas DESC
+"""
+
+# Consultas conferidas pelo verify. Mantêm o mesmo formato das consultas da API
+# (src/funcionarios/FuncionariosRoutes.py) e da importação (jobs/ImportarFuncionarios.py)
+CONSULTAS_VERIFICADAS = {
+    "listagem (count)": "SELECT count(*) FROM funcionarios WHERE codigo_empresa = :codigo_empresa",
+    "listagem (página)": """
+        SELECT id, nome, codigo, cpf FROM funcionarios
+        WHERE codigo_empresa = :codigo_empresa
+        ORDER BY nome, id LIMIT 20 OFFSET 0
+    """,
+    "listagem (busca)": """
+        SELECT id, nome FROM funcionarios
+        WHERE codigo_empresa = :codigo_empresa
+          AND (nome ILIKE '%a%' OR cpf ILIKE '%a%' OR matricula_funcionario ILIKE '%a%')
+        ORDER BY nome, id LIMIT 20
+    """,
+    "detalhe": "SELECT * FROM funcionarios WHERE id = :funcionario_id AND codigo_empresa = :codigo_empresa",
+    "importação (busca)": """
+        SELECT id FROM funcionarios
+        WHERE codigo_empresa = :codigo_empresa
+          AND ((cpf = :cpf AND cpf != '') OR codigo = :codigo)
+    """,
+    "importação (update)": """
+        UPDATE funcionarios SET nome = nome
+        WHERE id = :funcionario_id AND codigo_empresa = :codigo_empresa
+    """,
+    "exames do funcionário": """
+        SELECT * FROM exames
+        WHERE codigo_empresa = :codigo_empresa AND funcionario_id = :funcionario_id
+    """,
+    "atestados do funcionário": """
+        SELECT * FROM atestados
+        WHERE codigo_empresa = :codigo_empresa AND funcionario_id = :funcionario_id
+    """,
+}
+
+def nome_limitado(nome):
+    return nome[:TAMANHO_MAXIMO_NOME]
+
+def tipo_tabela(conn, tabela):
+    # 'r' tabela comum, 'p' particionada, None inexistente
+    return conn.execute(text(TABLE_KIND_QUERY), {"tabela": tabela}).scalar()
+
+def escolher_dedicadas(conn, dedicadas, dedicated_share):
+    """
+    Empresas com partição própria: as informadas em --dedicated mais as que têm pelo
+    menos dedicated_share do total de funcionários.
+    """
+    escolhidas = set(dedicadas or [])
+    if dedicated_share and dedicated_share > 0:
+        tamanhos = [dict(linha._mapping) for linha in conn.execute(text(TENANT_SIZES_QUERY))]
+        total = sum(linha["linhas"] for linha in tamanhos)
+        for linha in tamanhos:
+            if linha["codigo_empresa"] is not None and total and linha["linhas"] / total >= dedicated_share:
+                escolhidas.add(int(linha["codigo_empresa"]))
+    return sorted(escolhidas)
+
+def verificar_pre_condicoes(conn):
+    """
+    Returns:
+        Lista de problemas que impedem a migração (vazia se está tudo certo)
+    """
+    problemas = []
+    for tabela in TABELAS:
+        tipo = tipo_tabela(conn, tabela)
+        if tipo is None:
+            problemas.append(f"{tabela} não existe (rode database/CreateTables.py antes)")
+            continue
+        if tipo == "p":
+            problemas.append(f"{tabela} já é particionada")
+            continue
+        for sufixo in (SUFIXO_NOVA, SUFIXO_LEGADO):
+            if tipo_tabela(conn, f"{tabela}{sufixo}") is not None:
+                problemas.append(f"{tabela}{sufixo} já existe (migração anterior incompleta ou legado não removido)")
+        nulos = conn.execute(text(f"SELECT count(*) FROM {tabela} WHERE {CHAVE_PARTICAO} IS NULL")).scalar()
+        if nulos:
+            problemas.append(f"{tabela}: {nulos} linhas com {CHAVE_PARTICAO} nulo")
+    if problemas:
+        return problemas
+
+    # Filhos precisam estar na mesma empresa do funcionário para a chave estrangeira composta
+    for tabela in TABELAS[1:]:
+        divergentes = conn.execute(text(f"""
+            SELECT count(*) FROM {tabela} t
+            JOIN funcionarios f ON f.id = t.funcionario_id
+            WHERE t.{CHAVE_PARTICAO} IS DISTINCT FROM f.{CHAVE_PARTICAO}
+        """)).scalar()
+        if divergentes:
+            problemas.append(f"{tabela}: {divergentes} linhas com {CHAVE_PARTICAO} diferente do funcionário")
+    return problemas
+
+def sql_particoes(tabela, dedicadas, buckets):
+    nova = f"{tabela}{SUFIXO_NOVA}"
+    comandos = [
+        f"CREATE TABLE {nova} (LIKE {tabela} INCLUDING DEFAULTS INCLUDING STORAGE INCLUDING COMMENTS) "
+        f"PARTITION BY LIST ({CHAVE_PARTICAO})",
+        f"ALTER TABLE {nova} ALTER COLUMN {CHAVE_PARTICAO} SET NOT NULL",
+    ]
+    for codigo in dedicadas:
+        comandos.append(f"CREATE TABLE {nome_limitado(f'{tabela}_e{codigo}')} PARTITION OF {nova} FOR VALUES IN ({codigo})")
+    demais = f"{tabela}_demais"
+    comandos.append(f"CREATE TABLE {demais} PARTITION OF {nova} DEFAULT PARTITION BY HASH ({CHAVE_PARTICAO})")
+    for resto in range(buckets):
+        comandos.append(
+            f"CREATE TABLE {tabela}_h{resto:02d} PARTITION OF {demais} "
+            f"FOR VALUES WITH (MODULUS {buckets}, REMAINDER {resto})"
+        )
+    return comandos
+
+def sql_indices(tabela):
+    """
+    Chave primária e índices declarados no modelo, criados com nomes temporários
+    (os nomes definitivos ainda pertencem à tabela atual até a troca).
+
+    Returns:
+        (comandos, renomeações [(temporário, definitivo)])
+    """
+    nova = f"{tabela}{SUFIXO_NOVA}"
+    pk = f"{tabela}_pkey"
+    comandos = [
+        f"ALTER TABLE {nova} ADD CONSTRAINT {nome_limitado(pk + SUFIXO_TEMPORARIO)} PRIMARY KEY (id, {CHAVE_PARTICAO})"
+    ]
+    renomear = [(nome_limitado(pk + SUFIXO_TEMPORARIO), pk)]
+
+    indices = [indice for indice in Base.metadata.tables[tabela].indexes if criado_no_postgresql(indice)]
+    for indice in sorted(indices, key=lambda i: i.name):
+        # Expressões compiladas para manter a ordem declarada (ex.: DESC NULLS LAST)
+        colunas = [
+            str(expressao.compile(dialect=postgresql.dialect(), compile_kwargs={"include_table": False}))
+            for expressao in indice.expressions
+        ]
+        # Índice único em tabela particionada precisa conter a chave de partição
+        if indice.unique and CHAVE_PARTICAO not in colunas:
+            colunas = [CHAVE_PARTICAO] + colunas
+        temporario = nome_limitado(indice.name + SUFIXO_TEMPORARIO)
+        unico = "UNIQUE " if indice.unique else ""
+        comandos.append(f"CREATE {unico}INDEX {temporario} ON {nova} ({', '.join(colunas)})")
+        renomear.append((temporario, indice.name))
+    return comandos, renomear
+
+def sql_chaves_estrangeiras(conn, tabela):
+    nova = f"{tabela}{SUFIXO_NOVA}"
+    comandos = []
+    for fk in conn.execute(text(FOREIGN_KEYS_QUERY), {"tabela": tabela}):
+        if fk.referenciada in TABELAS:
+            # Referência a outra tabela particionada: inclui a chave de partição dos dois lados
+            colunas = list(fk.colunas) + [CHAVE_PARTICAO]
+            referenciadas = list(fk.colunas_referenciadas) + [CHAVE_PARTICAO]
+            definicao = (f"FOREIGN KEY ({', '.join(colunas)}) "
+                         f"REFERENCES {fk.referenciada}{SUFIXO_NOVA} ({', '.join(referenciadas)})")
+        else:
+            definicao = fk.definicao
+        comandos.append(f"ALTER TABLE {nova} ADD CONSTRAINT {fk.constraint_nome} {definicao}")
+    return comandos
+
+def sql_troca(conn, tabela, renomear):
+    """
+    Tabela atual (e seus índices) recebem o sufixo _legado; a particionada assume os nomes.
+    """
+    comandos = [f"ALTER TABLE {tabela} RENAME TO {tabela}{SUFIXO_LEGADO}"]
+    for linha in conn.execute(text(TABLE_INDEXES_QUERY), {"tabela": tabela}):
+        # Renomear o índice de uma constraint (PK, UNIQUE) renomeia a constraint junto
+        comandos.append(f"ALTER INDEX {linha.indice} RENAME TO {nome_limitado(linha.indice + SUFIXO_LEGADO)}")
+    comandos.append(f"ALTER TABLE {tabela}{SUFIXO_NOVA} RENAME TO {tabela}")
+    for temporario, definitivo in renomear:
+        comandos.append(f"ALTER INDEX {temporario} RENAME TO {definitivo}")
+    return comandos
+
+def planejar(conn, dedicadas, buckets):
+    """
+    Returns:
+        Lista de (etapa, sql) na ordem de execução
+    """
+    plano = []
+    renomeacoes = {}
+    for tabela in TABELAS:
+        plano += [("estrutura", sql) for sql in sql_particoes(tabela, dedicadas, buckets)]
+    for tabela in TABELAS:
+        # Índices e chaves depois da cópia: inserir em tabela sem índices é bem mais rápido
+        plano.append(("cópia", f"INSERT INTO {tabela}{SUFIXO_NOVA} SELECT * FROM {tabela}"))
+    for tabela in TABELAS:
+        comandos, renomeacoes[tabela] = sql_indices(tabela)
+        plano += [("índices", sql) for sql in comandos]
+    for tabela in TABELAS:
+        plano += [("chaves estrangeiras", sql) for sql in sql_chaves_estrangeiras(conn, tabela)]
+    for tabela in TABELAS:
+        plano += [("troca", sql) for sql in sql_troca(conn, tabela, renomeacoes[tabela])]
+    return plano
+
+def imprimir_plano(plano, dedicadas, buckets):
+    print(f"-- Partições dedicadas: {', '.join(map(str, dedicadas)) or 'nenhuma'}; demais empresas em {buckets} partições hash")
+    etapa_atual = None
+    for etapa, sql in plano:
+        if etapa != etapa_atual:
+            print(f"\n-- {etapa}")
+            etapa_atual = etapa
+        print(f"{sql};")
+
+# lock_not_available: o lock_timeout estourou
+LOCK_NOT_AVAILABLE = "55P03"
+
+def bloquear_para_troca(conn, tentativas, espera):
+    """
+    ACCESS EXCLUSIVE nas tabelas atuais para a troca de nomes, na mesma transação da cópia.
+    Cada tentativa fica em um SAVEPOINT: um lock_timeout desfaz só a tentativa.
+    """
+    for tentativa in range(1, tentativas + 1):
+        savepoint = conn.begin_nested()
+        try:
+            conn.execute(text(f"LOCK TABLE {', '.join(TABELAS)} IN ACCESS EXCLUSIVE MODE"))
+        except OperationalError as e:
+            savepoint.rollback()
+            if getattr(e.orig, "pgcode", None) != LOCK_NOT_AVAILABLE or tentativa == tentativas:
+                raise
+            print(f"⏳ Tabelas em uso, lock da troca não obtido (tentativa {tentativa}/{tentativas}); nova tentativa em {espera}s")
+            time.sleep(espera)
+        else:
+            # Liberar o savepoint mantém o lock até o fim da transação
+            savepoint.commit()
+            return
+
+def migrar(plano, lock_timeout, tentativas_troca=60, espera_troca=5.0):
+    with engine.connect() as conn:
+        with conn.begin():
+            conn.execute(text("SET LOCAL statement_timeout = 0"))
+            # lock_timeout evita que a espera pelo lock enfileire as consultas da aplicação atrás da migração
+            conn.execute(text(f"SET LOCAL lock_timeout = '{lock_timeout}'"))
+            # SHARE: leituras continuam durante a cópia; escritas esperam o fim da migração
+            conn.execute(text(f"LOCK TABLE {', '.join(TABELAS)} IN SHARE MODE"))
+            etapa_atual = None
+            for etapa, sql in plano:
+                if etapa != etapa_atual:
+                    print(f"▶️  {etapa}")
+                    etapa_atual = etapa
+                    if etapa == "troca":
+                        bloquear_para_troca(conn, tentativas_troca, espera_troca)
+                conn.execute(text(sql))
+
+    # Estatísticas das partições novas (ANALYZE na tabela particionada inclui as partições)
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        for tabela in TABELAS:
+            conn.execute(text(f"ANALYZE {tabela}"))
+
+def imprimir_status(conn):
+    for tabela in TABELAS:
+        tipo = tipo_tabela(conn, tabela)
+        if tipo is None:
+            print(f"❔ {tabela}: não existe")
+            continue
+        if tipo != "p":
+            print(f"📄 {tabela}: não particionada")
+            continue
+        particoes = [dict(linha._mapping) for linha in conn.execute(text(PARTITIONS_QUERY), {"tabela": tabela})]
+        print(f"🧩 {tabela}: particionada por {CHAVE_PARTICAO}, {len(particoes)} partições")
+        for particao in particoes:
+            print(f"    {particao['particao']:<28} {particao['limite']:<48} "
+                  f"~{particao['linhas']} linhas, {particao['tamanho'] // 1024} kB")
+        legado = f"{tabela}{SUFIXO_LEGADO}"
+        if tipo_tabela(conn, legado) is not None:
+            print(f"    ⚠️  {legado} ainda existe (DROP TABLE {legado} depois de validar)")
+
+def relacoes_do_plano(no):
+    """
+    Nomes das relações lidas em um plano do EXPLAIN (FORMAT JSON).
+    """
+    relacoes = []
+    if "Relation Name" in no:
+        relacoes.append(no["Relation Name"])
+    for filho in no.get("Plans", []):
+        relacoes += relacoes_do_plano(filho)
+    return relacoes
+
+def verificar_poda(empresa):
+    """
+    Roda EXPLAIN de cada consulta em CONSULTAS_VERIFICADAS e confere se cada tabela
+    particionada aparece com uma única partição no plano.
+
+    Returns:
+        True se todas as consultas podam as partições
+    """
+    with engine.connect() as conn:
+        particionadas = [tabela for tabela in TABELAS if tipo_tabela(conn, tabela) == "p"]
+        if not particionadas:
+            print("❌ Nenhuma tabela particionada: rode o migrate antes do verify")
+            return False
+        raizes = {linha.particao: linha.raiz for linha in conn.execute(text(PARTITION_ROOTS_QUERY))}
+
+        filtro = "WHERE codigo_empresa = :empresa" if empresa is not None else ""
+        exemplo = conn.execute(
+            text(f"SELECT id, codigo_empresa, cpf, codigo FROM funcionarios {filtro} LIMIT 1"),
+            {"empresa": empresa}
+        ).first()
+        if not exemplo:
+            print("❌ Nenhum funcionário encontrado para usar nas consultas")
+            return False
+        parametros = {
+            "codigo_empresa": exemplo.codigo_empresa,
+            "funcionario_id": exemplo.id,
+            "cpf": exemplo.cpf or "",
+            "codigo": exemplo.codigo or 0,
+        }
+        print(f"Empresa {exemplo.codigo_empresa}, funcionário {exemplo.id}\n")
+
+        todas_podadas = True
+        for nome, sql in CONSULTAS_VERIFICADAS.items():
+            plano = conn.execute(text(f"EXPLAIN (FORMAT JSON) {sql}"), parametros).scalar()
+            if isinstance(plano, str):
+                plano = json.loads(plano)
+            lidas = {}
+            for relacao in relacoes_do_plano(plano[0]["Plan"]):
+                raiz = raizes.get(relacao)
+                if raiz:
+                    lidas.setdefault(raiz, set()).add(relacao)
+            podada = all(len(particoes) == 1 for particoes in lidas.values())
+            todas_podadas = todas_podadas and podada
+            detalhes = "; ".join(f"{raiz} → {', '.join(sorted(particoes))}" for raiz, particoes in sorted(lidas.items()))
+            print(f"{'✅' if podada else '❌'} {nome}: {detalhes or 'nenhuma partição lida'}")
+        # EXPLAIN sem ANALYZE não executa o UPDATE; o rollback é só por garantia
+        conn.rollback()
+    return todas_podadas
+
+def main():
+    parser = argparse.ArgumentParser(description="Particionamento de funcionarios, exames e atestados por codigo_empresa")
+    parser.add_argument("comando", choices=["status", "plan", "migrate", "verify"])
+    parser.add_argument("--buckets", type=int, default=16, help="Partições hash para as empresas sem partição própria (padrão: 16)")
+    parser.add_argument("--dedicated", type=int, nargs="+", help="Códigos de empresa com partição própria")
+    parser.add_argument("--dedicated-share", type=float, default=0.10,
+                        help="Dá partição própria às empresas com pelo menos esta fração dos funcionários (padrão: 0.10; 0 desliga)")
+    parser.add_argument("--empresa", type=int, help="Empresa usada nas consultas do verify (padrão: qualquer uma)")
+    parser.add_argument("--lock-timeout", default="5s", help="lock_timeout da migração (padrão: 5s)")
+    parser.add_argument("--swap-retries", type=int, default=60,
+                        help="Tentativas de obter o lock da troca de nomes, cada uma limitada pelo --lock-timeout (padrão: 60)")
+    parser.add_argument("--swap-retry-wait", type=float, default=5.0, help="Espera entre as tentativas, em segundos (padrão: 5)")
+    parser.add_argument("--yes", action="store_true", help="Confirma a execução do migrate")
+    args = parser.parse_args()
+
+    if engine.dialect.name != "postgresql":
+        print(f"❌ Ferramenta específica do PostgreSQL (banco atual: {engine.dialect.name})")
+        sys.exit(2)
+    if args.buckets < 1:
+        parser.error("--buckets precisa ser maior que zero")
+
+    if args.comando == "status":
+        with engine.connect() as conn:
+            imprimir_status(conn)
+        return
+
+    if args.comando == "verify":
+        if not verificar_poda(args.empresa):
+            sys.exit(1)
+        return
+
+    with engine.connect() as conn:
+        problemas = verificar_pre_condicoes(conn)
+        if problemas:
+            print("❌ Migração não pode ser feita:")
+            for problema in problemas:
+                print(f"  - {problema}")
+            sys.exit(1)
+        dedicadas = escolher_dedicadas(conn, args.dedicated, args.dedicated_share)
+        plano = planejar(conn, dedicadas, args.buckets)
+
+    imprimir_plano(plano, dedicadas, args.buckets)
+
+    if args.comando == "migrate":
+        if not args.yes:
+            print("\nNada foi executado: use --yes para migrar.")
+            sys.exit(1)
+        print()
+        migrar(plano, args.lock_timeout, args.swap_retries, args.swap_retry_wait)
+        print("✅ Tabelas particionadas; confira com o verify e remova as tabelas _legado depois de validar")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""
+Roteamento de leituras para réplicas do PostgreSQL (opcional).
+
+EXTERNAL_URL_DB_REPLICAS lista as URLs das réplicas, separadas por vírgula. As rotas
+só de leitura usam get_read_db (database/Dependencias.py), que abre uma SessaoRoteada:
+leituras vão para uma réplica e escritas (flush, INSERT/UPDATE/DELETE, SELECT ... FOR
+UPDATE) para o primário. Cai no primário quando:
+    - nenhuma réplica está configurada ou disponível
+    - o lag da réplica passa de REPLICA_MAX_LAG_SECONDS
+    - o usuário escreveu no primário há menos de REPLICA_PIN_SECONDS (cookie gravado
+      pelo ReplicaRoutingMiddleware), para ele ler o que acabou de gravar
+"""
+
+import os
+import time
+import logging
+import threading
+import itertools
+from contextvars import ContextVar
+from typing import Optional, Dict, Any
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.sql.dml import UpdateBase
+
+from database.Engine import engine, replica_engines
+
+logger = logging.getLogger("replicas")
+
+REPLICA_MAX_LAG_SECONDS = float(os.getenv("REPLICA_MAX_LAG_SECONDS", "5"))
+REPLICA_LAG_CHECK_INTERVAL = float(os.getenv("REPLICA_LAG_CHECK_INTERVAL", "2"))
+REPLICA_PIN_SECONDS = int(os.getenv("REPLICA_PIN_SECONDS", "15"))
+
+# Réplica sem WAL pendente está em dia mesmo sem transações recentes no primário
+# (pg_last_xact_replay_timestamp sozinho cresce sem parar num primário ocioso)
+REPLICA_LAG_QUERY = """
+SELECT CASE
+    WHEN NOT pg_is_in_recovery() THEN 0
+    WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+    ELSE coalesce(extract(epoch FROM now() - pg_last_xact_replay_timestamp()), 0)
+END
+"""
+
+class EstadoRoteamento:
+    """
+    Estado de roteamento de uma requisição (preenchido pelo ReplicaRoutingMiddleware).
+    """
+    __slots__ = ("fixar_primario", "escreveu")
+
+    def __init__(self, fixar_primario: bool = False):
+        self.fixar_primario = fixar_primario
+        self.escreveu = False
+
+# O objeto é mutável, então rotas e dependências síncronas (threadpool) também o atualizam
+roteamento_requisicao: ContextVar[Optional[EstadoRoteamento]] = ContextVar("roteamento_requisicao", default=None)
+
+lock = threading.Lock()
+estatisticas = {
+    "sessoes_replica": 0,
+    "sessoes_primario_fixadas": 0,
+    "sessoes_primario_sem_replica": 0,
+    "falhas_verificacao_lag": 0,
+}
+
+def contar(chave: str) -> None:
+    with lock:
+        estatisticas[chave] += 1
+
+def medir_lag(replica_engine: Engine) -> float:
+    if replica_engine.dialect.name != "postgresql":
+        return 0.0
+    with replica_engine.connect() as conn:
+        return float(conn.execute(text(REPLICA_LAG_QUERY)).scalar() or 0)
+
+class Replica:
+    """
+    Réplica com o último lag medido. A medição é refeita a cada REPLICA_LAG_CHECK_INTERVAL
+    por uma única thread; as demais usam o último valor em vez de esperar.
+    """
+    def __init__(self, replica_engine: Engine):
+        self.engine = replica_engine
+        self.lag: Optional[float] = None  # None: indisponível ou ainda não medida
+        self.verificada_em = float("-inf")
+        self._lock = threading.Lock()
+
+    def lag_atual(self) -> Optional[float]:
+        if time.monotonic() - self.verificada_em >= REPLICA_LAG_CHECK_INTERVAL and self._lock.acquire(blocking=False):
+            try:
+                self.lag = medir_lag(self.engine)
+            except Exception as e:
+                self.lag = None
+                contar("falhas_verificacao_lag")
+                logger.warning(f"Réplica {self.engine.url.host or self.engine.url} indisponível: {str(e).splitlines()[0]}")
+            finally:
+                self.verificada_em = time.monotonic()
+                self._lock.release()
+        return self.lag
+
+    def disponivel(self) -> bool:
+        lag = self.lag_atual()
+        return lag is not None and lag <= REPLICA_MAX_LAG_SECONDS
+
+class PoolReplicas:
+    """
+    Distribui as sessões de leitura entre as réplicas disponíveis (round-robin).
+    """
+    def __init__(self, engines):
+        self.replicas = [Replica(replica_engine) for replica_engine in engines]
+        self._ciclo = itertools.count()
+
+    def escolher(self) -> Optional[Engine]:
+        for _ in range(len(self.replicas)):
+            replica = self.replicas[next(self._ciclo) % len(self.replicas)]
+            if replica.disponivel():
+                return replica.engine
+        return None
+
+pool_replicas = PoolReplicas(replica_engines)
+
+class SessaoRoteada(Session):
+    """
+    Session que lê da réplica escolhida na criação e escreve no primário. Depois da
+    primeira escrita, tudo vai para o primário até a sessão fechar, para a própria
+    requisição enxergar o que gravou. bind_arguments={"primario": True} leva uma consulta
+    isolada ao primário (sessões comuns ignoram o argumento).
+    """
+    def __init__(self, replica: Optional[Engine] = None, **kwargs):
+        super().__init__(**kwargs)
+        self.replica = replica
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if self.replica is None or self.info.get("escreveu") or kwargs.get("primario"):
+            return engine
+        if self._flushing or isinstance(clause, UpdateBase) or getattr(clause, "_for_update_arg", None) is not None:
+            self.info["escreveu"] = True
+            return engine
+        return self.replica
+
+SessionLeitura = sessionmaker(class_=SessaoRoteada, autocommit=False, autoflush=False)
+
+def sessao_leitura() -> Session:
+    """
+    Abre a sessão de uma rota só de leitura (réplica quando possível, senão primário).
+    """
+    estado = roteamento_requisicao.get()
+    if estado is not None and estado.fixar_primario:
+        contar("sessoes_primario_fixadas")
+        return SessionLeitura(replica=None)
+
+    replica = pool_replicas.escolher()
+    contar("sessoes_replica" if replica is not None else "sessoes_primario_sem_replica")
+    return SessionLeitura(replica=replica)
+
+def registrar_escrita(conn, *args) -> None:
+    # Evento "commit" do engine primário: a requisição atual escreveu
+    estado = roteamento_requisicao.get()
+    if estado is not None:
+        estado.escreveu = True
+
+def metricas_replicas() -> Dict[str, Any]:
+    """
+    Contadores de roteamento e o último lag medido de cada réplica (-1 se indisponível).
+    """
+    with lock:
+        dados = dict(estatisticas)
+    dados["replicas"] = len(pool_replicas.replicas)
+    dados["replicas_disponiveis"] = sum(
+        1 for replica in pool_replicas.replicas
+        if replica.lag is not None and replica.lag <= REPLICA_MAX_LAG_SECONDS
+    )
+    for indice, replica in enumerate(pool_replicas.replicas):
+        dados[f"lag_segundos_{indice}"] = replica.lag if replica.lag is not None else -1
+    dados["max_lag_segundos"] = REPLICA_MAX_LAG_SECONDS
+    return dados
@@ -0,0 +1,333 @@
+"""
+SOC API client shared by the import jobs (ImportarEmpresas.py, ImportarFuncionarios.py).
+
+- One requests.Session: pooled keep-alive connections (one TLS handshake per
+  connection instead of one per call) and gzip-compressed responses
+- Separate connect/read timeouts and retries with jittered exponential backoff on
+  429, 5xx and any requests error (timeouts, connection, broken bodies; Retry-After is honored)
+- Circuit breaker: after SOC_CIRCUIT_FAILURES consecutive failed attempts, calls fail
+  immediately for SOC_CIRCUIT_RESET_SECONDS; then a single probe call decides
+- AIMD rate: the rate limiter starts at SOC_MAX_CALLS_PER_SECOND, gains SOC_RATE_STEP
+  calls/s per success up to SOC_RATE_CEILING and halves when SOC pushes back
+  (429/503/504, timeouts), down to SOC_RATE_FLOOR
+- One log line per call and a summary per job (calls, retries, latency, bytes, rate)
+
+Settings are read by client_from_env(), after the job has loaded .env.
+"""
+
+import os
+import json
+import time
+import random
+import logging
+import threading
+from collections import Counter, deque
+from urllib.parse import quote
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+# Retried; the THROTTLE ones also lower the rate
+RETRY_STATUS = {429, 500, 502, 503, 504}
+THROTTLE_STATUS = {429, 503, 504}
+
+class SocApiError(Exception):
+    def __init__(self, message, status_code=None):
+        super().__init__(message)
+        self.status_code = status_code
+
+class CircuitOpenError(SocApiError):
+    pass
+
+class RateLimiter:
+    def __init__(self, max_calls_per_second=3):
+        self.min_interval = 1.0 / max_calls_per_second
+        self.last_call_time = 0
+
+    def wait(self):
+        current_time = time.time()
+        elapsed = current_time - self.last_call_time
+
+        if elapsed < self.min_interval:
+            sleep_time = self.min_interval - elapsed
+            time.sleep(sleep_time)
+
+        self.last_call_time = time.time()
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold=5, reset_seconds=60):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+        self.times_opened = 0
+        self.lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_seconds:
+            return "half-open"
+        return "open"
+
+    def before_call(self):
+        with self.lock:
+            state = self.state
+            if state == "open" or (state == "half-open" and self.probing):
+                remaining = self.reset_seconds - (time.monotonic() - self.opened_at)
+                raise CircuitOpenError(f"SOC circuit open, next attempt in {max(0, remaining):.0f}s")
+            if state == "half-open":
+                self.probing = True
+
+    def record_success(self):
+        with self.lock:
+            if self.opened_at is not None:
+                logger.info("SOC circuit closed")
+            self.failures = 0
+            self.opened_at = None
+            self.probing = False
+
+    def release_probe(self):
+        with self.lock:
+            self.probing = False
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            # A failed probe reopens immediately
+            if self.probing or (self.opened_at is None and self.failures >= self.failure_threshold):
+                if not self.probing:
+                    self.times_opened += 1
+                    logger.warning(f"SOC circuit opened after {self.failures} consecutive failures")
+                self.opened_at = time.monotonic()
+                self.probing = False
+
+class SocClient:
+    def __init__(
+        self,
+        base_url,
+        codigo,
+        chave,
+        rate_limiter=None,
+        initial_rate=3.0,
+        rate_floor=0.5,
+        rate_ceiling=10.0,
+        rate_step=0.1,
+        max_retries=4,
+        backoff_base=1.0,
+        backoff_max=30.0,
+        connect_timeout=5.0,
+        read_timeout=60.0,
+        pool_size=4,
+        circuit_breaker=None,
+    ):
+        self.base_url = base_url.rstrip('/')
+        self.codigo = codigo
+        self.chave = chave
+        self.rate = initial_rate
+        self.rate_floor = rate_floor
+        self.rate_ceiling = max(rate_ceiling, initial_rate)
+        self.rate_step = rate_step
+        self.rate_limiter = rate_limiter or RateLimiter(max_calls_per_second=initial_rate)
+        self.rate_limiter.min_interval = 1.0 / self.rate
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = (connect_timeout, read_timeout)
+        self.circuit_breaker = circuit_breaker or CircuitBreaker()
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({"Accept-Encoding": "gzip, deflate", "Connection": "keep-alive"})
+
+        self.lock = threading.Lock()
+        self.outcomes = Counter()
+        self.calls = 0
+        self.retries = 0
+        self.bytes_decoded = 0
+        self.bytes_wire = 0
+        self.latencies = deque(maxlen=10000)
+
+    def close(self):
+        self.session.close()
+
+    def _adjust_rate(self, throttled):
+        with self.lock:
+            if throttled:
+                self.rate = max(self.rate_floor, self.rate / 2)
+            else:
+                self.rate = min(self.rate_ceiling, self.rate + self.rate_step)
+            self.rate_limiter.min_interval = 1.0 / self.rate
+
+    def _backoff(self, attempt, retry_after=None):
+        if retry_after is not None:
+            return min(self.backoff_max, retry_after)
+        # Full jitter: spreads the retries of concurrent workers
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def _record(self, outcome, elapsed, response=None):
+        with self.lock:
+            self.outcomes[outcome] += 1
+            self.latencies.append(elapsed)
+            if response is not None:
+                self.bytes_decoded += len(response.content)
+                try:
+                    # Bytes read from the socket, before decompression
+                    self.bytes_wire += response.raw.tell()
+                except Exception:
+                    self.bytes_wire += len(response.content)
+
+    def export(self, empresa, tipo_saida='json', extra_params=None, label=None):
+        """
+        Calls exportadados for a company.
+
+        Returns:
+            Parsed JSON (tipo_saida='json') or the response text
+
+        Raises:
+            CircuitOpenError when the circuit is open, SocApiError when SOC answers with an
+            error or the retries run out
+        """
+        params = {
+            'empresa': str(empresa),
+            'codigo': self.codigo,
+            'chave': self.chave,
+            'tipoSaida': tipo_saida,
+            **(extra_params or {})
+        }
+        quoted_params = quote(json.dumps(params, separators=(',', ':')))
+        url = f"{self.base_url}/exportadados?parametro={quoted_params}"
+        label = label or f"company {empresa}"
+
+        with self.lock:
+            self.calls += 1
+
+        attempt = 0
+        while True:
+            self.circuit_breaker.before_call()
+            try:
+                self.rate_limiter.wait()
+
+                start = time.perf_counter()
+                retry_after = None
+                try:
+                    response = self.session.get(url, timeout=self.timeout)
+                except requests.RequestException as e:
+                    # Timeouts and connection errors, but also broken or undecodable bodies and redirect loops
+                    elapsed = time.perf_counter() - start
+                    if isinstance(e, requests.Timeout):
+                        outcome = "timeout"
+                    elif isinstance(e, requests.ConnectionError):
+                        outcome = "connection_error"
+                    else:
+                        outcome = "request_error"
+                    self._record(outcome, elapsed)
+                    if isinstance(e, requests.Timeout):
+                        self._adjust_rate(throttled=True)
+                    # requests puts the URL (with the API key) in the message
+                    error = SocApiError(f"{outcome} calling SOC for {label}: {str(e).replace(quoted_params, '***')}")
+                else:
+                    elapsed = time.perf_counter() - start
+                    self._record(str(response.status_code), elapsed, response)
+                    logger.info(
+                        f"SOC {label}: {response.status_code} in {elapsed * 1000:.0f} ms, "
+                        f"{len(response.content)} bytes, attempt {attempt + 1}, rate {self.rate:.2f}/s"
+                    )
+
+                    if response.status_code == 200:
+                        self.circuit_breaker.record_success()
+                        self._adjust_rate(throttled=False)
+                        if tipo_saida == 'json':
+                            return response.json()
+                        return response.text
+
+                    error = SocApiError(f"API request failed: {response.status_code}", response.status_code)
+                    if response.status_code not in RETRY_STATUS:
+                        # Client error: SOC is up, retrying would not help
+                        self.circuit_breaker.record_success()
+                        raise error
+
+                    if response.status_code in THROTTLE_STATUS:
+                        self._adjust_rate(throttled=True)
+                    try:
+                        retry_after = float(response.headers.get("Retry-After"))
+                    except (TypeError, ValueError):
+                        retry_after = None
+
+                self.circuit_breaker.record_failure()
+            finally:
+                # Frees the half-open probe whatever happened (e.g. the rate limiter raised), so the
+                # next call can probe again instead of finding the circuit open forever
+                self.circuit_breaker.release_probe()
+
+            if attempt >= self.max_retries:
+                raise error
+
+            delay = self._backoff(attempt, retry_after)
+            attempt += 1
+            with self.lock:
+                self.retries += 1
+            logger.warning(f"{str(error)}; retry {attempt}/{self.max_retries} for {label} in {delay:.1f}s")
+            time.sleep(delay)
+
+    def metrics(self):
+        with self.lock:
+            latencies = sorted(self.latencies)
+
+            def percentile(pct):
+                if not latencies:
+                    return 0.0
+                return latencies[min(len(latencies) - 1, int(round(pct / 100 * len(latencies))) - 1)] * 1000
+
+            return {
+                "calls": self.calls,
+                "attempts": sum(self.outcomes.values()),
+                "retries": self.retries,
+                "outcomes": dict(self.outcomes),
+                "p50_ms": percentile(50),
+                "p95_ms": percentile(95),
+                "bytes_decoded": self.bytes_decoded,
+                "bytes_wire": self.bytes_wire,
+                "rate": self.rate,
+                "circuit": self.circuit_breaker.state,
+                "circuit_opened": self.circuit_breaker.times_opened,
+            }
+
+    def log_metrics(self):
+        m = self.metrics()
+        if not m["attempts"]:
+            return
+        outcomes = ", ".join(f"{key}: {value}" for key, value in sorted(m["outcomes"].items()))
+        logger.info(
+            f"SOC API: {m['calls']} calls, {m['attempts']} attempts ({outcomes}), {m['retries']} retries, "
+            f"p50 {m['p50_ms']:.0f} ms, p95 {m['p95_ms']:.0f} ms, "
+            f"{m['bytes_wire']} bytes on the wire ({m['bytes_decoded']} decoded), "
+            f"final rate {m['rate']:.2f}/s, circuit {m['circuit']} (opened {m['circuit_opened']} times)"
+        )
+
+def client_from_env(base_url, codigo, chave):
+    return SocClient(
+        base_url,
+        codigo,
+        chave,
+        initial_rate=float(os.getenv('SOC_MAX_CALLS_PER_SECOND', '3')),
+        rate_floor=float(os.getenv('SOC_RATE_FLOOR', '0.5')),
+        rate_ceiling=float(os.getenv('SOC_RATE_CEILING', '10')),
+        rate_step=float(os.getenv('SOC_RATE_STEP', '0.1')),
+        max_retries=int(os.getenv('SOC_MAX_RETRIES', '4')),
+        backoff_base=float(os.getenv('SOC_BACKOFF_BASE_SECONDS', '1')),
+        backoff_max=float(os.getenv('SOC_BACKOFF_MAX_SECONDS', '30')),
+        connect_timeout=float(os.getenv('SOC_CONNECT_TIMEOUT', '5')),
+        read_timeout=float(os.getenv('SOC_READ_TIMEOUT', '60')),
+        pool_size=int(os.getenv('SOC_POOL_SIZE', '4')),
+        circuit_breaker=CircuitBreaker(
+            failure_threshold=int(os.getenv('SOC_CIRCUIT_FAILURES', '5')),
+            reset_seconds=float(os.getenv('SOC_CIRCUIT_RESET_SECONDS', '60')),
+        ),
+    )
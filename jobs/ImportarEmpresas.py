@@ -13,16 +13,14 @@ Environment variables:
     SOC_EMPRESA - Enterprise code for API calls
     SOC_CODIGO - Code for API authentication
     SOC_CHAVE - API key for authentication
+    SOC_MAX_RETRIES, SOC_READ_TIMEOUT, SOC_CIRCUIT_FAILURES, ... - SOC client settings (jobs/ClienteSOC.py)
     DATABASE_URL or EXTERNAL_URL_DB - PostgreSQL connection string
 """
 
 import os
 import sys
-import json
 import uuid
 import logging
-import requests
-from urllib.parse import quote
 from datetime import datetime
 from dotenv import load_dotenv
 import psycopg2
@@ -32,6 +30,15 @@ from pathlib import Path
 # Get the script's directory path
 SCRIPT_DIR = Path(__file__).resolve().parent
 BASE_DIR = Path(SCRIPT_DIR).resolve().parent
+
+# Cache invalidation events for the API workers (database/Invalidacao.py)
+sys.path.append(str(BASE_DIR))
+from database.Invalidacao import notificar, EMPRESA_DADOS, DIRETORIO_EMPRESAS
+from database.Bloqueios import tentar_bloqueio, CODIGO_SAIDA_BLOQUEADO
+from jobs.ClienteSOC import client_from_env
+
+# Advisory lock name (database/Bloqueios.py): one company import at a time
+JOB_NAME = "empresas"
 LOG_DIR = BASE_DIR / "log"
 
 # Ensure logs directory exists (IMPORTANT: create this BEFORE setting up logging)
@@ -65,6 +72,9 @@ SOC_EMPRESA = os.getenv('SOC_EMPRESA', '423')
 SOC_CODIGO = os.getenv('SOC_CODIGO', '26625')
 SOC_CHAVE = os.getenv('SOC_CHAVE', '7e9da216f3bfda8c024b')
 
+# Keep-alive session, retries and circuit breaker (jobs/ClienteSOC.py)
+soc_client = client_from_env(SOC_API_URL, SOC_CODIGO, SOC_CHAVE)
+
 # Database configuration - handle multiple possible env var names
 DATABASE_URL = os.getenv('DATABASE_URL') or os.getenv('EXTERNAL_URL_DB')
 if not DATABASE_URL:
@@ -102,29 +112,10 @@ def get_company_data(tipo_saida='json'):
         raise ValueError("Missing API configuration")
     
     try:
-        # Create parameter string
-        params = {
-            'empresa': SOC_EMPRESA,
-            'codigo': SOC_CODIGO,
-            'chave': SOC_CHAVE,
-            'tipoSaida': tipo_saida
-        }
-        param_json = json.dumps(params, separators=(',', ':'))
-        quoted_param = quote(param_json)
-        
-        # Build URL
-        url = f"{SOC_API_URL}/exportadados?parametro={quoted_param}"
-        
-        logger.info(f"Fetching company data from API: {url}")
-        response = requests.get(url, timeout=30)
-        
-        if response.status_code != 200:
-            logger.error(f"API request failed with status code {response.status_code}")
-            logger.error(f"Response: {response.text}")
-            raise Exception(f"API request failed: {response.status_code}")
+        logger.info(f"Fetching company data from API for enterprise {SOC_EMPRESA}")
+        data = soc_client.export(SOC_EMPRESA, tipo_saida=tipo_saida, label=f"enterprise {SOC_EMPRESA}")
         
         if tipo_saida == 'json':
-            data = response.json()
             # Log structure information to help debugging
             logger.info(f"API response type: {type(data)}")
             if isinstance(data, dict):
@@ -133,8 +124,7 @@ def get_company_data(tipo_saida='json'):
                 logger.info(f"API response is a list with {len(data)} items")
                 if data and isinstance(data[0], dict):
                     logger.info(f"First item sample keys: {list(data[0].keys())[:5] if data[0] else []}")
-            return data
-        return response.text
+        return data
     
     except Exception as e:
         logger.error(f"Error fetching company data: {str(e)}")
@@ -202,8 +192,7 @@ def map_api_to_db_schema(api_data):
                     'cnpj': item.get('CNPJ', ''),
                     'inscricao_estadual': item.get('INSCRICAOESTADUAL', ''),
                     'inscricao_municipal': item.get('INSCRICAOMUNICIPAL', ''),
-                    'ativo': True,  # Convert string "1" to boolean True
-                    'usuario_id': None  # To be filled by application logic later
+                    'ativo': True  # Convert string "1" to boolean True
                 }
                 companies.append(company)
         
@@ -221,6 +210,19 @@ def map_api_to_db_schema(api_data):
                 logger.error(f"First item keys: {list(api_data[0].keys())}")
         raise
 
+# Bumps the directory version and every company's version used by the API ETags
+BUMP_DATA_VERSIONS_QUERY = """
+INSERT INTO versoes_dados (escopo, versao, dt_atualizacao)
+SELECT escopo, 1, NOW() FROM (
+    SELECT 'empresas' AS escopo
+    UNION ALL
+    SELECT 'empresa:' || id::text FROM empresas
+) escopos
+ON CONFLICT (escopo) DO UPDATE SET
+    versao = versoes_dados.versao + 1,
+    dt_atualizacao = NOW()
+"""
+
 def save_to_database(companies):
     """
     Save company data to database.
@@ -299,6 +301,13 @@ def save_to_database(companies):
                 logger.error(f"Error processing company {company['codigo']}: {str(e)}")
                 continue
         
+        # Invalidate API ETags computed before this import
+        if inserted or updated:
+            cursor.execute(BUMP_DATA_VERSIONS_QUERY)
+            # Delivered to the API workers on commit; no key means every company
+            notificar(cursor, DIRETORIO_EMPRESAS)
+            notificar(cursor, EMPRESA_DADOS)
+        
         connection.commit()
         logger.info(f"Database update completed: {inserted} inserted, {updated} updated, {errors} errors")
     
@@ -319,7 +328,15 @@ def main():
     start_time = datetime.now()
     logger.info(f"Company import job started at {start_time}")
     
+    lock_connection = None
     try:
+        # Session-level advisory lock held until this connection closes (also if the process dies)
+        lock_connection = psycopg2.connect(DATABASE_URL)
+        lock_connection.autocommit = True
+        if not tentar_bloqueio(lock_connection.cursor(), JOB_NAME):
+            logger.warning("Another company import is running, exiting")
+            sys.exit(CODIGO_SAIDA_BLOQUEADO)
+        
         # Fetch data from API
         api_data = get_company_data(tipo_saida='json')
         
@@ -336,6 +353,11 @@ def main():
     except Exception as e:
         logger.error(f"Import failed: {str(e)}")
         sys.exit(1)
+    finally:
+        soc_client.log_metrics()
+        soc_client.close()
+        if lock_connection is not None:
+            lock_connection.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
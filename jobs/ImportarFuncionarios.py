@@ -2,14 +2,14 @@
 
 import os
 import sys
-import json
 import uuid
 import logging
 import argparse
-import requests
 import time
+import socket
+import subprocess
 import concurrent.futures
-from urllib.parse import quote
+from functools import lru_cache
 from datetime import datetime
 from dotenv import load_dotenv
 import psycopg2
@@ -19,10 +19,26 @@ from pathlib import Path
 parser = argparse.ArgumentParser(description="Import employee data from SOC API")
 parser.add_argument("--all", action="store_true", help="Import all employees, including inactive ones")
 parser.add_argument("--empresa", type=str, help="Import employees for specific company code")
+# Distributed mode: workers on any host claim companies from the shared queue (database/FilaImportacao.py)
+mode = parser.add_mutually_exclusive_group()
+mode.add_argument("--enqueue", action="store_true", help="Queue the companies for workers and exit")
+mode.add_argument("--worker", action="store_true", help="Import queued companies until the queue is empty")
+mode.add_argument("--workers", type=int, metavar="N", help="Queue the companies and import them with N local worker processes")
 args = parser.parse_args()
 
 SCRIPT_DIR = Path(__file__).resolve().parent
 BASE_DIR = Path(SCRIPT_DIR).resolve().parent
+
+# Cache invalidation events for the API workers (database/Invalidacao.py)
+sys.path.append(str(BASE_DIR))
+from database.Invalidacao import notificar, EMPRESA_DADOS
+from database.Bloqueios import tentar_bloqueio, liberar_bloqueio, CODIGO_SAIDA_BLOQUEADO
+from database.FilaImportacao import enfileirar, reservar, concluir, falhar, devolver, pendencias, resumo
+from database.LimiteTaxa import reservar_chamada
+from jobs.ClienteSOC import client_from_env, CircuitOpenError
+
+# Advisory lock name: (JOB_NAME, 0) for a full run, (JOB_NAME, company code) per company
+JOB_NAME = "funcionarios"
 LOG_DIR = BASE_DIR / "log"
 LOG_DIR.mkdir(exist_ok=True)
 LOG_FILE = LOG_DIR / "employee_import.log"
@@ -47,6 +63,10 @@ else:
 SOC_API_URL = os.getenv('SOC_API_URL', 'https://ws1.soc.com.br/WebSoc')
 SOC_CODIGO = os.getenv('SOC_CODIGO', '25722')
 SOC_CHAVE = os.getenv('SOC_CHAVE', 'b4c740208036d64c467b')
+# Worker waiting for companies scheduled for a retry
+QUEUE_POLL_SECONDS = float(os.getenv('QUEUE_POLL_SECONDS', '15'))
+# Worker gives up (exit 1) when the SOC circuit stays open this long; never less than SOC_CIRCUIT_RESET_SECONDS
+QUEUE_MAX_OUTAGE_SECONDS = float(os.getenv('QUEUE_MAX_OUTAGE_SECONDS', '600'))
 
 DATABASE_URL = os.getenv('DATABASE_URL') or os.getenv('EXTERNAL_URL_DB')
 if not DATABASE_URL:
@@ -64,27 +84,64 @@ if DATABASE_URL:
 else:
     logger.warning("No database URL configured")
 
-class RateLimiter:
-    def __init__(self, max_calls_per_second=3):
+# Keep-alive session, retries, circuit breaker and adaptive rate (jobs/ClienteSOC.py)
+soc_client = client_from_env(SOC_API_URL, SOC_CODIGO, SOC_CHAVE)
+
+def get_database_connection():
+    if not DATABASE_URL:
+        raise ValueError("DATABASE_URL not configured")
+    return psycopg2.connect(DATABASE_URL)
+
+class DatabaseRateLimiter:
+    """Same interface as ClienteSOC.RateLimiter, but the limit is shared by every worker through limites_taxa"""
+    def __init__(self, name, max_calls_per_second=3):
+        self.name = name
         self.min_interval = 1.0 / max_calls_per_second
-        self.last_call_time = 0
+        self.connection = None
     
     def wait(self):
-        current_time = time.time()
-        elapsed = current_time - self.last_call_time
-        
-        if elapsed < self.min_interval:
-            sleep_time = self.min_interval - elapsed
-            time.sleep(sleep_time)
+        try:
+            if self.connection is None:
+                self.connection = get_database_connection()
+                self.connection.autocommit = True
+            delay = reservar_chamada(self.connection.cursor(), self.name, self.min_interval)
+        except psycopg2.Error:
+            # Reconnect on the next call; this company fails and is retried by the queue
+            if self.connection is not None:
+                self.connection.close()
+            self.connection = None
+            raise
         
-        self.last_call_time = time.time()
+        if delay > 0:
+            time.sleep(delay)
 
-api_rate_limiter = RateLimiter(max_calls_per_second=3)
+# funcionarios particionada por codigo_empresa (database/ParticionarFuncionarios.py): CPF é único por
+# empresa e as consultas levam codigo_empresa para o PostgreSQL ler só a partição da empresa
+PARTITIONED_TABLE_QUERY = "SELECT relkind = 'p' FROM pg_class WHERE oid = to_regclass('funcionarios')"
 
-def get_database_connection():
-    if not DATABASE_URL:
-        raise ValueError("DATABASE_URL not configured")
-    return psycopg2.connect(DATABASE_URL)
+FIND_EMPLOYEE_QUERY = """
+SELECT id FROM funcionarios 
+WHERE (cpf = %(cpf)s AND cpf != '') 
+OR (codigo = %(codigo)s AND codigo_empresa = %(codigo_empresa)s)
+"""
+
+FIND_EMPLOYEE_PARTITIONED_QUERY = """
+SELECT id FROM funcionarios
+WHERE codigo_empresa = %(codigo_empresa)s
+AND ((cpf = %(cpf)s AND cpf != '') OR codigo = %(codigo)s)
+"""
+
+@lru_cache(maxsize=1)
+def is_employees_table_partitioned():
+    connection = get_database_connection()
+    try:
+        cursor = connection.cursor()
+        cursor.execute(PARTITIONED_TABLE_QUERY)
+        row = cursor.fetchone()
+        cursor.close()
+        return bool(row and row[0])
+    finally:
+        connection.close()
 
 def get_companies_from_db(company_code=None):
     if not DATABASE_URL:
@@ -121,37 +178,19 @@ def get_employee_data(company_code, tipo_saida='json', include_inactive=False):
         raise ValueError("Missing API configuration")
     
     try:
-        api_rate_limiter.wait()
-        
         params = {
-            'empresa': str(company_code),
-            'codigo': SOC_CODIGO,
-            'chave': SOC_CHAVE,
-            'tipoSaida': tipo_saida,
             "ativo": "Sim",
             "inativo": "",
             "afastado": "Sim",
             "pendente": "Sim",
             "ferias": "Sim"
         }
-
-        param_json = json.dumps(params, separators=(',', ':'))
-        quoted_param = quote(param_json)
-        
-        url = f"{SOC_API_URL}/exportadados?parametro={quoted_param}"
-        logger.info(f"Fetching employee data from API for company {company_code}")
         
-        response = requests.get(url, timeout=60)
+        data = soc_client.export(company_code, tipo_saida=tipo_saida, extra_params=params)
         
-        if response.status_code != 200:
-            raise Exception(f"API request failed: {response.status_code}")
-        
-        if tipo_saida == 'json':
-            data = response.json()
-            if isinstance(data, list):
-                logger.info(f"API response: list with {len(data)} items for company {company_code}")
-            return data
-        return response.text
+        if isinstance(data, list):
+            logger.info(f"API response: list with {len(data)} items for company {company_code}")
+        return data
     
     except Exception as e:
         logger.error(f"Error fetching employee data for company {company_code}: {str(e)}")
@@ -280,6 +319,7 @@ def batch_save_employees(employees_batch, company_code, db_conn, db_cursor):
     inserted = 0
     updated = 0
     errors = 0
+    partitioned = is_employees_table_partitioned()
     
     for employee in employees_batch:
         try:
@@ -287,11 +327,7 @@ def batch_save_employees(employees_batch, company_code, db_conn, db_cursor):
             
             # Use named parameters consistently - this solves the "argument formats can't be mixed" error
             db_cursor.execute(
-                """
-                SELECT id FROM funcionarios 
-                WHERE (cpf = %(cpf)s AND cpf != '') 
-                OR (codigo = %(codigo)s AND codigo_empresa = %(codigo_empresa)s)
-                """,
+                FIND_EMPLOYEE_PARTITIONED_QUERY if partitioned else FIND_EMPLOYEE_QUERY,
                 {
                     'cpf': employee['cpf'],
                     'codigo': employee['codigo'],
@@ -312,10 +348,12 @@ def batch_save_employees(employees_batch, company_code, db_conn, db_cursor):
                 # Add the id parameter for the WHERE clause using same named parameter style
                 update_values['existing_id'] = existing['id']
                 
+                # Partitioned: the row was found in this company, so codigo_empresa prunes the UPDATE too
+                tenant_filter = " AND codigo_empresa = %(codigo_empresa)s" if partitioned else ""
                 update_query = f"""
                 UPDATE funcionarios SET 
                     {", ".join(update_fields)}
-                WHERE id = %(existing_id)s
+                WHERE id = %(existing_id)s{tenant_filter}
                 """
                 db_cursor.execute(update_query, update_values)
                 updated += 1
@@ -395,48 +433,197 @@ def save_employees_to_database(employees, company_code):
         logger.error(f"Database error for company {company_code}: {str(e)}")
         raise
 
-def process_company(company, include_inactive=False):
+# Bumps the company's data version so API ETags computed before this import stop matching
+def bump_data_version(company_id):
+    connection = get_database_connection()
+    try:
+        cursor = connection.cursor()
+        cursor.execute(
+            """
+            INSERT INTO versoes_dados (escopo, versao, dt_atualizacao)
+            VALUES (%(escopo)s, 1, NOW())
+            ON CONFLICT (escopo) DO UPDATE SET
+                versao = versoes_dados.versao + 1,
+                dt_atualizacao = NOW()
+            """,
+            {'escopo': f"empresa:{company_id}"}
+        )
+        # Delivered to the API workers on commit
+        notificar(cursor, EMPRESA_DADOS, company_id)
+        connection.commit()
+        cursor.close()
+    finally:
+        connection.close()
+
+def import_company(company, include_inactive=False):
     company_id = company['id']
     company_code = company['codigo']
     
+    api_data = get_employee_data(
+        company_code=company_code,
+        tipo_saida='json',
+        include_inactive=include_inactive
+    )
+    
+    employees = map_api_to_db_schema(api_data, company_id, company_code)
+    
+    if employees:
+        inserted, updated, errors = save_employees_to_database(employees, company_code)
+        if inserted or updated:
+            bump_data_version(company_id)
+        return company_code, inserted, updated, errors
+    return company_code, 0, 0, 0
+
+def process_company(company, include_inactive=False):
+    try:
+        return import_company(company, include_inactive)
+    except Exception as e:
+        logger.error(f"Failed to process company {company['codigo']}: {str(e)}")
+        return company['codigo'], 0, 0, 0
+
+def enqueue_companies(cursor):
+    companies = get_companies_from_db(args.empresa) if args.empresa else get_companies_from_db()
+    batch_id = str(uuid.uuid4())
+    queued = enfileirar(cursor, batch_id, JOB_NAME, [company['id'] for company in companies])
+    logger.info(f"Queued {queued} of {len(companies)} companies in batch {batch_id} ({len(companies) - queued} already queued)")
+    return batch_id
+
+def run_worker():
+    """
+    Claims one company at a time until nothing is left to claim, or until SOC has been
+    unreachable (circuit open) for QUEUE_MAX_OUTAGE_SECONDS.
+    Returns: number of companies that used up their retries, plus 1 if the worker gave up on SOC
+    """
+    # The adaptive rate of this worker sets the interval it reserves in the shared limit
+    soc_client.rate_limiter = DatabaseRateLimiter(f"soc:{SOC_CODIGO}", soc_client.rate)
+    
+    worker = f"{socket.gethostname()}:{os.getpid()}"
+    connection = get_database_connection()
+    connection.autocommit = True
+    cursor = connection.cursor()
+    processed = 0
+    failed = 0
+    gave_up = False
+    # First CircuitOpenError since the last company imported
+    outage_since = None
+    max_outage = max(QUEUE_MAX_OUTAGE_SECONDS, soc_client.circuit_breaker.reset_seconds)
+    logger.info(f"Worker {worker} started")
+    
     try:
-        api_data = get_employee_data(
-            company_code=company_code,
-            tipo_saida='json',
-            include_inactive=include_inactive
-        )
-        
-        employees = map_api_to_db_schema(api_data, company_id, company_code)
+        while True:
+            item = reservar(cursor, JOB_NAME, worker)
+            if item is None:
+                pending, _ = pendencias(cursor, JOB_NAME)
+                if not pending:
+                    break
+                # Only companies waiting for a retry (or locked by another run) are left
+                time.sleep(QUEUE_POLL_SECONDS)
+                continue
+            
+            item_id, _, company_id, company_code, attempt = item
+            if not tentar_bloqueio(cursor, JOB_NAME, company_code):
+                logger.warning(f"Company {company_code} is being imported by another run, returning it to the queue")
+                devolver(cursor, item_id, worker)
+                continue
+            
+            try:
+                try:
+                    _, inserted, updated, errors = import_company(
+                        {'id': company_id, 'codigo': company_code}, include_inactive=args.all
+                    )
+                except CircuitOpenError as e:
+                    # SOC is down: the company goes back without using an attempt
+                    devolver(cursor, item_id, worker)
+                    logger.warning(f"Company {company_code} returned to the queue: {str(e)}")
+                    outage_since = outage_since or time.monotonic()
+                    if time.monotonic() - outage_since > max_outage:
+                        logger.error(f"SOC circuit open for more than {max_outage:.0f}s, worker giving up")
+                        gave_up = True
+                        break
+                    time.sleep(QUEUE_POLL_SECONDS)
+                    continue
+                except Exception as e:
+                    status = falhar(cursor, item_id, worker, str(e))
+                    logger.error(f"Failed to process company {company_code} (attempt {attempt}): {str(e)}")
+                    if status == 'falha':
+                        failed += 1
+                    continue
+                
+                outage_since = None
+                if not concluir(cursor, item_id, worker, inserted, updated, errors):
+                    logger.warning(f"Claim on company {company_code} expired and was taken by another worker")
+                processed += 1
+            finally:
+                liberar_bloqueio(cursor, JOB_NAME, company_code)
         
-        if employees:
-            inserted, updated, errors = save_employees_to_database(employees, company_code)
-            return company_code, inserted, updated, errors
-        else:
-            return company_code, 0, 0, 0
+        logger.info(f"Worker {worker} finished: {processed} companies imported, {failed} failed")
+        return failed + (1 if gave_up else 0)
+    finally:
+        if soc_client.rate_limiter.connection is not None:
+            soc_client.rate_limiter.connection.close()
+        connection.close()
+
+def run_distributed(cursor, workers):
+    batch_id = enqueue_companies(cursor)
     
-    except Exception as e:
-        logger.error(f"Failed to process company {company_code}: {str(e)}")
-        return company_code, 0, 0, 0
+    # Workers drain the whole queue, including companies left over by earlier batches
+    command = [sys.executable, str(Path(__file__).resolve()), "--worker"] + (["--all"] if args.all else [])
+    processes = [subprocess.Popen(command) for _ in range(workers)]
+    logger.info(f"Started {workers} workers")
+    exit_codes = [process.wait() for process in processes]
+    
+    summary = resumo(cursor, batch_id)
+    for status, (companies, inserted, updated, errors) in sorted(summary.items()):
+        logger.info(f"Batch {batch_id}: {companies} companies {status} ({inserted} inserted, {updated} updated, {errors} errors)")
+    return 1 if any(exit_codes) or 'falha' in summary else 0
 
 def main():
     start_time = datetime.now()
     logger.info(f"Employee import job started at {start_time}")
     
+    # Session-level advisory locks live as long as this connection (released if the process dies)
+    lock_connection = get_database_connection()
+    lock_connection.autocommit = True
+    lock_cursor = lock_connection.cursor()
+    
     try:
+        if args.enqueue:
+            enqueue_companies(lock_cursor)
+            return
+        if args.worker:
+            sys.exit(1 if run_worker() else 0)
+        
+        # A full run excludes other full runs; --empresa runs only compete for their company
+        if not args.empresa and not tentar_bloqueio(lock_cursor, JOB_NAME):
+            logger.warning("Another full employee import is running, exiting")
+            sys.exit(CODIGO_SAIDA_BLOQUEADO)
+        
+        if args.workers:
+            sys.exit(run_distributed(lock_cursor, args.workers))
+        
         companies = get_companies_from_db(args.empresa) if args.empresa else get_companies_from_db()
         
         total_inserted = 0
         total_updated = 0
         total_errors = 0
         processed_companies = 0
+        skipped_companies = 0
         
         for company in companies:
             if not company:
                 continue
-                
-            company_code, inserted, updated, errors = process_company(
-                company, include_inactive=args.all
-            )
+            
+            if not tentar_bloqueio(lock_cursor, JOB_NAME, company['codigo']):
+                logger.warning(f"Company {company['codigo']} is being imported by another run, skipping")
+                skipped_companies += 1
+                continue
+            
+            try:
+                company_code, inserted, updated, errors = process_company(
+                    company, include_inactive=args.all
+                )
+            finally:
+                liberar_bloqueio(lock_cursor, JOB_NAME, company['codigo'])
             
             total_inserted += inserted
             total_updated += updated
@@ -449,10 +636,20 @@ def main():
         duration = (end_time - start_time).total_seconds()
         logger.info(f"Import completed in {duration:.2f} seconds")
         logger.info(f"Total employees: {total_inserted} inserted, {total_updated} updated, {total_errors} errors")
+        if skipped_companies:
+            logger.info(f"Skipped {skipped_companies} companies locked by another run")
+        
+        # Nothing imported because every company was locked: same outcome as a locked full run
+        if companies and skipped_companies == len(companies):
+            sys.exit(CODIGO_SAIDA_BLOQUEADO)
         
     except Exception as e:
         logger.error(f"Import failed: {str(e)}")
         sys.exit(1)
+    finally:
+        soc_client.log_metrics()
+        soc_client.close()
+        lock_connection.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
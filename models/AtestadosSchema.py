@@ -1,11 +1,11 @@
 from sqlalchemy import (
-    Column, String, Integer, Date, ForeignKey, BigInteger, Index
+    Column, String, Integer, Date, ForeignKey, BigInteger, Index, desc, nulls_last
 )
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import UUID
 import uuid
 
-from database.Base import Base
+from database.Base import Base, fora_do_postgresql
 
 class Atestado(Base):
     __tablename__ = "atestados"
@@ -40,6 +40,10 @@ class Atestado(Base):
     __table_args__ = (
         Index("idx_atestado_matricula_data", "matricula_func", "dt_inicio_atestado"),
         Index("idx_atestado_cid_empresa", "cid_principal", "codigo_empresa"),
+        # Histórico no detalhe do funcionário: WHERE funcionario_id = ? ORDER BY dt_inicio_atestado DESC NULLS LAST.
+        # O SQLite não aceita NULLS LAST em índice (e já ordena os nulos por último no DESC)
+        Index("idx_atestado_funcionario_id_data_desc", "funcionario_id", nulls_last(desc("dt_inicio_atestado"))).ddl_if(dialect="postgresql"),
+        Index("idx_atestado_funcionario_id_data", "funcionario_id", "dt_inicio_atestado").ddl_if(callable_=fora_do_postgresql),
     )
 
     def __repr__(self):
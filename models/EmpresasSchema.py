@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Boolean, Integer, ForeignKey, BigInteger
+from sqlalchemy import Column, String, Boolean, Integer, BigInteger
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import UUID
 import uuid
@@ -26,9 +26,13 @@ class Empresa(Base):
     inscricao_municipal = Column(String(20), nullable=True)
     ativo = Column(Boolean, default=True)
 
-    usuario_id = Column(UUID(as_uuid=True), ForeignKey("usuarios.id"))
-    # Definindo a relação com string - usando "late binding"
-    usuario = relationship("Usuario", back_populates="empresas")
+    # Usuários com acesso à empresa (tabela de associação usuario_empresas)
+    usuarios = relationship(
+        "Usuario",
+        secondary="usuario_empresas",
+        back_populates="empresas",
+        passive_deletes=True
+    )
 
     # Definindo a relação com string - usando "late binding"
     funcionarios = relationship("Funcionario", back_populates="empresa", cascade="all, delete")
@@ -1,11 +1,11 @@
 from sqlalchemy import (
-    Column, String, Integer, Date, ForeignKey, BigInteger, Index
+    Column, String, Integer, Date, ForeignKey, BigInteger, Index, desc, nulls_last
 )
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import UUID
 import uuid
 
-from database.Base import Base
+from database.Base import Base, fora_do_postgresql
 
 class Exame(Base):
     __tablename__ = "exames"
@@ -49,6 +49,10 @@ class Exame(Base):
     __table_args__ = (
         Index("idx_exame_funcionario_data", "codigo_funcionario", "data_resultado"),
         Index("idx_exame_empresa_data", "codigo_empresa", "data_resultado"),
+        # Histórico no detalhe do funcionário: WHERE funcionario_id = ? ORDER BY data_resultado DESC NULLS LAST.
+        # O SQLite não aceita NULLS LAST em índice (e já ordena os nulos por último no DESC)
+        Index("idx_exame_funcionario_id_data_desc", "funcionario_id", nulls_last(desc("data_resultado"))).ddl_if(dialect="postgresql"),
+        Index("idx_exame_funcionario_id_data", "funcionario_id", "data_resultado").ddl_if(callable_=fora_do_postgresql),
         Index("idx_exame_codigo_exame", "codigo_exame"),
     )
 
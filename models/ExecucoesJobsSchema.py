@@ -0,0 +1,38 @@
+from sqlalchemy import Column, String, Integer, Float, DateTime, Text, Index
+from sqlalchemy.dialects.postgresql import UUID
+from datetime import datetime
+import uuid
+
+from database.Base import Base
+
+class ExecucaoJob(Base):
+    __tablename__ = "execucoes_jobs"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+
+    # Nome do job na agenda (src/agendador/Agenda.py)
+    job = Column(String(60), nullable=False)
+    # executando, sucesso, falha, ignorada (outra execução tinha o bloqueio), perdida, interrompida
+    status = Column(String(20), nullable=False)
+    # agendador ou manual (python src/agendador/Agendador.py --run <job>)
+    origem = Column(String(20), nullable=False, default="agendador")
+
+    agendada_para = Column(DateTime)
+    dt_inicio = Column(DateTime, default=datetime.utcnow)
+    dt_fim = Column(DateTime)
+    duracao_segundos = Column(Float)
+    codigo_saida = Column(Integer)
+
+    # Máquina e PID do agendador (execuções "executando" órfãs são encerradas no próximo início)
+    host = Column(String(120))
+    pid = Column(Integer)
+    # Motivo (atraso, bloqueio) ou final da saída do job
+    detalhe = Column(Text)
+
+    __table_args__ = (
+        # Histórico por job (mais recentes primeiro) e a última execução de cada job
+        Index("idx_execucao_job_inicio", "job", "dt_inicio"),
+    )
+
+    def __repr__(self):
+        return f"<ExecucaoJob(job={self.job}, status={self.status}, inicio={self.dt_inicio})>"
@@ -0,0 +1,46 @@
+from sqlalchemy import Column, String, Integer, DateTime, Text, Index
+from sqlalchemy.dialects.postgresql import UUID
+from datetime import datetime
+import uuid
+
+from database.Base import Base
+
+class ItemFilaImportacao(Base):
+    __tablename__ = "fila_importacao"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+
+    # Execução que enfileirou a empresa (jobs/ImportarFuncionarios.py --enqueue / --workers)
+    lote = Column(UUID(as_uuid=True), nullable=False)
+    job = Column(String(60), nullable=False)
+    empresa_id = Column(UUID(as_uuid=True), nullable=False)
+    codigo_empresa = Column(Integer, nullable=False)
+    # Funcionários da empresa ao enfileirar: as maiores são processadas primeiro
+    peso = Column(Integer, nullable=False, default=0)
+
+    # pendente, processando, concluida, falha (esgotou as tentativas)
+    status = Column(String(20), nullable=False, default="pendente")
+    tentativas = Column(Integer, nullable=False, default=0)
+    # Pendente só a partir deste horário (nova tentativa após falha ou empresa bloqueada)
+    disponivel_em = Column(DateTime, nullable=False, default=datetime.utcnow)
+    # Fim da reserva do worker; depois disso outro worker pode assumir a empresa
+    expira_em = Column(DateTime)
+    # host:pid do worker que reservou
+    worker = Column(String(160))
+
+    dt_criacao = Column(DateTime, default=datetime.utcnow)
+    dt_inicio = Column(DateTime)
+    dt_fim = Column(DateTime)
+    inseridos = Column(Integer)
+    atualizados = Column(Integer)
+    erros = Column(Integer)
+    detalhe = Column(Text)
+
+    __table_args__ = (
+        # Reserva (status + disponibilidade) e o resumo de um lote
+        Index("idx_fila_importacao_status", "job", "status", "disponivel_em"),
+        Index("idx_fila_importacao_lote", "lote", "status"),
+    )
+
+    def __repr__(self):
+        return f"<ItemFilaImportacao(job={self.job}, empresa={self.codigo_empresa}, status={self.status})>"
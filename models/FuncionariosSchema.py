@@ -20,10 +20,11 @@ class Funcionario(Base):
     atestados = relationship("Atestado", back_populates="funcionario", cascade="all, delete-orphan")
 
     # Campos principais
-    codigo_empresa = Column(BigInteger, index=True)
+    # Índices de codigo_empresa, codigo e nome: compostos, em __table_args__
+    codigo_empresa = Column(BigInteger)
     nome_empresa = Column(String(200))
-    codigo = Column(BigInteger, index=True)
-    nome = Column(String(120), index=True)
+    codigo = Column(BigInteger)
+    nome = Column(String(120))
     codigo_unidade = Column(String(20), index=True)
     nome_unidade = Column(String(130))
     codigo_setor = Column(String(12))
@@ -33,8 +34,8 @@ class Funcionario(Base):
     cbo_cargo = Column(String(10))
     ccusto = Column(String(50))
     nome_centro_custo = Column(String(130))
-    matricula_funcionario = Column(String(30), index=True)
-    cpf = Column(String(19), index=True, unique=True)
+    matricula_funcionario = Column(String(30))
+    cpf = Column(String(19), index=True, unique=True)  # único índice de cpf (ix_funcionarios_cpf, UNIQUE)
     rg = Column(String(19))
     uf_rg = Column(String(10))
     orgao_emissor_rg = Column(String(20))
@@ -75,12 +76,15 @@ class Funcionario(Base):
     rh_cargo = Column(String(80))
     rh_centro_custo_unidade = Column(String(80))
 
+    # Em bancos existentes, alterações aqui são aplicadas sem bloqueio com database/GerenciarIndices.py
+    # Com database/ParticionarFuncionarios.py a tabela é particionada por codigo_empresa: a PK passa a ser
+    # (id, codigo_empresa) e o CPF fica único por empresa; consultas devem sempre filtrar codigo_empresa
     __table_args__ = (
-        Index("idx_funcionario_nome", "nome"),
-        Index("idx_funcionario_codigo_empresa", "codigo_empresa"),
-        Index("idx_funcionario_cpf", "cpf"),
+        # Listagem: WHERE codigo_empresa = ? ORDER BY nome, id (também atende filtros só por codigo_empresa)
+        Index("idx_funcionario_empresa_nome", "codigo_empresa", "nome", "id"),
+        # Importação: busca por (codigo, codigo_empresa) quando o CPF não encontra o funcionário
+        Index("idx_funcionario_empresa_codigo", "codigo_empresa", "codigo"),
         Index("idx_funcionario_matricula", "matricula_funcionario"),
-        Index("idx_funcionario_codigo", "codigo"),
         Index("idx_funcionario_data_admissao", "data_admissao"),
     )
 
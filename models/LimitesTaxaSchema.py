@@ -0,0 +1,14 @@
+from sqlalchemy import Column, String, DateTime
+
+from database.Base import Base
+
+class LimiteTaxa(Base):
+    __tablename__ = "limites_taxa"
+
+    # Recurso limitado, ex.: "soc:<codigo>" (a API do SOC, compartilhada por todos os workers)
+    nome = Column(String(80), primary_key=True)
+    # Próximo horário livre para uma chamada (database/LimiteTaxa.py)
+    proxima_chamada = Column(DateTime(timezone=True), nullable=False)
+
+    def __repr__(self):
+        return f"<LimiteTaxa(nome={self.nome}, proxima_chamada={self.proxima_chamada})>"
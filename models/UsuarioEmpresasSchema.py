@@ -0,0 +1,22 @@
+from sqlalchemy import Column, DateTime, ForeignKey, Index, func
+from sqlalchemy.dialects.postgresql import UUID
+
+from database.Base import Base
+
+class UsuarioEmpresa(Base):
+    __tablename__ = "usuario_empresas"
+
+    # A PK (usuario_id, empresa_id) atende a checagem de acesso e as empresas de um usuário
+    usuario_id = Column(UUID(as_uuid=True), ForeignKey("usuarios.id", ondelete="CASCADE"), primary_key=True)
+    empresa_id = Column(UUID(as_uuid=True), ForeignKey("empresas.id", ondelete="CASCADE"), primary_key=True)
+
+    # server_default para que os INSERT ... SELECT em lote também preencham a data
+    dt_criacao = Column(DateTime, server_default=func.now())
+
+    __table_args__ = (
+        # Caminho inverso: usuários com acesso a uma empresa
+        Index("ix_usuario_empresas_empresa_usuario", "empresa_id", "usuario_id"),
+    )
+
+    def __repr__(self):
+        return f"<UsuarioEmpresa(usuario_id={self.usuario_id}, empresa_id={self.empresa_id})>"
@@ -22,11 +22,14 @@ class Usuario(Base):
     type_user = Column(String(50), default="user")
     active = Column(Boolean, default=True)
 
+    # Empresas às quais o usuário tem acesso. Checagens de acesso não devem carregar
+    # esta relação: use as consultas indexadas de src/utils/acesso_empresas.py
     empresas = relationship(
-        "Empresa", 
-        back_populates="usuario",
-        lazy="select",  
-        overlaps="usuario"  
+        "Empresa",
+        secondary="usuario_empresas",
+        back_populates="usuarios",
+        lazy="select",
+        passive_deletes=True
     )
 
     def __repr__(self):
@@ -0,0 +1,15 @@
+from sqlalchemy import Column, String, BigInteger, DateTime
+from datetime import datetime
+
+from database.Base import Base
+
+class VersaoDados(Base):
+    __tablename__ = "versoes_dados"
+
+    # Escopo versionado: "empresas" (diretório de empresas) ou "empresa:<id>" (dados de uma empresa)
+    escopo = Column(String(80), primary_key=True)
+    versao = Column(BigInteger, nullable=False, default=0)
+    dt_atualizacao = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<VersaoDados(escopo={self.escopo}, versao={self.versao})>"
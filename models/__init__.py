@@ -4,6 +4,8 @@ from models.EmpresasSchema import Empresa
 from models.FuncionariosSchema import Funcionario
 from models.AtestadosSchema import Atestado
 from models.ExamesSchema import Exame
+from models.VersoesDadosSchema import VersaoDados
+from models.UsuarioEmpresasSchema import UsuarioEmpresa
 
 from sqlalchemy import event
 from sqlalchemy.orm import configure_mappers
@@ -12,4 +14,4 @@ from sqlalchemy.orm import configure_mappers
 def receive_before_create(target, connection, **kw):
     configure_mappers()
 
-__all__ = ["Base", "Usuario", "Empresa", "Funcionario", "Atestado", "Exame"]
\ No newline at end of file
+__all__ = ["Base", "Usuario", "Empresa", "Funcionario", "Atestado", "Exame", "VersaoDados", "UsuarioEmpresa"]
\ No newline at end of file
@@ -6,6 +6,11 @@ from models.EmpresasSchema import Empresa
 from models.FuncionariosSchema import Funcionario
 from models.AtestadosSchema import Atestado
 from models.ExamesSchema import Exame
+from models.VersoesDadosSchema import VersaoDados
+from models.UsuarioEmpresasSchema import UsuarioEmpresa
+from models.ExecucoesJobsSchema import ExecucaoJob
+from models.FilaImportacaoSchema import ItemFilaImportacao
+from models.LimitesTaxaSchema import LimiteTaxa
 
 # Use este módulo para importar todos os modelos juntos
 # Em vez de import individual, você pode fazer:
@@ -1,17 +1,34 @@
 from fastapi import FastAPI, Request, HTTPException, Depends
-from fastapi.responses import HTMLResponse, RedirectResponse, FileResponse
+from fastapi.responses import HTMLResponse, RedirectResponse, FileResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from fastapi.middleware.cors import CORSMiddleware
 from starlette.middleware.sessions import SessionMiddleware
+from starlette.background import BackgroundTask
 from pathlib import Path
 from typing import Callable, Dict, Any, Optional, Union, List
 from functools import wraps
+from contextlib import asynccontextmanager, AsyncExitStack
+from collections import OrderedDict
+from http.cookiejar import CookieJar, DefaultCookiePolicy
 import httpx
+import asyncio
+import hashlib
+import json
+import mimetypes
+import time
 import os
+import sys
 import logging
 from dotenv import load_dotenv
 
+# Raiz do projeto no path para os módulos compartilhados em src/utils (métricas)
+ROOT_DIR = Path(__file__).resolve().parent.parent
+if str(ROOT_DIR) not in sys.path:
+    sys.path.append(str(ROOT_DIR))
+
+from src.utils.metricas import MetricsMiddleware, METRICS_PATH, metrics_endpoint, registrar_gauges
+
 # Configuração de logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("app")
@@ -19,9 +36,130 @@ logger = logging.getLogger("app")
 load_dotenv()
 
 BACKEND_API_URL = os.getenv("BACKEND_API_URL", "http://localhost:8001")
+# "http": backend em outro processo (BACKEND_API_URL); "inprocess": o app FastAPI do
+# backend roda neste processo e é chamado via ASGI, sem salto de rede
+BACKEND_MODE = os.getenv("BACKEND_MODE", "http").lower()
+INPROCESS_BACKEND_URL = "http://backend.inprocess"
 SESSION_SECRET = os.getenv("SESSION_SECRET", "portal-grs-session-key")
+SESSION_COOKIE_NAME = os.getenv("SESSION_COOKIE_NAME", "portal_grs_session")
+
+# Cache em memória de autenticação + perfil, chaveado pelo hash do cookie de sessão
+AUTH_CACHE_TTL = float(os.getenv("AUTH_CACHE_TTL", "15"))
+AUTH_CACHE_MAX_ENTRIES = int(os.getenv("AUTH_CACHE_MAX_ENTRIES", "10000"))
+
+# Modo de desenvolvimento: recarrega o registro de páginas quando arquivos mudam
+PAGES_RELOAD = os.getenv("PAGES_RELOAD", "False").lower() == "true"
+PAGES_RELOAD_INTERVAL = float(os.getenv("PAGES_RELOAD_INTERVAL", "1"))
+
+# Pool de conexões com o backend
+BACKEND_MAX_CONNECTIONS = int(os.getenv("BACKEND_MAX_CONNECTIONS", "100"))
+BACKEND_MAX_KEEPALIVE = int(os.getenv("BACKEND_MAX_KEEPALIVE", "20"))
+BACKEND_KEEPALIVE_EXPIRY = float(os.getenv("BACKEND_KEEPALIVE_EXPIRY", "30"))
+BACKEND_TIMEOUT = float(os.getenv("BACKEND_TIMEOUT", "30"))
+BACKEND_CONNECT_TIMEOUT = float(os.getenv("BACKEND_CONNECT_TIMEOUT", "5"))
+
+# Cliente HTTP compartilhado, criado no startup e fechado no shutdown
+backend_client: Optional[httpx.AsyncClient] = None
+backend_pool_stats = {"requests": 0, "errors": 0, "in_flight": 0}
+backend_app = None
+
+def load_backend_app():
+    global backend_app
+    if backend_app is None:
+        # src/App.py importa tanto "src.*" quanto "autenticacao.*", então precisa da raiz e de src/
+        for path in (ROOT_DIR, ROOT_DIR / "src"):
+            if str(path) not in sys.path:
+                sys.path.append(str(path))
+        from src.App import app as imported_backend_app
+        backend_app = imported_backend_app
+        logger.info("Backend API loaded in-process")
+    return backend_app
+
+def create_backend_client(mode: Optional[str] = None) -> httpx.AsyncClient:
+    mode = mode or BACKEND_MODE
+    
+    # O cookie jar rejeita todos os cookies: o cliente é compartilhado entre usuários,
+    # então os cookies de cada requisição são repassados pelo cabeçalho Cookie
+    if mode == "inprocess":
+        return httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=load_backend_app()),
+            base_url=INPROCESS_BACKEND_URL,
+            timeout=httpx.Timeout(BACKEND_TIMEOUT, connect=BACKEND_CONNECT_TIMEOUT),
+            cookies=CookieJar(policy=DefaultCookiePolicy(allowed_domains=[])),
+        )
+    
+    if mode != "http":
+        logger.warning(f"Unknown BACKEND_MODE '{mode}', using http")
+    
+    return httpx.AsyncClient(
+        base_url=BACKEND_API_URL,
+        limits=httpx.Limits(
+            max_connections=BACKEND_MAX_CONNECTIONS,
+            max_keepalive_connections=BACKEND_MAX_KEEPALIVE,
+            keepalive_expiry=BACKEND_KEEPALIVE_EXPIRY,
+        ),
+        timeout=httpx.Timeout(BACKEND_TIMEOUT, connect=BACKEND_CONNECT_TIMEOUT),
+        cookies=CookieJar(policy=DefaultCookiePolicy(allowed_domains=[])),
+    )
+
+def get_backend_client() -> httpx.AsyncClient:
+    global backend_client
+    if backend_client is None or backend_client.is_closed:
+        backend_client = create_backend_client()
+    return backend_client
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    async with AsyncExitStack() as stack:
+        # No modo in-process o ciclo de vida do backend acompanha o do frontend
+        if BACKEND_MODE == "inprocess":
+            api = load_backend_app()
+            await stack.enter_async_context(api.router.lifespan_context(api))
+        
+        get_backend_client()
+        watcher = asyncio.create_task(watch_pages()) if PAGES_RELOAD else None
+        yield
+        if watcher is not None:
+            watcher.cancel()
+        if backend_client is not None:
+            await backend_client.aclose()
+
+# Cabeçalhos hop-by-hop não são repassados pelo proxy
+HOP_BY_HOP_HEADERS = {
+    "host", "connection", "keep-alive", "transfer-encoding", "te", "trailer",
+    "upgrade", "proxy-authenticate", "proxy-authorization",
+}
+
+async def backend_request(method: str, url: str, stream: bool = False, **kwargs) -> httpx.Response:
+    client = get_backend_client()
+    backend_pool_stats["requests"] += 1
+    backend_pool_stats["in_flight"] += 1
+    try:
+        backend_req = client.build_request(method, url, **kwargs)
+        return await client.send(backend_req, stream=stream)
+    except Exception:
+        backend_pool_stats["errors"] += 1
+        raise
+    finally:
+        backend_pool_stats["in_flight"] -= 1
+
+def get_backend_pool_metrics() -> Dict[str, Any]:
+    metrics = dict(backend_pool_stats)
+    metrics["mode"] = BACKEND_MODE
+    metrics["max_connections"] = BACKEND_MAX_CONNECTIONS
+    metrics["max_keepalive_connections"] = BACKEND_MAX_KEEPALIVE
+    # O httpx não expõe o estado do pool publicamente; lê do httpcore quando disponível
+    pool = getattr(getattr(backend_client, "_transport", None), "_pool", None)
+    connections = list(getattr(pool, "connections", []) or [])
+    metrics["open_connections"] = len(connections)
+    metrics["idle_connections"] = sum(1 for c in connections if c.is_idle())
+    return metrics
 
-app = FastAPI(title="Portal GRS")
+def forward_cookie_headers(request: Request) -> Dict[str, str]:
+    cookie = request.headers.get("cookie")
+    return {"cookie": cookie} if cookie else {}
+
+app = FastAPI(title="Portal GRS", lifespan=lifespan)
 
 # Middleware CORS
 app.add_middleware(
@@ -35,6 +173,11 @@ app.add_middleware(
 # Middleware de sessão
 app.add_middleware(SessionMiddleware, secret_key=SESSION_SECRET)
 
+# Métricas Prometheus (latência por rota, requisições em andamento, tamanho das respostas)
+app.add_middleware(MetricsMiddleware, app_name="frontend")
+registrar_gauges("portal_backend_pool", "Pool de conexões com o backend", get_backend_pool_metrics)
+app.add_route(METRICS_PATH, metrics_endpoint, include_in_schema=False)
+
 # Caminhos base
 BASE_DIR = Path(__file__).resolve().parent
 TEMPLATES_DIR = BASE_DIR / "templates"
@@ -55,6 +198,22 @@ for module_dir in BASE_DIR.glob("*"):
 # Configuração do Jinja2
 templates = Jinja2Templates(directory=TEMPLATES_DIR)
 templates.env.globals["BASE_DIR"] = str(BASE_DIR)
+# Sem auto_reload o Jinja2 não consulta o mtime dos templates a cada renderização
+templates.env.auto_reload = PAGES_RELOAD
+
+# Registro de páginas montado no startup: HTML, assets e template base ficam em memória
+page_registry: Dict[str, Dict[str, Optional[str]]] = {}
+base_template = None
+
+# Assets com hash de conteúdo gerados por BuildAssets.py (servidos em /assets)
+ASSETS_DIR = BASE_DIR / "_build"
+ASSET_MANIFEST_PATH = ASSETS_DIR / "manifest.json"
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+# Preferência de codificação quando o cliente aceita mais de uma
+ASSET_ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+asset_manifest: Dict[str, Dict[str, Any]] = {}
+asset_files: Dict[str, Dict[str, Any]] = {}
 
 # Função para verificar existência e permissão de arquivos
 def check_file_access(file_path: Path) -> bool:
@@ -66,24 +225,59 @@ def check_file_access(file_path: Path) -> bool:
         return False
     return True
 
-async def verify_auth(request: Request) -> bool:
+auth_cache: "OrderedDict[str, tuple]" = OrderedDict()
+
+def auth_cache_key(request: Request) -> Optional[str]:
+    session = request.cookies.get(SESSION_COOKIE_NAME)
+    if not session:
+        return None
+    return hashlib.sha256(session.encode("utf-8")).hexdigest()
+
+def invalidate_auth_cache(request: Request) -> None:
+    key = auth_cache_key(request)
+    if key:
+        auth_cache.pop(key, None)
+
+async def get_auth_profile(request: Request) -> Optional[Dict[str, Any]]:
+    # Reaproveita o resultado já obtido nesta requisição (auth_required + handler)
+    if hasattr(request.state, "auth_profile"):
+        return request.state.auth_profile
+    
+    key = auth_cache_key(request)
+    if not key:
+        request.state.auth_profile = None
+        return None
+    
+    cached = auth_cache.get(key)
+    if cached and cached[0] > time.monotonic():
+        request.state.auth_profile = cached[1]
+        return cached[1]
+    
+    profile = None
     try:
-        async with httpx.AsyncClient(cookies=request.cookies) as client:
-            response = await client.get(f"{BACKEND_API_URL}/api/verify-auth")
-            return response.status_code == 200
+        # Uma única chamada valida a sessão e retorna o perfil
+        response = await backend_request("GET", "/api/auth-profile", headers=forward_cookie_headers(request))
+        if response.status_code == 200:
+            profile = response.json().get("user")
     except Exception as e:
         logger.error(f"Auth verification error: {e}")
-        return False
+    
+    if profile:
+        auth_cache[key] = (time.monotonic() + AUTH_CACHE_TTL, profile)
+        auth_cache.move_to_end(key)
+        while len(auth_cache) > AUTH_CACHE_MAX_ENTRIES:
+            auth_cache.popitem(last=False)
+    else:
+        auth_cache.pop(key, None)
+    
+    request.state.auth_profile = profile
+    return profile
+
+async def verify_auth(request: Request) -> bool:
+    return await get_auth_profile(request) is not None
 
 async def get_user_profile(request: Request) -> Dict[str, Any]:
-    try:
-        async with httpx.AsyncClient(cookies=request.cookies) as client:
-            response = await client.get(f"{BACKEND_API_URL}/api/user-profile")
-            if response.status_code == 200:
-                return response.json()
-    except Exception as e:
-        logger.error(f"Failed to get user profile: {e}")
-    return {}
+    return await get_auth_profile(request) or {}
 
 def auth_required(func: Callable) -> Callable:
     @wraps(func)
@@ -95,27 +289,30 @@ def auth_required(func: Callable) -> Callable:
     return wrapper
 
 async def proxy_backend(request: Request, path: str) -> httpx.Response:
-    client = httpx.AsyncClient(base_url=BACKEND_API_URL, cookies=request.cookies)
-    
     url = f"{path}"
     method = request.method
-    headers = {k: v for k, v in request.headers.items() if k.lower() not in ["host", "connection"]}
+    headers = {k: v for k, v in request.headers.items() if k.lower() not in HOP_BY_HOP_HEADERS}
     
-    body = await request.body()
+    # O corpo é repassado em streaming, sem carregar a requisição inteira em memória
+    has_body = "content-length" in request.headers or "transfer-encoding" in request.headers
     
     try:
-        response = await client.request(
-            method=method,
-            url=url,
+        # stream=True: o corpo da resposta é lido sob demanda por quem chamou,
+        # que deve fechar a resposta (aclose) ao terminar
+        response = await backend_request(
+            method,
+            url,
+            stream=True,
+            params=request.query_params,
             headers=headers,
-            content=body,
+            content=request.stream() if has_body else None,
         )
         return response
     except Exception as e:
         logger.error(f"Proxy error: {e}")
         raise HTTPException(status_code=502, detail="Error communicating with backend")
 
-def get_page_content(page_path: str) -> str:
+def load_page_content(page_path: str) -> str:
     try:
         file_path = BASE_DIR / page_path / "index.html"
         if not check_file_access(file_path):
@@ -129,7 +326,55 @@ def get_page_content(page_path: str) -> str:
         logger.error(error_msg)
         return f"<div class='error-message'><h2>Error</h2><p>{error_msg}</p></div>"
 
-def list_available_css_js(module_name: str) -> Dict[str, Optional[str]]:
+def load_asset_manifest() -> None:
+    global asset_manifest, asset_files
+    
+    # No modo de recarga os arquivos são servidos direto de /static, sem build
+    if PAGES_RELOAD or not ASSET_MANIFEST_PATH.exists():
+        asset_manifest, asset_files = {}, {}
+        return
+    
+    try:
+        manifest = json.loads(ASSET_MANIFEST_PATH.read_text(encoding="utf-8"))
+    except Exception as e:
+        logger.error(f"Error loading asset manifest: {e}")
+        asset_manifest, asset_files = {}, {}
+        return
+    
+    asset_manifest = manifest
+    asset_files = {
+        entry["file"]: {
+            "media_type": mimetypes.guess_type(entry["file"])[0] or "application/octet-stream",
+            "encodings": set(entry.get("encodings", [])),
+        }
+        for entry in manifest.values()
+    }
+    logger.info(f"Asset manifest loaded with {len(asset_manifest)} assets")
+
+def asset_url(relative_path: str) -> str:
+    entry = asset_manifest.get(relative_path)
+    return entry["url"] if entry else f"/static/{relative_path}"
+
+templates.env.globals["asset_url"] = asset_url
+
+def negotiate_encoding(accept_encoding: str, available: set) -> Optional[str]:
+    accepted = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip()] = quality
+    
+    for encoding, _ in ASSET_ENCODINGS:
+        if encoding in available and accepted.get(encoding, accepted.get("*", 0)) > 0:
+            return encoding
+    return None
+
+def find_css_js(module_name: str) -> Dict[str, Optional[str]]:
     result = {"css": None, "js": None}
     
     module_dir = BASE_DIR / module_name
@@ -141,27 +386,106 @@ def list_available_css_js(module_name: str) -> Dict[str, Optional[str]]:
     if css_dir.is_dir():
         css_files = list(css_dir.glob("*.css"))
         if css_files:
-            result["css"] = f"/static/{module_name}/css/{css_files[0].name}"
+            result["css"] = asset_url(f"{module_name}/css/{css_files[0].name}")
     
     # Check for JS
     js_dir = module_dir / "js"
     if js_dir.is_dir():
         js_files = list(js_dir.glob("*.js"))
         if js_files:
-            result["js"] = f"/static/{module_name}/js/{js_files[0].name}"
+            result["js"] = asset_url(f"{module_name}/js/{js_files[0].name}")
     
     return result
 
+def discover_page_dirs() -> List[Path]:
+    return [
+        module_dir for module_dir in sorted(BASE_DIR.glob("*"))
+        if module_dir.is_dir()
+        and not module_dir.name.startswith((".", "_", "templates"))
+        and (module_dir / "index.html").exists()
+    ]
+
+def build_page_registry() -> None:
+    global page_registry, base_template
+    
+    load_asset_manifest()
+    
+    registry = {}
+    for module_dir in discover_page_dirs():
+        module_name = module_dir.name
+        resources = find_css_js(module_name)
+        registry[module_name] = {
+            "content": load_page_content(module_name),
+            "css": resources["css"],
+            "js": resources["js"],
+        }
+    
+    # Descarta templates compilados anteriormente (relevante no modo de recarga)
+    if templates.env.cache is not None:
+        templates.env.cache.clear()
+    base_template = templates.get_template("base.html")
+    page_registry = registry
+    logger.info(f"Page registry built with {len(registry)} pages: {', '.join(sorted(registry))}")
+
+def pages_signature() -> tuple:
+    # mtime de todos os arquivos de páginas e templates, para o modo de recarga
+    signature = []
+    for root, _, files in os.walk(BASE_DIR):
+        for name in files:
+            if name.endswith((".html", ".css", ".js")):
+                path = os.path.join(root, name)
+                try:
+                    signature.append((path, os.stat(path).st_mtime_ns))
+                except OSError:
+                    continue
+    return tuple(sorted(signature))
+
+async def watch_pages() -> None:
+    last_signature = await asyncio.to_thread(pages_signature)
+    while True:
+        await asyncio.sleep(PAGES_RELOAD_INTERVAL)
+        try:
+            signature = await asyncio.to_thread(pages_signature)
+            if signature != last_signature:
+                last_signature = signature
+                logger.info("Page files changed, rebuilding page registry")
+                await asyncio.to_thread(build_page_registry)
+        except Exception as e:
+            logger.error(f"Page reload error: {e}")
+
+def get_page_content(page_path: str) -> str:
+    page = page_registry.get(page_path)
+    if page is None:
+        error_msg = f"Page not registered: {page_path}"
+        logger.error(error_msg)
+        return f"<div class='error-message'><h2>Error</h2><p>{error_msg}</p></div>"
+    return page["content"]
+
+def list_available_css_js(module_name: str) -> Dict[str, Optional[str]]:
+    page = page_registry.get(module_name)
+    if page is None:
+        return {"css": None, "js": None}
+    return {"css": page["css"], "js": page["js"]}
+
+def render_page(context: Dict[str, Any]) -> HTMLResponse:
+    return HTMLResponse(content=base_template.render(context))
+
 @app.api_route("/api/{path:path}", methods=["GET", "POST", "PUT", "DELETE"])
 async def api_proxy(request: Request, path: str):
     try:
+        # Sessão encerrada ou alterada: descarta o perfil em cache
+        if path in ("logout", "login"):
+            invalidate_auth_cache(request)
+        
         response = await proxy_backend(request, f"/api/{path}")
         
-        from starlette.responses import Response
-        resp = Response(
-            content=response.content,
+        # Bytes brutos (aiter_raw): a compressão do backend passa intacta, junto com
+        # Content-Encoding/Content-Length, e a resposta nunca fica inteira em memória
+        resp = StreamingResponse(
+            response.aiter_raw(),
             status_code=response.status_code,
-            headers={k: v for k, v in response.headers.items()}
+            headers={k: v for k, v in response.headers.items() if k.lower() not in HOP_BY_HOP_HEADERS},
+            background=BackgroundTask(response.aclose)
         )
         
         for name, value in response.cookies.items():
@@ -191,11 +515,30 @@ async def login(request: Request):
     if is_authenticated:
         return RedirectResponse(url="/dashboard", status_code=302)
     
-    login_html_path = BASE_DIR / "login" / "index.html"
-    if not check_file_access(login_html_path):
+    login_page = page_registry.get("login")
+    if login_page is None:
         raise HTTPException(status_code=500, detail="Login page not found")
     
-    return HTMLResponse(content=login_html_path.read_text(encoding="utf-8"))
+    return HTMLResponse(content=login_page["content"])
+
+@app.get("/health/backend-pool")
+async def backend_pool_health():
+    return get_backend_pool_metrics()
+
+@app.get("/assets/{asset_path:path}")
+async def serve_asset(request: Request, asset_path: str):
+    asset = asset_files.get(asset_path)
+    if asset is None:
+        raise HTTPException(status_code=404, detail="File not found")
+    
+    headers = {"Cache-Control": IMMUTABLE_CACHE_CONTROL, "Vary": "Accept-Encoding"}
+    encoding = negotiate_encoding(request.headers.get("accept-encoding", ""), asset["encodings"])
+    file_path = ASSETS_DIR / asset_path
+    if encoding:
+        headers["Content-Encoding"] = encoding
+        file_path = file_path.with_name(file_path.name + dict(ASSET_ENCODINGS)[encoding])
+    
+    return FileResponse(file_path, media_type=asset["media_type"], headers=headers)
 
 @app.get("/static/{module}/{file_type}/{file_name}")
 async def serve_static_files(module: str, file_type: str, file_name: str):
@@ -215,8 +558,7 @@ async def dashboard(request: Request):
     # Encontra automaticamente os arquivos CSS e JS
     resources = list_available_css_js("dashboard")
     
-    return templates.TemplateResponse(
-        "base.html", 
+    return render_page(
         {
             "request": request, 
             "page": "dashboard",
@@ -241,8 +583,7 @@ async def admin_page(request: Request):
     
     resources = list_available_css_js("admin")
     
-    return templates.TemplateResponse(
-        "base.html", 
+    return render_page(
         {
             "request": request, 
             "page": "admin",
@@ -262,16 +603,14 @@ async def generic_page(request: Request, path: str):
     
     user_profile = await get_user_profile(request)
     
-    page_dir = BASE_DIR / path
-    if not page_dir.is_dir() or not (page_dir / "index.html").exists():
-        logger.warning(f"Page directory not found: {page_dir}")
+    if path not in page_registry:
+        logger.warning(f"Page not found: {path}")
         return RedirectResponse(url="/dashboard", status_code=302)
     
     page_content = get_page_content(path)
     resources = list_available_css_js(path)
     
-    return templates.TemplateResponse(
-        "base.html", 
+    return render_page(
         {
             "request": request, 
             "page": path,
@@ -505,6 +844,8 @@ if not base_html_path.exists():
     with open(base_html_path, "w", encoding="utf-8") as f:
         f.write(base_html_content)
 
+build_page_registry()
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="127.0.0.1", port=8000)
\ No newline at end of file
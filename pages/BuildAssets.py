@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Static Asset Build
+
+Copies every CSS/JS asset under pages/*/css and pages/*/js to pages/_build with a
+content hash in its file name, pre-generates .gz (and .br, when the brotli package
+is installed) variants, and writes pages/_build/manifest.json. The frontend reads
+the manifest at startup and serves the hashed files from /assets with immutable
+caching.
+
+Usage:
+    python pages/BuildAssets.py
+"""
+
+import sys
+import gzip
+import json
+import shutil
+import hashlib
+import logging
+from pathlib import Path
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+PAGES_DIR = Path(__file__).resolve().parent
+BUILD_DIR = PAGES_DIR / "_build"
+MANIFEST_FILE = BUILD_DIR / "manifest.json"
+ASSETS_URL_PREFIX = "/assets"
+
+ASSET_PATTERNS = ("*/css/*.css", "*/js/*.js")
+HASH_LENGTH = 12
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='[%(asctime)s] %(levelname)s - %(message)s',
+    handlers=[logging.StreamHandler(sys.stdout)]
+)
+logger = logging.getLogger(__name__)
+
+def find_assets():
+    """Return every source asset, relative to the pages directory"""
+    assets = []
+    for pattern in ASSET_PATTERNS:
+        for path in PAGES_DIR.glob(pattern):
+            module_name = path.relative_to(PAGES_DIR).parts[0]
+            if module_name.startswith((".", "_")):
+                continue
+            assets.append(path.relative_to(PAGES_DIR))
+    return sorted(assets)
+
+def hashed_name(relative_path, data):
+    """dashboard/css/styles.css -> dashboard/css/styles.<hash>.css"""
+    digest = hashlib.sha256(data).hexdigest()[:HASH_LENGTH]
+    return relative_path.with_name(f"{relative_path.stem}.{digest}{relative_path.suffix}")
+
+def write_compressed_variants(target, data):
+    """Write .gz/.br next to the target when they are smaller than the original"""
+    encodings = []
+
+    if brotli is not None:
+        compressed = brotli.compress(data, quality=11)
+        if len(compressed) < len(data):
+            target.with_name(target.name + ".br").write_bytes(compressed)
+            encodings.append("br")
+
+    # mtime=0 keeps the output byte-for-byte reproducible between builds
+    compressed = gzip.compress(data, compresslevel=9, mtime=0)
+    if len(compressed) < len(data):
+        target.with_name(target.name + ".gz").write_bytes(compressed)
+        encodings.append("gzip")
+
+    return encodings
+
+def build():
+    if BUILD_DIR.exists():
+        shutil.rmtree(BUILD_DIR)
+    BUILD_DIR.mkdir(parents=True)
+
+    if brotli is None:
+        logger.warning("brotli package not installed, only .gz variants will be generated")
+
+    manifest = {}
+    for relative_path in find_assets():
+        data = (PAGES_DIR / relative_path).read_bytes()
+        built_path = hashed_name(relative_path, data)
+
+        target = BUILD_DIR / built_path
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_bytes(data)
+        encodings = write_compressed_variants(target, data)
+
+        manifest[relative_path.as_posix()] = {
+            "file": built_path.as_posix(),
+            "url": f"{ASSETS_URL_PREFIX}/{built_path.as_posix()}",
+            "encodings": encodings,
+        }
+        logger.info(f"{relative_path.as_posix()} -> {built_path.as_posix()} ({', '.join(encodings) or 'identity'})")
+
+    MANIFEST_FILE.write_text(json.dumps(manifest, indent=2, sort_keys=True), encoding="utf-8")
+    logger.info(f"Built {len(manifest)} assets, manifest written to {MANIFEST_FILE}")
+    return manifest
+
+if __name__ == "__main__":
+    build()
@@ -234,18 +234,14 @@ document.addEventListener('DOMContentLoaded', function() {
         url.searchParams.append('search', state.filters.search);
       }
       
-      // Timestamp para evitar cache
-      url.searchParams.append('_t', Date.now());
-      
       console.log('Buscando funcionários:', url.toString());
       
+      // cache 'no-cache' sempre revalida com o ETag do servidor (304 quando os dados não mudaram)
       const response = await fetch(url, {
         method: 'GET',
+        cache: 'no-cache',
         headers: {
-          'Accept': 'application/json',
-          'Cache-Control': 'no-cache, no-store, must-revalidate',
-          'Pragma': 'no-cache',
-          'Expires': '0'
+          'Accept': 'application/json'
         },
         credentials: 'include'
       });
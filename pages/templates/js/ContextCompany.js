@@ -11,6 +11,36 @@ await fetch("/api/user/current-company", {
 });
 
 
+/**
+ * Executa vários GETs da API numa única requisição (POST /api/batch)
+ * @param {Array<{id: string, path: string}>} requests Sub-requisições
+ * @returns {Promise<Object>} Resultados ({status, body}) indexados pelo id
+ */
+async function fetchBatch(requests) {
+  const response = await fetch('/api/batch', {
+    method: 'POST',
+    credentials: 'include',
+    headers: {
+      'Content-Type': 'application/json',
+      'Accept': 'application/json'
+    },
+    body: JSON.stringify({ requests })
+  });
+
+  if (!response.ok) {
+    throw new Error(`Erro ${response.status} no /api/batch`);
+  }
+
+  const data = await response.json();
+  const results = {};
+  data.responses.forEach(result => {
+    results[result.id] = result;
+  });
+  return results;
+}
+
+window.fetchBatch = fetchBatch;
+
 class CompanyContext {
   constructor() {
     this.company = null;
@@ -33,18 +63,13 @@ class CompanyContext {
       this.isLoading = true;
       this.notifyListeners();
       
-      // Primeiro, obter a empresa atual se já estiver selecionada
-      await this.loadCurrentCompany();
+      // Empresa atual e empresas disponíveis numa única ida ao servidor
+      await this.loadContext();
       
-      // Se não temos empresa selecionada, carregar empresas disponíveis
-      if (!this.company) {
-        await this.loadAvailableCompanies();
-        
-        // Auto-selecionar a primeira empresa em ordem alfabética se não tiver nenhuma selecionada
-        if (!this.company && this.companies.length > 0 && !this.autoSelectionDone) {
-          this.autoSelectionDone = true;
-          await this.autoSelectFirstCompany();
-        }
+      // Auto-selecionar a primeira empresa em ordem alfabética se não tiver nenhuma selecionada
+      if (!this.company && this.companies.length > 0 && !this.autoSelectionDone) {
+        this.autoSelectionDone = true;
+        await this.autoSelectFirstCompany();
       }
     } catch (error) {
       this.error = error.message || 'Erro desconhecido';
@@ -57,6 +82,49 @@ class CompanyContext {
     }
   }
 
+  /**
+   * Carregar empresa ativa e empresas disponíveis com uma chamada ao /api/batch
+   */
+  async loadContext() {
+    let results;
+    try {
+      results = await fetchBatch([
+        { id: 'company', path: '/api/configuracoes/empresa-ativa' },
+        { id: 'companies', path: '/api/user/companies' }
+      ]);
+    } catch (error) {
+      // Sem o endpoint de lote, volta às chamadas individuais
+      console.warn('Falha no /api/batch, carregando contexto em chamadas separadas:', error);
+      await this.loadCurrentCompany();
+      if (!this.company) {
+        await this.loadAvailableCompanies();
+      }
+      return;
+    }
+
+    const company = results.company;
+    if (company.status === 200) {
+      this.company = company.body;
+      this.error = null;
+    } else if (company.status === 404) {
+      // 404 significa que não há empresa selecionada, não é erro
+      this.company = null;
+      this.error = null;
+    } else {
+      this.company = null;
+      this.error = (company.body && company.body.detail) || `Erro ${company.status}`;
+      console.error('Erro ao carregar empresa:', this.error);
+    }
+
+    const companies = results.companies;
+    if (companies.status === 200) {
+      this.companies = companies.body;
+    } else {
+      this.companies = [];
+      console.error('Erro ao carregar empresas:', companies.status);
+    }
+  }
+
   /**
    * Carregar a empresa ativa atual
    */
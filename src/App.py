@@ -5,6 +5,7 @@ from pathlib import Path
 ROOT_DIR = Path(__file__).resolve().parent.parent
 sys.path.append(str(ROOT_DIR))
 
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from starlette.middleware.sessions import SessionMiddleware
@@ -20,12 +21,29 @@ from src.admin.AdminRoutes import router as admin_router
 from src.configuracoes.ConfiguracoeRoutes import router as configuracoes_router
 from src.funcionarios.FuncionariosRoutes import router as funcionarios_router
 from src.empresas.EmpresasRoutes import router as empresas_router
+from src.batch.BatchRoutes import router as batch_router
+from src.agendador.AgendadorRoutes import router as agendador_router
+from src.utils.senhas import metricas_hash_senha
+from src.utils.metricas import MetricsMiddleware, METRICS_PATH, metrics_endpoint, instrumentar_engine, registrar_gauges
+from src.utils.instrumentacao_sql import instrumentar_sql
+from src.utils.perfilamento import ProfilingMiddleware
+from src.utils.roteamento_replicas import configurar_replicas
+from src.utils.cache import iniciar_invalidacao, parar_invalidacao, metricas_cache
+from database.Engine import engine, replica_engines
 
 load_dotenv()
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Cada worker escuta os eventos de invalidação de cache (jobs e rotas de admin publicam)
+    iniciar_invalidacao(engine)
+    yield
+    parar_invalidacao()
+
 app = FastAPI(
     title="Portal GRS API",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Configurações
@@ -47,6 +65,26 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Primário e réplicas de leitura (EXTERNAL_URL_DB_REPLICAS)
+engines = [engine, *replica_engines]
+
+# Métricas Prometheus: latência por rota, requisições em andamento e consultas SQL por requisição
+app.add_middleware(MetricsMiddleware, app_name="backend")
+for engine_app in engines:
+    instrumentar_engine(engine_app)
+registrar_gauges("portal_password_hash", "Pool de hash de senha", metricas_hash_senha)
+registrar_gauges("portal_cache", "Caches em memória e ouvinte de invalidação", metricas_cache)
+app.add_route(METRICS_PATH, metrics_endpoint, include_in_schema=False)
+
+# Perfil sob demanda: admins enviam "X-Profile: 1" (ou ?__profile=1) e recebem X-Profile-Id
+app.add_middleware(ProfilingMiddleware, engines=engines)
+
+# Consultas por requisição, detecção de N+1 e log de consultas lentas (SQL_INSTRUMENTATION)
+instrumentar_sql(app, engines)
+
+# Rotas com get_read_db leem das réplicas (se configuradas), exceto logo após uma escrita do usuário
+configurar_replicas(app)
+
 # Registrar todos os routers
 app.include_router(login_router)
 app.include_router(register_router)
@@ -55,7 +93,13 @@ app.include_router(admin_router)
 app.include_router(configuracoes_router)
 app.include_router(funcionarios_router)  # Novo router de funcionários
 app.include_router(empresas_router)      # Novo router de empresas
+app.include_router(batch_router)         # Várias chamadas GET numa só requisição
+app.include_router(agendador_router)     # Agenda e histórico dos jobs de importação
 
 @app.get("/")
 def root():
-    return {"msg": "🚀 API do Portal GRS está online!"}
\ No newline at end of file
+    return {"msg": "🚀 API do Portal GRS está online!"}
+
+@app.get("/health/password-hash")
+def password_hash_metrics():
+    return metricas_hash_senha()
\ No newline at end of file
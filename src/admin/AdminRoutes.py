@@ -1,4 +1,5 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Query
+from fastapi.responses import FileResponse
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy import cast, String
@@ -7,12 +8,36 @@ from pydantic import BaseModel, EmailStr, Field
 from uuid import UUID, uuid4
 from datetime import datetime
 
-from database.Dependencias import get_db
+from database.Dependencias import get_db, get_read_db
 from models.UsuariosSchema import Usuario
 from models.EmpresasSchema import Empresa
 from src.autenticacao.Login import get_current_user
+from src.utils.serializacao import ORJSONResponse, resposta_negociada, linhas_para_dicts
+from src.utils.versao_dados import incrementar_versao, escopo_empresa, ESCOPO_EMPRESAS
+from src.utils.senhas import gerar_hash_senha
+from src.utils.acesso_empresas import ids_empresas_usuario, atribuir_empresas, revogar_empresas
+from database.Invalidacao import publicar, ACESSO_USUARIO, USUARIO
+from src.utils.perfilamento import listar_perfis, obter_perfil, arquivo_perfil
 
-router = APIRouter(prefix="/api/admin")
+router = APIRouter(prefix="/api/admin", default_response_class=ORJSONResponse)
+
+# Columns selected by the list endpoints; rows are serialized directly, without per-item pydantic validation
+COLUNAS_USUARIO = (
+    Usuario.id,
+    Usuario.nome,
+    Usuario.email,
+    Usuario.type_user,
+    Usuario.active,
+    Usuario.dt_criacao,
+    Usuario.dt_last_acess,
+)
+
+COLUNAS_EMPRESA = (
+    Empresa.id,
+    Empresa.codigo,
+    Empresa.nome_abreviado,
+    Empresa.razao_social,
+)
 
 class UserBase(BaseModel):
     nome: str
@@ -63,11 +88,12 @@ class UserCompanyAssignment(BaseModel):
 # User management endpoints
 @router.get("/users", response_model=UserListResponse)
 async def get_users(
+    request: Request,
     skip: int = 0, 
     limit: int = 100, 
     search: Optional[str] = None,
     current_user: Usuario = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     if current_user.type_user not in ["admin", "superadmin"]:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Acesso negado")
@@ -81,18 +107,18 @@ async def get_users(
         )
     
     total = query.count()
-    users = query.offset(skip).limit(limit).all()
+    users = query.with_entities(*COLUNAS_USUARIO).offset(skip).limit(limit).all()
     
-    return {
-        "items": users,
+    return resposta_negociada(request, {
+        "items": linhas_para_dicts(users),
         "total": total
-    }
+    })
 
 @router.get("/users/{user_id}", response_model=UserResponse)
 async def get_user(
     user_id: UUID, 
     current_user: Usuario = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     if current_user.type_user not in ["admin", "superadmin"]:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Acesso negado")
@@ -121,9 +147,8 @@ async def create_user(
     if existing_user:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Email já cadastrado")
     
-    # Hash the password (using passlib.hash.bcrypt)
-    from passlib.hash import bcrypt
-    hashed_password = bcrypt.hash(user_data.senha)
+    # Hash the password in the password-hashing pool, off the event loop
+    hashed_password = await gerar_hash_senha(user_data.senha)
     
     try:
         new_user = Usuario(
@@ -180,10 +205,11 @@ async def update_user(
     
     # Update password if provided
     if user_data.senha:
-        from passlib.hash import bcrypt
-        user.senha = bcrypt.hash(user_data.senha)
+        user.senha = await gerar_hash_senha(user_data.senha)
     
     try:
+        # Cached access of this user in every worker (database/Invalidacao.py)
+        publicar(db, USUARIO, [user.id])
         db.commit()
         db.refresh(user)
         return user
@@ -214,12 +240,10 @@ async def delete_user(
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Apenas superadmins podem excluir usuários admin")
     
     try:
-        # Check if user has companies associated
-        if user.empresas:
-            # Remove all company associations
-            for empresa in user.empresas:
-                empresa.usuario_id = None
+        # Remove all company associations in one statement
+        bump_access_versions(db, user.id, revogar_empresas(db, user.id))
         
+        publicar(db, USUARIO, [user.id])
         db.delete(user)
         db.commit()
         return None
@@ -231,11 +255,12 @@ async def delete_user(
 # Company management endpoints
 @router.get("/companies", response_model=CompanyListResponse)
 async def get_companies(
+    request: Request,
     skip: int = 0, 
     limit: int = 1000, 
     search: Optional[str] = None,
     current_user: Usuario = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Get a paginated list of companies.
@@ -260,18 +285,19 @@ async def get_companies(
     
     # Apply pagination - use a higher limit if requested
     limit = min(limit, 1000)  
-    companies = query.offset(skip).limit(limit).all()
+    companies = query.with_entities(*COLUNAS_EMPRESA).offset(skip).limit(limit).all()
     
-    return {
-        "items": companies,
+    return resposta_negociada(request, {
+        "items": linhas_para_dicts(companies),
         "total": total
-    }
+    })
 
 @router.get("/users/{user_id}/companies", response_model=List[CompanyBase])
 async def get_user_companies(
     user_id: UUID, 
+    request: Request,
     current_user: Usuario = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     if current_user.type_user not in ["admin", "superadmin"]:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Acesso negado")
@@ -280,7 +306,16 @@ async def get_user_companies(
     if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Usuário não encontrado")
     
-    return user.empresas
+    companies = db.query(Empresa).with_entities(*COLUNAS_EMPRESA).filter(
+        Empresa.id.in_(ids_empresas_usuario(user_id))
+    ).all()
+    return resposta_negociada(request, linhas_para_dicts(companies))
+
+def bump_access_versions(db: Session, user_id: UUID, company_ids: List[UUID]) -> None:
+    """Invalidate the company directory, the data ETags of companies whose access changed and the user's cached access"""
+    if company_ids:
+        incrementar_versao(db, [ESCOPO_EMPRESAS] + [escopo_empresa(company_id) for company_id in company_ids])
+        publicar(db, ACESSO_USUARIO, [user_id])
 
 @router.post("/users/{user_id}/companies")
 async def assign_companies(
@@ -297,20 +332,118 @@ async def assign_companies(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Usuário não encontrado")
     
     try:
-        # First, remove all existing company associations
-        companies = db.query(Empresa).filter(Empresa.usuario_id == user_id).all()
-        for company in companies:
-            company.usuario_id = None
+        # Replace the user's companies: one DELETE for the ones left out, one INSERT ... SELECT for the new ones
+        revoked = revogar_empresas(db, user_id, manter=assignment.company_ids)
+        assigned = atribuir_empresas(db, user_id, assignment.company_ids)
         
-        # Then, add new company associations
-        for company_id in assignment.company_ids:
-            company = db.query(Empresa).filter(Empresa.id == company_id).first()
-            if company:
-                company.usuario_id = user_id
+        # Invalidate ETags of every company whose access changed
+        bump_access_versions(db, user_id, revoked + assigned)
         
         db.commit()
-        return {"message": "Empresas atribuídas com sucesso"}
+        return {"message": "Empresas atribuídas com sucesso", "assigned": len(assigned), "revoked": len(revoked)}
     
     except Exception as e:
         db.rollback()
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Erro ao atribuir empresas: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Erro ao atribuir empresas: {str(e)}")
+
+@router.post("/users/{user_id}/companies/assign")
+async def bulk_assign_companies(
+    user_id: UUID,
+    assignment: UserCompanyAssignment,
+    current_user: Usuario = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Grant access to the given companies, keeping the user's current ones.
+    Runs as a single INSERT ... SELECT; unknown ids and existing links are ignored.
+    """
+    if current_user.type_user not in ["admin", "superadmin"]:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Acesso negado")
+    
+    if not db.query(Usuario.id).filter(Usuario.id == user_id).first():
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Usuário não encontrado")
+    
+    try:
+        assigned = atribuir_empresas(db, user_id, assignment.company_ids)
+        bump_access_versions(db, user_id, assigned)
+        db.commit()
+        return {"message": "Empresas atribuídas com sucesso", "assigned": len(assigned)}
+    
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Erro ao atribuir empresas: {str(e)}")
+
+@router.post("/users/{user_id}/companies/revoke")
+async def bulk_revoke_companies(
+    user_id: UUID,
+    assignment: UserCompanyAssignment,
+    current_user: Usuario = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Revoke access to the given companies in a single DELETE.
+    """
+    if current_user.type_user not in ["admin", "superadmin"]:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Acesso negado")
+    
+    if not db.query(Usuario.id).filter(Usuario.id == user_id).first():
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Usuário não encontrado")
+    
+    try:
+        revoked = revogar_empresas(db, user_id, assignment.company_ids)
+        bump_access_versions(db, user_id, revoked)
+        db.commit()
+        return {"message": "Acesso às empresas revogado com sucesso", "revoked": len(revoked)}
+    
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Erro ao revogar empresas: {str(e)}")
+
+# Profiles recorded by ProfilingMiddleware (X-Profile header / ?__profile=1)
+@router.get("/profiles")
+async def list_profiles(
+    limit: int = Query(50, ge=1, le=500),
+    current_user: Usuario = Depends(get_current_user)
+):
+    """
+    List the most recent request profiles, newest first.
+    """
+    if current_user.type_user not in ["admin", "superadmin"]:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Acesso negado")
+    
+    items = listar_perfis(limit)
+    return {"items": items, "total": len(items)}
+
+@router.get("/profiles/{profile_id}")
+async def get_profile(
+    profile_id: str,
+    current_user: Usuario = Depends(get_current_user)
+):
+    """
+    Profile metadata, profiler summary and the SQL executed during the request.
+    """
+    if current_user.type_user not in ["admin", "superadmin"]:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Acesso negado")
+    
+    perfil = obter_perfil(profile_id)
+    if perfil is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Perfil não encontrado")
+    return perfil
+
+@router.get("/profiles/{profile_id}/download")
+async def download_profile(
+    profile_id: str,
+    current_user: Usuario = Depends(get_current_user)
+):
+    """
+    Download the raw profile (pyinstrument HTML).
+    """
+    if current_user.type_user not in ["admin", "superadmin"]:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Acesso negado")
+    
+    caminho = arquivo_perfil(profile_id)
+    if caminho is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Perfil não encontrado")
+    
+    media_type = "text/html" if caminho.suffix == ".html" else "application/octet-stream"
+    return FileResponse(caminho, media_type=media_type, filename=caminho.name)
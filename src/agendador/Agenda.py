@@ -0,0 +1,142 @@
+"""
+Agenda declarativa dos jobs de importação, usada pelo agendador (src/agendador/Agendador.py)
+e pela API de execuções (src/agendador/AgendadorRoutes.py).
+
+Periodicidade:
+    "every 30m", "every 6h", "every 1d"  intervalo alinhado ao relógio (UTC): every 6h roda 00h, 06h, 12h e 18h UTC
+    "daily 02:30"                        todo dia no horário, em SCHEDULER_TIMEZONE
+    "off"                                desativado
+
+SCHEDULE_<JOB> substitui a periodicidade declarada (ex.: SCHEDULE_FUNCIONARIOS="every 2h").
+
+Atraso (misfire): quando o agendador passa do horário (ficou parado, ou a máquina
+travou), os horários perdidos viram uma só execução. Até `tolerancia` segundos de
+atraso o job roda normalmente; acima disso, ao_perder="executar" roda assim mesmo
+e ao_perder="pular" registra a execução como perdida e espera o próximo horário.
+"""
+
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import List, Optional, Sequence
+import os
+import re
+import sys
+
+try:
+    from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+except ImportError:
+    ZoneInfo = None
+
+ROOT_DIR = Path(__file__).resolve().parent.parent.parent
+
+def _fuso_horario():
+    nome = os.getenv("SCHEDULER_TIMEZONE", "America/Sao_Paulo")
+    if ZoneInfo is not None:
+        try:
+            return ZoneInfo(nome)
+        except (ZoneInfoNotFoundError, ValueError):
+            pass
+    # Sem a base de fusos (tzdata), usa o fuso da máquina
+    return datetime.now().astimezone().tzinfo
+
+SCHEDULER_TIMEZONE = _fuso_horario()
+
+UNIDADES = {"m": 60, "h": 3600, "d": 86400}
+AO_PERDER = ("executar", "pular")
+
+def agora() -> datetime:
+    # UTC sem fuso, como as demais colunas DateTime do banco (datetime.utcnow)
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+class Periodicidade:
+    """
+    Horários de execução de um job a partir de uma expressão ("every 6h", "daily 02:30", "off").
+    """
+    def __init__(self, expressao: str):
+        self.expressao = expressao.strip().lower()
+        self.intervalo: Optional[int] = None
+        self.horario: Optional[tuple] = None
+
+        intervalo = re.fullmatch(r"every\s+(\d+)\s*([mhd])", self.expressao)
+        diario = re.fullmatch(r"daily\s+(\d{1,2}):(\d{2})", self.expressao)
+        if intervalo:
+            self.intervalo = int(intervalo.group(1)) * UNIDADES[intervalo.group(2)]
+            if self.intervalo <= 0:
+                raise ValueError(f"Intervalo inválido: {expressao}")
+        elif diario:
+            self.horario = (int(diario.group(1)), int(diario.group(2)))
+            if self.horario[0] > 23 or self.horario[1] > 59:
+                raise ValueError(f"Horário inválido: {expressao}")
+        elif self.expressao != "off":
+            raise ValueError(f"Periodicidade inválida: {expressao} (use 'every 30m', 'daily 02:30' ou 'off')")
+
+    @property
+    def ativa(self) -> bool:
+        return self.expressao != "off"
+
+    def proxima(self, apos: datetime) -> Optional[datetime]:
+        """
+        Primeiro horário estritamente depois de `apos` (UTC sem fuso), ou None se desativada.
+        """
+        if self.intervalo is not None:
+            segundos = int(apos.replace(tzinfo=timezone.utc).timestamp())
+            proximo = (segundos // self.intervalo + 1) * self.intervalo
+            return datetime.fromtimestamp(proximo, timezone.utc).replace(tzinfo=None)
+        if self.horario is not None:
+            local = apos.replace(tzinfo=timezone.utc).astimezone(SCHEDULER_TIMEZONE)
+            candidato = local.replace(hour=self.horario[0], minute=self.horario[1], second=0, microsecond=0)
+            if candidato <= local:
+                candidato = candidato + timedelta(days=1)
+            return candidato.astimezone(timezone.utc).replace(tzinfo=None)
+        return None
+
+    def __str__(self) -> str:
+        return self.expressao
+
+class Tarefa:
+    """
+    Um job da agenda: script em jobs/ executado como subprocesso.
+    """
+    def __init__(
+        self,
+        nome: str,
+        script: str,
+        periodicidade: str,
+        argumentos: Sequence[str] = (),
+        tolerancia: int = 600,
+        ao_perder: str = "executar",
+        timeout: int = 4 * 3600,
+    ):
+        if ao_perder not in AO_PERDER:
+            raise ValueError(f"ao_perder inválido para {nome}: {ao_perder}")
+        self.nome = nome
+        self.script = script
+        self.periodicidade = Periodicidade(os.getenv(f"SCHEDULE_{nome.upper()}", periodicidade))
+        self.argumentos = list(argumentos)
+        self.tolerancia = tolerancia
+        self.ao_perder = ao_perder
+        self.timeout = timeout
+
+    @property
+    def caminho(self) -> Path:
+        return ROOT_DIR / self.script
+
+    @property
+    def ativa(self) -> bool:
+        return self.periodicidade.ativa and self.caminho.exists()
+
+    def comando(self, argumentos_extras: Sequence[str] = ()) -> List[str]:
+        return [sys.executable, str(self.caminho), *self.argumentos, *argumentos_extras]
+
+# Os jobs obtêm os próprios advisory locks (database/Bloqueios.py): o agendador não precisa
+# conhecer as empresas, e execuções manuais ou pelo cron também respeitam os bloqueios.
+# Novos jobs (ex.: exames, atestados) entram aqui quando existirem em jobs/:
+#     Tarefa("exames", "jobs/ImportarExames.py", "every 6h", tolerancia=1800),
+# Importação de funcionários distribuída: argumentos=["--workers", "4"]; outras máquinas
+# entram na mesma fila com `python jobs/ImportarFuncionarios.py --worker`.
+AGENDA = [
+    Tarefa("empresas", "jobs/ImportarEmpresas.py", "daily 02:00", tolerancia=3600),
+    Tarefa("funcionarios", "jobs/ImportarFuncionarios.py", "every 6h", tolerancia=1800),
+]
+
+TAREFAS = {tarefa.nome: tarefa for tarefa in AGENDA}
@@ -0,0 +1,286 @@
+"""
+Agendador dos jobs de importação (agenda em src/agendador/Agenda.py).
+
+Roda cada job como subprocesso no horário da agenda e grava as execuções em
+execucoes_jobs (consultadas em /api/admin/jobs). Os jobs obtêm advisory locks por job
+e por empresa (database/Bloqueios.py), então duas execuções nunca importam a mesma
+empresa ao mesmo tempo, mesmo com outro agendador, o cron ou uma execução manual;
+um job que encontra o bloqueio ocupado sai e a execução fica registrada como ignorada.
+Neste processo, um job que ainda está rodando no horário seguinte não é iniciado de novo.
+
+Uso:
+    python src/agendador/Agendador.py                     # serviço
+    python src/agendador/Agendador.py --list              # agenda, últimas e próximas execuções
+    python src/agendador/Agendador.py --run funcionarios  # executa agora (registrada como manual)
+    python src/agendador/Agendador.py --run funcionarios -- --empresa 123
+"""
+
+import sys
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent.parent
+sys.path.append(str(ROOT_DIR))
+
+import os
+import time
+import socket
+import signal
+import logging
+import argparse
+import tempfile
+import threading
+import subprocess
+from datetime import datetime
+from typing import Dict, Optional, Sequence
+
+from sqlalchemy import func, update
+
+from database.Dependencias import SessionLocal
+from database.Bloqueios import CODIGO_SAIDA_BLOQUEADO
+from models.ExecucoesJobsSchema import ExecucaoJob
+from src.agendador.Agenda import AGENDA, TAREFAS, Tarefa, agora
+
+logger = logging.getLogger("agendador")
+
+# Espera máxima entre verificações da agenda (o relógio pode ser ajustado)
+SCHEDULER_POLL_SECONDS = float(os.getenv("SCHEDULER_POLL_SECONDS", "30"))
+# Quanto do final da saída do job fica gravado em execucoes_jobs.detalhe
+SCHEDULER_OUTPUT_TAIL = int(os.getenv("SCHEDULER_OUTPUT_TAIL", "4000"))
+
+HOST = socket.gethostname()
+
+def registrar_execucao(tarefa: Tarefa, status: str, agendada_para: Optional[datetime], origem: str, detalhe: Optional[str] = None):
+    """
+    Grava uma execução. Returns: id, ou None se o banco estiver fora (o job roda assim mesmo).
+    """
+    db = SessionLocal()
+    try:
+        execucao = ExecucaoJob(
+            job=tarefa.nome, status=status, origem=origem, agendada_para=agendada_para,
+            dt_inicio=agora(), host=HOST, pid=os.getpid(), detalhe=detalhe
+        )
+        if status != "executando":
+            execucao.dt_fim = execucao.dt_inicio
+            execucao.duracao_segundos = 0.0
+        db.add(execucao)
+        db.commit()
+        return execucao.id
+    except Exception as e:
+        logger.error(f"Erro ao registrar execução de {tarefa.nome}: {str(e)}")
+        db.rollback()
+        return None
+    finally:
+        db.close()
+
+def finalizar_execucao(execucao_id, status: str, codigo_saida: Optional[int], duracao: float, detalhe: Optional[str]) -> None:
+    if execucao_id is None:
+        return
+    db = SessionLocal()
+    try:
+        db.execute(
+            update(ExecucaoJob).where(ExecucaoJob.id == execucao_id).values(
+                status=status, codigo_saida=codigo_saida, dt_fim=agora(),
+                duracao_segundos=round(duracao, 3), detalhe=detalhe
+            )
+        )
+        db.commit()
+    except Exception as e:
+        logger.error(f"Erro ao finalizar execução {execucao_id}: {str(e)}")
+        db.rollback()
+    finally:
+        db.close()
+
+def ultima_agendada(nome: str) -> Optional[datetime]:
+    """
+    Último horário da agenda já tratado para o job (executado, ignorado ou perdido).
+    """
+    db = SessionLocal()
+    try:
+        return db.query(func.max(ExecucaoJob.agendada_para)).filter(
+            ExecucaoJob.job == nome, ExecucaoJob.origem == "agendador"
+        ).scalar()
+    finally:
+        db.close()
+
+def processo_ativo(pid: Optional[int]) -> bool:
+    if not pid:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+def encerrar_orfas() -> None:
+    """
+    Execuções "executando" desta máquina cujo agendador não existe mais (parou no meio).
+    """
+    db = SessionLocal()
+    try:
+        orfas = db.query(ExecucaoJob).filter(ExecucaoJob.status == "executando", ExecucaoJob.host == HOST).all()
+        for execucao in orfas:
+            if not processo_ativo(execucao.pid):
+                execucao.status = "interrompida"
+                execucao.dt_fim = agora()
+                execucao.detalhe = "O agendador parou durante a execução"
+        db.commit()
+    finally:
+        db.close()
+
+def final_da_saida(arquivo) -> str:
+    arquivo.seek(0, os.SEEK_END)
+    tamanho = arquivo.tell()
+    arquivo.seek(max(0, tamanho - SCHEDULER_OUTPUT_TAIL))
+    return arquivo.read().decode("utf-8", errors="replace")
+
+def executar_tarefa(
+    tarefa: Tarefa,
+    agendada_para: Optional[datetime],
+    origem: str = "agendador",
+    detalhe: Optional[str] = None,
+    argumentos_extras: Sequence[str] = (),
+) -> Optional[int]:
+    """
+    Executa o job e grava o resultado. Returns: código de saída (None em timeout/erro).
+    """
+    execucao_id = registrar_execucao(tarefa, "executando", agendada_para, origem, detalhe)
+    logger.info(f"Iniciando {tarefa.nome}" + (f" ({detalhe})" if detalhe else ""))
+    inicio = time.monotonic()
+    codigo_saida = None
+
+    # A saída vai para um arquivo temporário: só o final é guardado, sem acumular tudo em memória
+    with tempfile.TemporaryFile() as saida:
+        try:
+            processo = subprocess.run(
+                tarefa.comando(argumentos_extras), cwd=ROOT_DIR, stdout=saida, stderr=subprocess.STDOUT,
+                timeout=tarefa.timeout
+            )
+            codigo_saida = processo.returncode
+            if codigo_saida == 0:
+                status = "sucesso"
+            elif codigo_saida == CODIGO_SAIDA_BLOQUEADO:
+                status = "ignorada"
+            else:
+                status = "falha"
+            texto = final_da_saida(saida)
+        except subprocess.TimeoutExpired:
+            status = "falha"
+            texto = f"Tempo limite de {tarefa.timeout}s excedido\n" + final_da_saida(saida)
+        except Exception as e:
+            status = "falha"
+            texto = f"Erro ao iniciar o job: {str(e)}"
+
+    duracao = time.monotonic() - inicio
+    if detalhe:
+        texto = f"{detalhe}\n{texto}"
+    finalizar_execucao(execucao_id, status, codigo_saida, duracao, texto)
+    logger.info(f"{tarefa.nome}: {status} em {duracao:.1f}s (código {codigo_saida})")
+    return codigo_saida
+
+class Agendador:
+    """
+    Mantém o próximo horário de cada job e inicia os que venceram, um thread por job.
+    """
+    def __init__(self, tarefas: Sequence[Tarefa]):
+        self.tarefas = [tarefa for tarefa in tarefas if tarefa.ativa]
+        self.proximas: Dict[str, datetime] = {}
+        self.em_execucao: Dict[str, threading.Thread] = {}
+        self._parar = threading.Event()
+
+    def carregar(self) -> None:
+        encerrar_orfas()
+        momento = agora()
+        for tarefa in self.tarefas:
+            # Continua de onde a agenda parou: um horário vencido durante a parada é tratado como atraso
+            ultima = ultima_agendada(tarefa.nome)
+            self.proximas[tarefa.nome] = tarefa.periodicidade.proxima(ultima or momento)
+            logger.info(f"{tarefa.nome}: {tarefa.periodicidade}, próxima execução {self.proximas[tarefa.nome]:%Y-%m-%d %H:%M} UTC")
+
+    def executar_vencidas(self, momento: datetime) -> None:
+        for tarefa in self.tarefas:
+            prevista = self.proximas[tarefa.nome]
+            if momento < prevista:
+                continue
+
+            # Horários perdidos viram uma só execução
+            self.proximas[tarefa.nome] = tarefa.periodicidade.proxima(momento)
+            atraso = (momento - prevista).total_seconds()
+
+            thread = self.em_execucao.get(tarefa.nome)
+            if thread is not None and thread.is_alive():
+                registrar_execucao(tarefa, "ignorada", prevista, "agendador", "Execução anterior ainda em andamento")
+                logger.warning(f"{tarefa.nome}: execução anterior ainda em andamento, horário {prevista:%H:%M} ignorado")
+                continue
+
+            detalhe = None
+            if atraso > tarefa.tolerancia:
+                detalhe = f"Atraso de {atraso:.0f}s (tolerância {tarefa.tolerancia}s)"
+                if tarefa.ao_perder == "pular":
+                    registrar_execucao(tarefa, "perdida", prevista, "agendador", detalhe)
+                    logger.warning(f"{tarefa.nome}: horário {prevista:%Y-%m-%d %H:%M} perdido. {detalhe}")
+                    continue
+
+            thread = threading.Thread(
+                target=executar_tarefa, args=(tarefa, prevista, "agendador", detalhe),
+                name=f"job-{tarefa.nome}", daemon=True
+            )
+            self.em_execucao[tarefa.nome] = thread
+            thread.start()
+
+    def servir(self) -> None:
+        self.carregar()
+        while not self._parar.is_set():
+            self.executar_vencidas(agora())
+            espera = min((proxima - agora()).total_seconds() for proxima in self.proximas.values()) if self.proximas else SCHEDULER_POLL_SECONDS
+            self._parar.wait(max(0.5, min(espera, SCHEDULER_POLL_SECONDS)))
+
+        # Jobs em andamento terminam normalmente (os bloqueios caem com eles)
+        for nome, thread in self.em_execucao.items():
+            if thread.is_alive():
+                logger.info(f"Aguardando {nome} terminar")
+                thread.join()
+
+    def parar(self, *_) -> None:
+        logger.info("Encerrando o agendador")
+        self._parar.set()
+
+def listar() -> None:
+    momento = agora()
+    print(f"{'job':<14} {'periodicidade':<14} {'tolerância':>10} {'ao perder':<10} {'última execução':<36} próxima (UTC)")
+    for tarefa in AGENDA:
+        db = SessionLocal()
+        try:
+            ultima = db.query(ExecucaoJob).filter(ExecucaoJob.job == tarefa.nome).order_by(ExecucaoJob.dt_inicio.desc()).first()
+        finally:
+            db.close()
+        proxima = tarefa.periodicidade.proxima(ultima_agendada(tarefa.nome) or momento) if tarefa.ativa else None
+        descricao = f"{ultima.status} {ultima.dt_inicio:%Y-%m-%d %H:%M}" if ultima else "-"
+        estado = f"{proxima:%Y-%m-%d %H:%M}" if proxima else ("desativado" if tarefa.caminho.exists() else f"{tarefa.script} não existe")
+        print(f"{tarefa.nome:<14} {str(tarefa.periodicidade):<14} {tarefa.tolerancia:>9}s {tarefa.ao_perder:<10} {descricao:<36} {estado}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Agendador dos jobs de importação")
+    parser.add_argument("--list", action="store_true", help="Mostra a agenda, as últimas e as próximas execuções")
+    parser.add_argument("--run", metavar="JOB", choices=sorted(TAREFAS), help="Executa um job agora")
+    parser.add_argument("argumentos", nargs="*", help="Argumentos extras para o job (após --)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="[%(asctime)s] %(levelname)s %(name)s - %(message)s")
+
+    if args.list:
+        listar()
+        return
+
+    if args.run:
+        codigo_saida = executar_tarefa(TAREFAS[args.run], None, "manual", argumentos_extras=args.argumentos)
+        sys.exit(1 if codigo_saida is None else codigo_saida)
+
+    agendador = Agendador(AGENDA)
+    signal.signal(signal.SIGTERM, agendador.parar)
+    signal.signal(signal.SIGINT, agendador.parar)
+    agendador.servir()
+
+if __name__ == "__main__":
+    main()
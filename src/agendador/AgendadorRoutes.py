@@ -0,0 +1,133 @@
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Query
+from sqlalchemy.orm import Session
+from sqlalchemy import func, case
+from typing import Dict, Any, Optional
+from uuid import UUID
+import math
+
+from database.Dependencias import get_read_db
+from models.UsuariosSchema import Usuario
+from models.ExecucoesJobsSchema import ExecucaoJob
+from src.autenticacao.Login import get_current_user
+from src.utils.serializacao import ORJSONResponse, resposta_negociada, linhas_para_dicts
+from src.agendador.Agenda import AGENDA, agora
+
+router = APIRouter(prefix="/api/admin/jobs", default_response_class=ORJSONResponse)
+
+# Colunas do histórico (o detalhe, com a saída do job, só no endpoint da execução)
+COLUNAS_EXECUCAO = (
+    ExecucaoJob.id,
+    ExecucaoJob.job,
+    ExecucaoJob.status,
+    ExecucaoJob.origem,
+    ExecucaoJob.agendada_para,
+    ExecucaoJob.dt_inicio,
+    ExecucaoJob.dt_fim,
+    ExecucaoJob.duracao_segundos,
+    ExecucaoJob.codigo_saida,
+    ExecucaoJob.host,
+)
+
+def verificar_admin(current_user: Usuario) -> None:
+    if current_user.type_user not in ["admin", "superadmin"]:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Acesso negado")
+
+@router.get("", response_model=Dict[str, Any])
+async def list_jobs(
+    request: Request,
+    current_user: Usuario = Depends(get_current_user),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Jobs da agenda com a última execução e a próxima prevista.
+    """
+    verificar_admin(current_user)
+
+    # Uma consulta agrupada e uma pelas últimas execuções, qualquer que seja o número de jobs
+    resumo = {
+        linha.job: linha for linha in db.query(
+            ExecucaoJob.job,
+            func.max(ExecucaoJob.dt_inicio).label("ultimo_inicio"),
+            func.max(case((ExecucaoJob.origem == "agendador", ExecucaoJob.agendada_para))).label("ultima_agendada"),
+        ).group_by(ExecucaoJob.job)
+    }
+    ultimas = {}
+    if resumo:
+        ultimas = {
+            linha.job: linha._asdict() for linha in db.query(*COLUNAS_EXECUCAO).filter(
+                ExecucaoJob.job.in_(list(resumo)),
+                ExecucaoJob.dt_inicio.in_([linha.ultimo_inicio for linha in resumo.values()])
+            )
+            if linha.dt_inicio == resumo[linha.job].ultimo_inicio
+        }
+
+    momento = agora()
+    jobs = []
+    for tarefa in AGENDA:
+        linha = resumo.get(tarefa.nome)
+        jobs.append({
+            "nome": tarefa.nome,
+            "script": tarefa.script,
+            "periodicidade": str(tarefa.periodicidade),
+            "ativo": tarefa.ativa,
+            "tolerancia_segundos": tarefa.tolerancia,
+            "ao_perder": tarefa.ao_perder,
+            "ultima_execucao": ultimas.get(tarefa.nome),
+            # Vencida (no passado) se o agendador não estiver rodando
+            "proxima_execucao": tarefa.periodicidade.proxima(
+                (linha.ultima_agendada if linha else None) or momento
+            ) if tarefa.ativa else None,
+        })
+
+    return resposta_negociada(request, {"items": jobs})
+
+@router.get("/runs", response_model=Dict[str, Any])
+async def list_runs(
+    request: Request,
+    page: int = Query(1, ge=1, description="Número da página"),
+    limit: int = Query(50, ge=1, le=200, description="Itens por página"),
+    job: Optional[str] = None,
+    status_execucao: Optional[str] = Query(None, alias="status"),
+    current_user: Usuario = Depends(get_current_user),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Histórico de execuções, mais recentes primeiro.
+    """
+    verificar_admin(current_user)
+
+    query = db.query(ExecucaoJob)
+    if job:
+        query = query.filter(ExecucaoJob.job == job)
+    if status_execucao:
+        query = query.filter(ExecucaoJob.status == status_execucao)
+
+    total = query.count()
+    execucoes = query.order_by(ExecucaoJob.dt_inicio.desc(), ExecucaoJob.id).with_entities(
+        *COLUNAS_EXECUCAO
+    ).offset((page - 1) * limit).limit(limit).all()
+
+    return resposta_negociada(request, {
+        "items": linhas_para_dicts(execucoes),
+        "total": total,
+        "page": page,
+        "limit": limit,
+        "pages": math.ceil(total / limit) if total > 0 else 0
+    })
+
+@router.get("/runs/{execucao_id}", response_model=Dict[str, Any])
+async def get_run(
+    execucao_id: UUID,
+    request: Request,
+    current_user: Usuario = Depends(get_current_user),
+    db: Session = Depends(get_read_db)
+):
+    verificar_admin(current_user)
+
+    execucao = db.query(*COLUNAS_EXECUCAO, ExecucaoJob.pid, ExecucaoJob.detalhe).filter(
+        ExecucaoJob.id == execucao_id
+    ).first()
+    if not execucao:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Execução não encontrada")
+
+    return resposta_negociada(request, execucao._asdict())
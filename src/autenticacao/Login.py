@@ -1,7 +1,7 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Response, Cookie
+from fastapi import APIRouter, Depends, HTTPException, status, Response, Cookie, Request
 from fastapi_login import LoginManager
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordRequestForm
-from passlib.hash import bcrypt
 from sqlalchemy.orm import sessionmaker, Session
 from jose import jwt, JWTError
 import os
@@ -14,6 +14,7 @@ from typing import Optional, Dict, Any, Union
 from models.UsuariosSchema import Usuario
 from database.Engine import engine
 from database.Dependencias import get_db
+from src.utils.senhas import verificar_senha_e_atualizar
 
 load_dotenv()
 SECRET = os.getenv("SECRET_KEY", "sxZyrN1u18flZ9V0YglqjNi9U5oDiYkE")
@@ -87,14 +88,15 @@ def get_user_response_data(user: Usuario) -> Dict[str, Any]:
     }
 
 @router.post("/login")
-def login(
+async def login(
     response: Response, 
     data: OAuth2PasswordRequestForm = Depends(), 
     remember: Optional[str] = None,
     db: Session = Depends(get_db)
 ):
     try:
-        user = get_user_by_email(data.username, db)
+        # async só para aguardar o pool de hash; as operações síncronas do banco vão para o threadpool
+        user = await run_in_threadpool(get_user_by_email, data.username, db)
         
         if not user:
             logger.warning(f"Tentativa de login com e-mail inexistente: {data.username}")
@@ -103,13 +105,19 @@ def login(
                 detail="E-mail não encontrado."
             )
 
-        if not bcrypt.verify(data.password, user.senha):
+        senha_valida, novo_hash = await verificar_senha_e_atualizar(data.password, user.senha)
+        if not senha_valida:
             logger.warning(f"Senha incorreta para o e-mail: {data.username}")
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Senha incorreta."
             )
 
+        # Hash gerado com outro custo: grava o novo junto com o último acesso
+        if novo_hash:
+            user.senha = novo_hash
+            logger.info(f"Hash de senha atualizado para o custo atual: {user.email}")
+
         expires_delta = (
             timedelta(days=REMEMBER_TOKEN_EXPIRE_DAYS)
             if remember == "true"
@@ -126,11 +134,15 @@ def login(
         max_age = int(expires_delta.total_seconds())
         set_auth_cookie(response, access_token, max_age)
 
+        # Lido antes do commit: depois dele (expire_on_commit) o acesso aos atributos refaz o SELECT no event loop
+        resposta = get_user_response_data(user)
+        email = user.email
+
         user.dt_last_acess = datetime.utcnow()
-        db.commit()
+        await run_in_threadpool(db.commit)
 
-        logger.info(f"Login bem-sucedido para: {user.email}")
-        return get_user_response_data(user)
+        logger.info(f"Login bem-sucedido para: {email}")
+        return resposta
 
     except HTTPException:
         raise
@@ -169,7 +181,16 @@ def logout(response: Response):
     
     return {"status": "success", "message": "Logout realizado com sucesso"}
 
-def get_current_user(session: Optional[str] = Cookie(None, alias=COOKIE_NAME), db: Session = Depends(get_db)):
+def get_current_user(
+    request: Request,
+    session: Optional[str] = Cookie(None, alias=COOKIE_NAME),
+    db: Session = Depends(get_db)
+):
+    # Sub-requisições do /api/batch já chegam com o usuário autenticado pelo lote
+    batch_user = getattr(request.state, "batch_user", None)
+    if batch_user is not None:
+        return batch_user
+
     if not session:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -203,11 +224,22 @@ def get_current_user(session: Optional[str] = Cookie(None, alias=COOKIE_NAME), d
             detail="Sessão inválida ou expirada"
         )
 
+def get_user_profile_data(user: Usuario) -> Dict[str, Any]:
+    return {
+        "id": str(user.id),
+        "nome": user.nome,
+        "email": user.email,
+        "type_user": user.type_user
+    }
+
 @router.get("/user-profile")
 def user_profile(current_user: Usuario = Depends(get_current_user)):
+    return get_user_profile_data(current_user)
+
+# Verificação de autenticação e perfil em uma única chamada (usada pelo frontend a cada página)
+@router.get("/auth-profile")
+def auth_profile(current_user: Usuario = Depends(get_current_user)):
     return {
-        "id": str(current_user.id),
-        "nome": current_user.nome,
-        "email": current_user.email,
-        "type_user": current_user.type_user
+        "status": "authenticated",
+        "user": get_user_profile_data(current_user)
     }
\ No newline at end of file
@@ -1,7 +1,6 @@
 from fastapi import APIRouter, HTTPException, status, Depends, Response
 from pydantic import BaseModel, EmailStr, constr, Field
 from sqlalchemy.orm import Session
-from passlib.hash import bcrypt
 from datetime import datetime
 import uuid
 import logging
@@ -9,6 +8,7 @@ from typing import Annotated, Dict, Any, Optional
 
 from models.UsuariosSchema import Usuario
 from database.Dependencias import get_db
+from src.utils.senhas import gerar_hash_senha
 
 router = APIRouter(prefix="/api")
 
@@ -46,12 +46,12 @@ class UsuarioResponse(BaseModel):
 def get_user_by_email(db: Session, email: str) -> Optional[Usuario]:
     return db.query(Usuario).filter(Usuario.email == email).first()
 
-def create_user(db: Session, user_data: UsuarioCreate) -> Usuario:
+def create_user(db: Session, user_data: UsuarioCreate, senha_hash: str) -> Usuario:
     usuario = Usuario(
         id=uuid.uuid4(),
         nome=user_data.nome,
         email=user_data.email,
-        senha=bcrypt.hash(user_data.senha),
+        senha=senha_hash,
         type_user=user_data.type_user,
         active=user_data.active,
         dt_criacao=datetime.utcnow()
@@ -82,7 +82,7 @@ async def register_user(
                 detail="E-mail já cadastrado."
             )
         
-        novo_usuario = create_user(db, user)
+        novo_usuario = create_user(db, user, await gerar_hash_senha(user.senha))
         logger.info(f"Novo usuário registrado: {user.email}")
         
         return {
@@ -1,7 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Response, Cookie, Request
 from pydantic import BaseModel, Field
 from sqlalchemy.orm import Session
-from passlib.hash import bcrypt
 import logging
 from datetime import datetime
 from typing import Optional, List, Dict, Any
@@ -9,8 +8,11 @@ import uuid
 
 from models.UsuariosSchema import Usuario
 from models.EmpresasSchema import Empresa
-from database.Dependencias import get_db
+from database.Dependencias import get_db, get_read_db
 from src.autenticacao.Login import get_current_user
+from src.utils.senhas import gerar_hash_senha, verificar_senha
+from src.utils.acesso_empresas import verificar_acesso_empresa, ids_empresas_usuario
+from src.utils.versao_dados import calcular_etag, resposta_nao_modificada, aplicar_etag, ESCOPO_EMPRESAS
 
 # Configuração de logging
 logger = logging.getLogger("user_settings")
@@ -45,7 +47,7 @@ async def change_password(
     db: Session = Depends(get_db)
 ):
     # Verificar se a senha atual está correta
-    if not bcrypt.verify(password_data.current_password, current_user.senha):
+    if not await verificar_senha(password_data.current_password, current_user.senha):
         logger.warning(f"Tentativa de alteração de senha com senha atual incorreta: {current_user.email}")
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -61,7 +63,7 @@ async def change_password(
     
     try:
         # Hash da nova senha
-        hashed_password = bcrypt.hash(password_data.new_password)
+        hashed_password = await gerar_hash_senha(password_data.new_password)
         
         # Atualizar senha do usuário
         current_user.senha = hashed_password
@@ -83,16 +85,24 @@ async def change_password(
 # Endpoint para obter empresas do usuário
 @router.get("/companies", response_model=List[Dict[str, Any]])
 async def get_user_companies(
+    request: Request,
+    response: Response,
     current_user: Usuario = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     try:
+        # Responder 304 sem consultar empresas se o diretório não mudou
+        etag = calcular_etag(request, db, current_user, ESCOPO_EMPRESAS)
+        nao_modificada = resposta_nao_modificada(request, etag)
+        if nao_modificada:
+            return nao_modificada
+        
         # Se for admin ou superadmin, pode acessar todas as empresas
         if current_user.type_user in ["admin", "superadmin"]:
             companies = db.query(Empresa).filter(Empresa.ativo == True).all()
         else:
             # Para usuários comuns, apenas as empresas associadas
-            companies = current_user.empresas
+            companies = db.query(Empresa).filter(Empresa.id.in_(ids_empresas_usuario(current_user.id))).all()
         
         # Converter explicitamente UUIDs para strings para evitar erros de validação
         result = []
@@ -107,6 +117,7 @@ async def get_user_companies(
                 "uf": company.uf
             })
         
+        aplicar_etag(response, etag)
         return result
     
     except Exception as e:
@@ -132,9 +143,9 @@ def get_empresa_ativa(request: Request, db: Session) -> Optional[Empresa]:
     if not empresa_id:
         return None
     
-    # Buscar a empresa no banco de dados
+    # Buscar a empresa pela chave primária (usa o identity map da sessão, compartilhada no /api/batch)
     try:
-        empresa = db.query(Empresa).filter(Empresa.id == empresa_id).first()
+        empresa = db.get(Empresa, uuid.UUID(empresa_id))
         return empresa
     except Exception as e:
         logger.error(f"Erro ao buscar empresa ativa: {str(e)}")
@@ -144,7 +155,7 @@ def get_empresa_ativa(request: Request, db: Session) -> Optional[Empresa]:
 async def get_current_company(
     request: Request,
     current_user: Usuario = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     empresa = get_empresa_ativa(request, db)
     
@@ -153,7 +164,9 @@ async def get_current_company(
         if current_user.type_user in ["admin", "superadmin"]:
             empresa = db.query(Empresa).filter(Empresa.ativo == True).order_by(Empresa.nome_abreviado).first()
         else:
-            empresa = current_user.empresas[0] if current_user.empresas else None
+            empresa = db.query(Empresa).filter(
+                Empresa.id.in_(ids_empresas_usuario(current_user.id))
+            ).order_by(Empresa.nome_abreviado).first()
 
         if empresa:
 
@@ -197,13 +210,7 @@ async def select_company(
             )
         
         # Verificar se o usuário tem acesso a esta empresa
-        if current_user.type_user not in ["admin", "superadmin"]:
-            user_company_ids = [str(c.id) for c in current_user.empresas]
-            if str(empresa.id) not in user_company_ids:
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail="Você não tem acesso a esta empresa"
-                )
+        verificar_acesso_empresa(current_user, empresa.id, db)
         
         # Armazenar a seleção em um cookie
         response.set_cookie(
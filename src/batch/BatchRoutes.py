@@ -0,0 +1,178 @@
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response
+from pydantic import BaseModel
+from sqlalchemy.orm import Session
+from typing import Optional, List, Dict, Any
+from urllib.parse import urlsplit
+import asyncio
+import logging
+import json
+import os
+
+from models.UsuariosSchema import Usuario
+from database.Dependencias import get_read_db
+from src.autenticacao.Login import get_current_user
+from src.utils.serializacao import ORJSONResponse
+
+# Configuração de logging
+logger = logging.getLogger("batch")
+
+router = APIRouter(prefix="/api", default_response_class=ORJSONResponse)
+
+# Limite de sub-requisições por lote
+BATCH_MAX_REQUESTS = int(os.getenv("BATCH_MAX_REQUESTS", "20"))
+
+# Cabeçalhos da requisição do lote que não se aplicam às sub-requisições
+HEADERS_IGNORADOS = {b"content-length", b"content-type", b"transfer-encoding", b"accept", b"if-none-match"}
+
+class SubRequisicao(BaseModel):
+    id: Optional[str] = None
+    path: str
+
+class BatchRequest(BaseModel):
+    requests: List[SubRequisicao]
+
+def validar_caminho(path: str) -> str:
+    """
+    Aceita apenas caminhos internos da API (sem host) e impede lotes aninhados.
+    """
+    partes = urlsplit(path)
+    if partes.scheme or partes.netloc or not partes.path.startswith("/api/"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Caminho inválido para sub-requisição: {path}"
+        )
+    if partes.path.rstrip("/") == "/api/batch":
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Lotes aninhados não são permitidos"
+        )
+    return path
+
+async def executar_sub_requisicao(request: Request, path: str, estado: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Executa um GET interno passando pela aplicação (middlewares, rotas e dependências),
+    sem abrir conexão HTTP. O usuário e a sessão do lote vão no estado do escopo ASGI,
+    onde get_current_user, get_db e get_read_db os encontram.
+
+    Returns:
+        Dict com status, cabeçalhos e corpo bruto da resposta
+    """
+    partes = urlsplit(path)
+    headers = [(nome, valor) for nome, valor in request.scope["headers"] if nome not in HEADERS_IGNORADOS]
+    headers.append((b"accept", b"application/json"))
+
+    scope = {
+        "type": "http",
+        "asgi": request.scope.get("asgi", {"version": "3.0"}),
+        "http_version": request.scope.get("http_version", "1.1"),
+        "method": "GET",
+        "scheme": request.scope.get("scheme", "http"),
+        "server": request.scope.get("server"),
+        "client": request.scope.get("client"),
+        "root_path": request.scope.get("root_path", ""),
+        "path": partes.path,
+        "raw_path": partes.path.encode("utf-8"),
+        "query_string": partes.query.encode("utf-8"),
+        "headers": headers,
+        "state": {**request.scope.get("state", {}), **estado},
+    }
+
+    resposta = {"status": 500, "headers": [], "body": []}
+    concluida = asyncio.Event()
+    corpo_enviado = False
+
+    async def receive():
+        nonlocal corpo_enviado
+        if not corpo_enviado:
+            corpo_enviado = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        # Só sinaliza desconexão depois que a resposta terminou
+        await concluida.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            resposta["status"] = message["status"]
+            resposta["headers"] = message.get("headers", [])
+        elif message["type"] == "http.response.body":
+            resposta["body"].append(message.get("body", b""))
+            if not message.get("more_body", False):
+                concluida.set()
+
+    try:
+        await request.app(scope, receive, send)
+    except Exception as e:
+        # O ServerErrorMiddleware responde 500 e relança a exceção; aqui ela só é registrada
+        logger.error(f"Erro na sub-requisição {path}: {str(e)}")
+        resposta["status"] = 500
+    finally:
+        concluida.set()
+
+    resposta["body"] = b"".join(resposta["body"])
+    return resposta
+
+def decodificar_corpo(resposta: Dict[str, Any]) -> Any:
+    corpo = resposta["body"]
+    if not corpo:
+        return None
+    try:
+        return json.loads(corpo)
+    except ValueError:
+        return corpo.decode("utf-8", errors="replace")
+
+@router.post("/batch")
+async def batch(
+    batch_request: BatchRequest,
+    request: Request,
+    response: Response,
+    current_user: Usuario = Depends(get_current_user),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Executa vários GETs internos com uma única autenticação e uma única sessão de
+    banco, devolvendo todos os resultados numa só resposta.
+
+    As sub-requisições rodam em sequência: todas compartilham a mesma Session
+    (que não pode ser usada concorrentemente) e as rotas fazem I/O de banco
+    bloqueante, então executá-las em paralelo no event loop não sobreporia nada.
+    """
+    if not batch_request.requests:
+        return {"responses": []}
+
+    if len(batch_request.requests) > BATCH_MAX_REQUESTS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Máximo de {BATCH_MAX_REQUESTS} sub-requisições por lote"
+        )
+
+    caminhos = [validar_caminho(sub.path) for sub in batch_request.requests]
+    estado = {"batch_user": current_user, "batch_db": db}
+
+    resultados = []
+    cookies = {}
+    for indice, (sub, path) in enumerate(zip(batch_request.requests, caminhos)):
+        resposta = await executar_sub_requisicao(request, path, estado)
+
+        # Uma falha não pode deixar a transação abortada para as próximas sub-requisições
+        if resposta["status"] >= 500:
+            db.rollback()
+
+        # Cookies definidos pelas sub-requisições (ex.: empresa selecionada) seguem na resposta
+        # do lote; se mais de uma definir o mesmo cookie, vale o último
+        for nome, valor in resposta["headers"]:
+            if nome.lower() == b"set-cookie":
+                valor = valor.decode("latin-1")
+                cookies[valor.split("=", 1)[0]] = valor
+
+        resultados.append({
+            "id": sub.id if sub.id is not None else str(indice),
+            "path": path,
+            "status": resposta["status"],
+            "body": decodificar_corpo(resposta),
+        })
+
+    for valor in cookies.values():
+        response.headers.append("set-cookie", valor)
+
+    logger.info(f"Lote com {len(resultados)} sub-requisições para {current_user.email}")
+    return {"responses": resultados}
@@ -8,8 +8,9 @@ import uuid
 
 from models.UsuariosSchema import Usuario
 from models.EmpresasSchema import Empresa
-from database.Dependencias import get_db
+from database.Dependencias import get_db, get_read_db
 from src.autenticacao.Login import get_current_user
+from src.utils.acesso_empresas import verificar_acesso_empresa
 
 # Configurar o logger
 logger = logging.getLogger("configuracoes")
@@ -36,9 +37,9 @@ def get_empresa_ativa(request: Request, db: Session) -> Optional[Empresa]:
     if not empresa_id:
         return None
     
-    # Buscar a empresa no banco de dados
+    # Buscar a empresa pela chave primária (usa o identity map da sessão, compartilhada no /api/batch)
     try:
-        empresa = db.query(Empresa).filter(Empresa.id == empresa_id).first()
+        empresa = db.get(Empresa, uuid.UUID(empresa_id))
         return empresa
     except Exception as e:
         logger.error(f"Erro ao buscar empresa ativa: {str(e)}")
@@ -49,7 +50,7 @@ def get_empresa_ativa(request: Request, db: Session) -> Optional[Empresa]:
 async def obter_empresa_ativa(
     request: Request,
     current_user: Usuario = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     empresa = get_empresa_ativa(request, db)
     
@@ -60,13 +61,7 @@ async def obter_empresa_ativa(
         )
     
     # Verificar se o usuário tem acesso à empresa (exceto para admin/superadmin)
-    if current_user.type_user not in ["admin", "superadmin"]:
-        user_company_ids = [str(c.id) for c in current_user.empresas]
-        if str(empresa.id) not in user_company_ids:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Você não tem acesso a esta empresa"
-            )
+    verificar_acesso_empresa(current_user, empresa.id, db)
     
     # Converter explicitamente UUID para string
     return {
@@ -97,13 +92,7 @@ async def selecionar_empresa(
         )
     
     # Verificar se o usuário tem acesso à empresa (exceto para admin/superadmin)
-    if current_user.type_user not in ["admin", "superadmin"]:
-        user_company_ids = [str(c.id) for c in current_user.empresas]
-        if str(empresa.id) not in user_company_ids:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Você não tem acesso a esta empresa"
-            )
+    verificar_acesso_empresa(current_user, empresa.id, db)
     
     # Armazenar a seleção em um cookie
     response.set_cookie(
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Request
 from sqlalchemy.orm import Session
 from typing import List, Dict, Any, Optional
 import logging
@@ -6,28 +6,72 @@ import uuid
 
 from models.EmpresasSchema import Empresa
 from models.UsuariosSchema import Usuario
-from database.Dependencias import get_db
+from database.Dependencias import get_read_db
 from src.autenticacao.Login import get_current_user
-from src.utils.acesso_empresas import filtrar_empresas_usuario
+from src.utils.acesso_empresas import verificar_acesso_empresa, ids_empresas_usuario
+from src.utils.serializacao import ORJSONResponse, resposta_negociada, linhas_para_dicts
+from src.utils.versao_dados import calcular_etag, resposta_nao_modificada, aplicar_etag, ESCOPO_EMPRESAS
 
 # Configuração de logging
 logger = logging.getLogger("empresas")
 
-router = APIRouter(prefix="/api/empresas")
+router = APIRouter(prefix="/api/empresas", default_response_class=ORJSONResponse)
+
+# Colunas retornadas na listagem e no detalhe (evita carregar objetos ORM completos)
+COLUNAS_LISTA_EMPRESA = (
+    Empresa.id,
+    Empresa.codigo,
+    Empresa.nome_abreviado,
+    Empresa.razao_social,
+    Empresa.cnpj,
+    Empresa.endereco,
+    Empresa.numero_endereco,
+    Empresa.bairro,
+    Empresa.cidade,
+    Empresa.uf,
+    Empresa.cep,
+    Empresa.ativo,
+)
+
+COLUNAS_DETALHE_EMPRESA = (
+    Empresa.id,
+    Empresa.codigo,
+    Empresa.nome_abreviado,
+    Empresa.razao_social,
+    Empresa.razao_social_inicial,
+    Empresa.cnpj,
+    Empresa.endereco,
+    Empresa.numero_endereco,
+    Empresa.complemento_endereco,
+    Empresa.bairro,
+    Empresa.cidade,
+    Empresa.uf,
+    Empresa.cep,
+    Empresa.inscricao_estadual,
+    Empresa.inscricao_municipal,
+    Empresa.ativo,
+)
 
 @router.get("", response_model=Dict[str, Any])
 async def list_empresas(
+    request: Request,
     skip: int = 0,
     limit: int = 100,
     search: Optional[str] = None,
     current_user: Usuario = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Lista empresas com paginação.
     Apenas mostra empresas que o usuário tem acesso.
     """
     try:
+        # Responder 304 sem consultar empresas se o diretório não mudou
+        etag = calcular_etag(request, db, current_user, ESCOPO_EMPRESAS)
+        nao_modificada = resposta_nao_modificada(request, etag)
+        if nao_modificada:
+            return nao_modificada
+        
         # Iniciar a consulta básica
         query = db.query(Empresa)
         
@@ -43,8 +87,7 @@ async def list_empresas(
         # Aplicar filtro para usuários comuns (somente empresas associadas)
         # Para admin/superadmin, sem filtros adicionais
         if current_user.type_user not in ["admin", "superadmin"]:
-            user_company_ids = [c.id for c in current_user.empresas]
-            query = query.filter(Empresa.id.in_(user_company_ids))
+            query = query.filter(Empresa.id.in_(ids_empresas_usuario(current_user.id)))
         
         # Ordenar por nome_abreviado para garantir ordem alfabética
         query = query.order_by(Empresa.nome_abreviado)
@@ -52,31 +95,14 @@ async def list_empresas(
         # Contar total antes de paginação
         total = query.count()
         
-        # Aplicar paginação
-        empresas = query.offset(skip).limit(limit).all()
+        # Aplicar paginação, selecionando apenas as colunas da listagem
+        empresas = query.with_entities(*COLUNAS_LISTA_EMPRESA).offset(skip).limit(limit).all()
         
-        # Converter para dicionários para garantir que UUIDs sejam strings
-        items = []
-        for empresa in empresas:
-            items.append({
-                "id": str(empresa.id),
-                "codigo": empresa.codigo,
-                "nome_abreviado": empresa.nome_abreviado,
-                "razao_social": empresa.razao_social,
-                "cnpj": empresa.cnpj,
-                "endereco": empresa.endereco,
-                "numero_endereco": empresa.numero_endereco,
-                "bairro": empresa.bairro,
-                "cidade": empresa.cidade,
-                "uf": empresa.uf,
-                "cep": empresa.cep,
-                "ativo": empresa.ativo
-            })
-        
-        return {
-            "items": items,
+        response = resposta_negociada(request, {
+            "items": linhas_para_dicts(empresas),
             "total": total
-        }
+        })
+        return aplicar_etag(response, etag)
         
     except Exception as e:
         logger.error(f"Erro ao listar empresas: {str(e)}")
@@ -88,8 +114,9 @@ async def list_empresas(
 @router.get("/{empresa_id}", response_model=Dict[str, Any])
 async def get_empresa(
     empresa_id: str,
+    request: Request,
     current_user: Usuario = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Obtém os detalhes de uma empresa específica.
@@ -97,7 +124,7 @@ async def get_empresa(
     """
     try:
         # Buscar a empresa
-        empresa = db.query(Empresa).filter(Empresa.id == empresa_id).first()
+        empresa = db.query(Empresa).with_entities(*COLUNAS_DETALHE_EMPRESA).filter(Empresa.id == empresa_id).first()
         
         if not empresa:
             raise HTTPException(
@@ -106,35 +133,9 @@ async def get_empresa(
             )
         
         # Verificar permissão
-        if current_user.type_user not in ["admin", "superadmin"]:
-            user_company_ids = [str(c.id) for c in current_user.empresas]
-            if str(empresa.id) not in user_company_ids:
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail="Você não tem acesso a esta empresa"
-                )
-        
-        # Converter para dicionário, garantindo UUIDs como strings
-        result = {
-            "id": str(empresa.id),
-            "codigo": empresa.codigo,
-            "nome_abreviado": empresa.nome_abreviado,
-            "razao_social": empresa.razao_social,
-            "razao_social_inicial": empresa.razao_social_inicial,
-            "cnpj": empresa.cnpj,
-            "endereco": empresa.endereco,
-            "numero_endereco": empresa.numero_endereco,
-            "complemento_endereco": empresa.complemento_endereco,
-            "bairro": empresa.bairro,
-            "cidade": empresa.cidade,
-            "uf": empresa.uf,
-            "cep": empresa.cep,
-            "inscricao_estadual": empresa.inscricao_estadual,
-            "inscricao_municipal": empresa.inscricao_municipal,
-            "ativo": empresa.ativo
-        }
+        verificar_acesso_empresa(current_user, empresa.id, db)
         
-        return result
+        return resposta_negociada(request, empresa._asdict())
         
     except HTTPException:
         raise
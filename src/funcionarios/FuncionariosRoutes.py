@@ -1,20 +1,257 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Request, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import func, text
-from typing import Dict, Any, Optional
+from sqlalchemy import func, text, select, literal, cast, null, union_all, or_, Date, Integer, String
+from typing import Dict, Any, Optional, Sequence, Tuple
+from uuid import UUID
+from datetime import date
 import logging
+import base64
+import json
 import math
 
 from models.FuncionariosSchema import Funcionario
+from models.EmpresasSchema import Empresa
+from models.ExamesSchema import Exame
+from models.AtestadosSchema import Atestado
 from models.UsuariosSchema import Usuario
-from database.Dependencias import get_db
+from database.Dependencias import get_read_db
 from src.autenticacao.Login import get_current_user
-from src.utils.acesso_empresas import obter_empresa_ativa, verificar_acesso_empresa
+from src.utils.acesso_empresas import obter_empresa_ativa
+from src.utils.serializacao import ORJSONResponse, resposta_negociada, linhas_para_dicts
+from src.utils.versao_dados import calcular_etag, resposta_nao_modificada, aplicar_etag, escopo_empresa
 
 # Configuração de logging
 logger = logging.getLogger("funcionarios")
 
-router = APIRouter(prefix="/api")
+router = APIRouter(prefix="/api", default_response_class=ORJSONResponse)
+
+# Colunas retornadas na listagem (evita carregar objetos ORM completos)
+COLUNAS_LISTA_FUNCIONARIO = (
+    Funcionario.id,
+    Funcionario.nome,
+    Funcionario.codigo,
+    Funcionario.cpf,
+    Funcionario.matricula_funcionario,
+    Funcionario.codigo_empresa,
+    Funcionario.nome_empresa,
+    Funcionario.codigo_unidade,
+    Funcionario.nome_unidade,
+    Funcionario.codigo_setor,
+    Funcionario.nome_setor,
+    Funcionario.codigo_cargo,
+    Funcionario.nome_cargo,
+    Funcionario.situacao,
+    Funcionario.data_admissao,
+    Funcionario.data_demissao,
+)
+
+# Colunas retornadas no detalhe do funcionário
+COLUNAS_DETALHE_FUNCIONARIO = (
+    Funcionario.id,
+    Funcionario.nome,
+    Funcionario.codigo,
+    Funcionario.cpf,
+    Funcionario.matricula_funcionario,
+    Funcionario.codigo_empresa,
+    Funcionario.nome_empresa,
+    Funcionario.codigo_unidade,
+    Funcionario.nome_unidade,
+    Funcionario.codigo_setor,
+    Funcionario.nome_setor,
+    Funcionario.codigo_cargo,
+    Funcionario.nome_cargo,
+    Funcionario.cbo_cargo,
+    Funcionario.situacao,
+    Funcionario.sexo,
+    Funcionario.estado_civil,
+    Funcionario.tipo_contratacao,
+    Funcionario.escolaridade,
+    Funcionario.data_nascimento,
+    Funcionario.data_admissao,
+    Funcionario.data_demissao,
+    Funcionario.endereco,
+    Funcionario.numero_endereco,
+    Funcionario.bairro,
+    Funcionario.cidade,
+    Funcionario.uf,
+    Funcionario.cep,
+    Funcionario.telefone_residencial,
+    Funcionario.telefone_celular,
+    Funcionario.tel_comercial,
+    Funcionario.email,
+    Funcionario.rg,
+    Funcionario.orgao_emissor_rg,
+    Funcionario.uf_rg,
+    Funcionario.pis,
+    Funcionario.ctps,
+    Funcionario.serie_ctps,
+    Funcionario.nm_mae_funcionario,
+    Funcionario.naturalidade,
+    Funcionario.deficiente,
+    Funcionario.deficiencia,
+    Funcionario.ramal,
+    Funcionario.regime_revezamento,
+    Funcionario.regime_trabalho,
+    Funcionario.turno_trabalho,
+    Funcionario.nome_centro_custo,
+)
+
+# Colunas das seções de histórico do detalhe completo
+COLUNAS_EXAME = (
+    Exame.id,
+    Exame.codigo_exame,
+    Exame.exame,
+    Exame.ultimo_pedido,
+    Exame.data_resultado,
+    Exame.periodicidade,
+    Exame.refazer,
+    Exame.unidade,
+    Exame.setor,
+    Exame.cargo,
+)
+
+COLUNAS_ATESTADO = (
+    Atestado.id,
+    Atestado.tipo_atestado,
+    Atestado.tipo_licenca,
+    Atestado.dt_inicio_atestado,
+    Atestado.dt_fim_atestado,
+    Atestado.hora_inicio_atestado,
+    Atestado.hora_fim_atestado,
+    Atestado.dias_afastados,
+    Atestado.horas_afastado,
+    Atestado.cid_principal,
+    Atestado.descricao_cid,
+    Atestado.grupo_patologico,
+    Atestado.unidade,
+    Atestado.setor,
+)
+
+# Linha do tempo: fontes na ordem do desempate (data DESC, fonte DESC, id DESC).
+# Cada fonte vira um ramo do UNION ALL com as mesmas colunas
+FONTE_EXAME = "exame"
+FONTE_ATESTADO = "atestado"
+FONTES_LINHA_DO_TEMPO = (FONTE_ATESTADO, FONTE_EXAME)
+
+def ramo_linha_do_tempo(fonte: str):
+    """
+    Colunas (data, fonte, id, código, descrição, fim, dias afastados) e filtro por funcionário de uma fonte.
+    """
+    if fonte == FONTE_EXAME:
+        return Exame, Exame.data_resultado, (
+            Exame.codigo_exame.label("codigo"),
+            Exame.exame.label("descricao"),
+            cast(null(), Date).label("data_fim"),
+            cast(null(), Integer).label("dias_afastados"),
+        )
+    return Atestado, Atestado.dt_inicio_atestado, (
+        Atestado.cid_principal.label("codigo"),
+        Atestado.descricao_cid.label("descricao"),
+        Atestado.dt_fim_atestado.label("data_fim"),
+        Atestado.dias_afastados.label("dias_afastados"),
+    )
+
+def codificar_cursor(linha) -> str:
+    chave = {"data": linha.data.isoformat(), "fonte": linha.fonte, "id": str(linha.id)}
+    return base64.urlsafe_b64encode(json.dumps(chave, separators=(",", ":")).encode()).decode().rstrip("=")
+
+def decodificar_cursor(cursor: str) -> Tuple[date, str, UUID]:
+    try:
+        chave = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        posicao = (date.fromisoformat(chave["data"]), chave["fonte"], UUID(chave["id"]))
+    except (ValueError, TypeError, KeyError):
+        posicao = None
+    if posicao is None or posicao[1] not in FONTES_LINHA_DO_TEMPO:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cursor inválido")
+    return posicao
+
+def consulta_linha_do_tempo(funcionario_id, codigo_empresa: int, limit: int, posicao: Optional[Tuple[date, str, UUID]]):
+    """
+    UNION ALL de exames e atestados já ordenados e limitados em cada ramo: cada fonte lê
+    no máximo limit + 1 linhas pelo seu índice (funcionario_id, data) a partir do cursor,
+    então a página N custa o mesmo que a primeira. Linhas sem data ficam de fora.
+    """
+    ramos = []
+    for fonte in FONTES_LINHA_DO_TEMPO:
+        modelo, coluna_data, colunas = ramo_linha_do_tempo(fonte)
+        filtros = [
+            modelo.funcionario_id == funcionario_id,
+            # codigo_empresa poda as partições de exames/atestados
+            modelo.codigo_empresa == codigo_empresa,
+            coluna_data.isnot(None),
+        ]
+        if posicao is not None:
+            # (data, fonte, id) < cursor, resolvido por fonte para o índice atender o filtro
+            data_cursor, fonte_cursor, id_cursor = posicao
+            if fonte < fonte_cursor:
+                filtros.append(coluna_data <= data_cursor)
+            elif fonte > fonte_cursor:
+                filtros.append(coluna_data < data_cursor)
+            else:
+                # data <= cursor fica separado: é o limite da varredura no índice
+                filtros.append(coluna_data <= data_cursor)
+                filtros.append(or_(coluna_data < data_cursor, modelo.id < id_cursor))
+
+        # NULLS LAST como no índice: sem ele o Postgres não usa o índice para ordenar, mesmo sem datas nulas
+        ramo = select(
+            coluna_data.label("data"), literal(fonte, String).label("fonte"), modelo.id.label("id"), *colunas
+        ).where(*filtros).order_by(coluna_data.desc().nulls_last(), modelo.id.desc()).limit(limit + 1)
+        # Subconsulta: o SQLite não aceita ORDER BY/LIMIT direto num ramo do UNION
+        ramos.append(select(*ramo.subquery().c))
+
+    linha_do_tempo = union_all(*ramos).subquery()
+    return select(linha_do_tempo).order_by(
+        linha_do_tempo.c.data.desc(), linha_do_tempo.c.fonte.desc(), linha_do_tempo.c.id.desc()
+    ).limit(limit + 1)
+
+def buscar_funcionario(db: Session, funcionario_id, empresa_ativa: Empresa):
+    """
+    Busca o funcionário na empresa ativa (com funcionarios particionada, codigo_empresa
+    restringe a busca a uma partição). Lança 403 se ele for de outra empresa e 404 se não existir.
+    """
+    funcionario = db.query(Funcionario).with_entities(*COLUNAS_DETALHE_FUNCIONARIO).filter(
+        Funcionario.id == funcionario_id,
+        Funcionario.codigo_empresa == empresa_ativa.codigo
+    ).first()
+
+    if not funcionario:
+        # Só no caso de erro: busca em todas as empresas para distinguir 403 de 404
+        existe = db.query(Funcionario.id).filter(Funcionario.id == funcionario_id).first()
+        if existe:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Este funcionário não pertence à empresa selecionada"
+            )
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Funcionário não encontrado"
+        )
+    return funcionario
+
+def pagina_secao(db: Session, colunas: Sequence, filtros: Sequence, ordem: Sequence, page: int, limit: int) -> Dict[str, Any]:
+    """
+    Uma página de uma seção do detalhe (exames, atestados) numa única consulta:
+    o total vem junto em count(*) OVER (), sem um COUNT separado.
+    """
+    linhas = db.query(*colunas, func.count().over().label("total_secao")).filter(*filtros).order_by(*ordem).offset(
+        (page - 1) * limit
+    ).limit(limit).all()
+
+    if linhas:
+        total = linhas[0].total_secao
+    elif page > 1:
+        # Página além do fim: a janela não devolve linha nenhuma para informar o total
+        total = db.query(func.count(colunas[0])).filter(*filtros).scalar()
+    else:
+        total = 0
+
+    return {
+        "items": [{k: v for k, v in linha._asdict().items() if k != "total_secao"} for linha in linhas],
+        "total": total,
+        "page": page,
+        "limit": limit,
+        "pages": math.ceil(total / limit) if total > 0 else 0
+    }
 
 @router.get("/funcionarios", response_model=Dict[str, Any])
 async def list_funcionarios(
@@ -24,7 +261,7 @@ async def list_funcionarios(
     search: Optional[str] = None,
     situacao: Optional[str] = None,
     current_user: Usuario = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Lista funcionários com paginação simplificada.
@@ -33,27 +270,34 @@ async def list_funcionarios(
         # Log de diagnóstico
         logger.info(f"Requisição recebida: page={page}, limit={limit}, situacao={situacao}, search={search}")
         
+        # Responder 304 sem consultar funcionários se os dados da empresa não mudaram
+        empresa_id_cookie = request.cookies.get("selected_company")
+        etag = None
+        if empresa_id_cookie:
+            etag = calcular_etag(request, db, current_user, escopo_empresa(empresa_id_cookie))
+            nao_modificada = resposta_nao_modificada(request, etag)
+            if nao_modificada:
+                return nao_modificada
+        
         # Obter empresa ativa
         empresa_ativa = obter_empresa_ativa(request, db, current_user)
         
         if not empresa_ativa:
             logger.warning("Nenhuma empresa selecionada")
-            return {
+            return resposta_negociada(request, {
                 "items": [],
                 "total": 0,
                 "page": page,
                 "limit": limit,
                 "pages": 0
-            }
+            })
 
-        # Verificar acesso à empresa
-        empresa_id = str(empresa_ativa.id)
-        verificar_acesso_empresa(current_user, empresa_id, db)
+        # O acesso à empresa já foi verificado por obter_empresa_ativa (None se não tiver acesso)
         
         # Calcular offset baseado na página
         offset = (page - 1) * limit
         
-        # Construir a consulta base
+        # Construir a consulta base (o filtro por codigo_empresa também poda as partições)
         query = db.query(Funcionario).filter(
             Funcionario.codigo_empresa == empresa_ativa.codigo
         )
@@ -74,8 +318,9 @@ async def list_funcionarios(
         # Contar total de registros
         total = query.count()
         
-        # Ordenação e paginação
-        query = query.order_by(Funcionario.nome)
+        # Ordenação e paginação, selecionando apenas as colunas da listagem
+        # id desempata nomes iguais (ordem estável entre páginas) e fecha o índice (codigo_empresa, nome, id)
+        query = query.order_by(Funcionario.nome, Funcionario.id).with_entities(*COLUNAS_LISTA_FUNCIONARIO)
         funcionarios = query.offset(offset).limit(limit).all()
         
         # Log dos registros recuperados
@@ -84,41 +329,20 @@ async def list_funcionarios(
         # Calcular número total de páginas
         total_pages = math.ceil(total / limit) if total > 0 else 0
         
-        # Converter os resultados para dicionários
-        items = []
-        for funcionario in funcionarios:
-            items.append({
-                "id": str(funcionario.id),
-                "nome": funcionario.nome,
-                "codigo": funcionario.codigo,
-                "cpf": funcionario.cpf,
-                "matricula_funcionario": funcionario.matricula_funcionario,
-                "codigo_empresa": funcionario.codigo_empresa,
-                "nome_empresa": funcionario.nome_empresa,
-                "codigo_unidade": funcionario.codigo_unidade,
-                "nome_unidade": funcionario.nome_unidade,
-                "codigo_setor": funcionario.codigo_setor,
-                "nome_setor": funcionario.nome_setor,
-                "codigo_cargo": funcionario.codigo_cargo,
-                "nome_cargo": funcionario.nome_cargo,
-                "situacao": funcionario.situacao,
-                "data_admissao": funcionario.data_admissao.isoformat() if funcionario.data_admissao else None,
-                "data_demissao": funcionario.data_demissao.isoformat() if funcionario.data_demissao else None
-            })
-        
         # Construir resposta com metadados de paginação
-        return {
-            "items": items,
+        response = resposta_negociada(request, {
+            "items": linhas_para_dicts(funcionarios),
             "total": total,
             "page": page,
             "limit": limit,
             "pages": total_pages,
             "empresa_selecionada": {
-                "id": str(empresa_ativa.id),
+                "id": empresa_ativa.id,
                 "codigo": empresa_ativa.codigo,
                 "nome_abreviado": empresa_ativa.nome_abreviado
             }
-        }
+        })
+        return aplicar_etag(response, etag) if etag else response
         
     except Exception as e:
         logger.error(f"Erro ao listar funcionários: {str(e)}")
@@ -132,7 +356,7 @@ async def get_funcionario(
     funcionario_id: str,
     request: Request,
     current_user: Usuario = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Obtém os detalhes de um funcionário específico.
@@ -147,80 +371,137 @@ async def get_funcionario(
                 detail="Nenhuma empresa selecionada"
             )
         
-        # Buscar o funcionário
-        funcionario = db.query(Funcionario).filter(Funcionario.id == funcionario_id).first()
+        funcionario = buscar_funcionario(db, funcionario_id, empresa_ativa)
+        
+        return resposta_negociada(request, funcionario._asdict())
         
-        if not funcionario:
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Erro ao obter funcionário: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erro ao obter funcionário: {str(e)}"
+        )
+
+@router.get("/funcionarios/{funcionario_id}/completo", response_model=Dict[str, Any])
+async def get_funcionario_completo(
+    funcionario_id: UUID,
+    request: Request,
+    exames_page: int = Query(1, ge=1, description="Página dos exames"),
+    exames_limit: int = Query(20, ge=1, le=100, description="Exames por página"),
+    atestados_page: int = Query(1, ge=1, description="Página dos atestados"),
+    atestados_limit: int = Query(20, ge=1, le=100, description="Atestados por página"),
+    current_user: Usuario = Depends(get_current_user),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Detalhe do funcionário com os exames e atestados mais recentes, cada seção paginada.
+    Três consultas no total, qualquer que seja o tamanho do histórico; as relações
+    Funcionario.exames/atestados (lazy) não são usadas.
+    """
+    try:
+        # Responder 304 sem consultar nada se os dados da empresa não mudaram
+        empresa_id_cookie = request.cookies.get("selected_company")
+        etag = None
+        if empresa_id_cookie:
+            etag = calcular_etag(request, db, current_user, escopo_empresa(empresa_id_cookie))
+            nao_modificada = resposta_nao_modificada(request, etag)
+            if nao_modificada:
+                return nao_modificada
+        
+        empresa_ativa = obter_empresa_ativa(request, db, current_user)
+        
+        if not empresa_ativa:
             raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Funcionário não encontrado"
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Nenhuma empresa selecionada"
             )
         
-        # Verificar se o funcionário pertence à empresa ativa
-        if funcionario.codigo_empresa != empresa_ativa.codigo:
+        funcionario = buscar_funcionario(db, funcionario_id, empresa_ativa)
+        
+        # codigo_empresa junto com funcionario_id: poda as partições de exames e atestados
+        exames = pagina_secao(
+            db, COLUNAS_EXAME,
+            (Exame.funcionario_id == funcionario.id, Exame.codigo_empresa == empresa_ativa.codigo),
+            (Exame.data_resultado.desc().nulls_last(), Exame.id),
+            exames_page, exames_limit
+        )
+        atestados = pagina_secao(
+            db, COLUNAS_ATESTADO,
+            (Atestado.funcionario_id == funcionario.id, Atestado.codigo_empresa == empresa_ativa.codigo),
+            (Atestado.dt_inicio_atestado.desc().nulls_last(), Atestado.id),
+            atestados_page, atestados_limit
+        )
+        
+        response = resposta_negociada(request, {
+            "funcionario": funcionario._asdict(),
+            "exames": exames,
+            "atestados": atestados
+        })
+        return aplicar_etag(response, etag) if etag else response
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Erro ao obter detalhe completo do funcionário: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erro ao obter detalhe completo do funcionário: {str(e)}"
+        )
+
+@router.get("/funcionarios/{funcionario_id}/linha-do-tempo", response_model=Dict[str, Any])
+async def get_linha_do_tempo(
+    funcionario_id: UUID,
+    request: Request,
+    limit: int = Query(20, ge=1, le=100, description="Itens por página"),
+    cursor: Optional[str] = Query(None, description="next_cursor da página anterior"),
+    current_user: Usuario = Depends(get_current_user),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Histórico de saúde do funcionário em ordem cronológica decrescente: exames (data do
+    resultado) e atestados (início) intercalados, paginados por cursor.
+    """
+    try:
+        posicao = decodificar_cursor(cursor) if cursor else None
+        
+        # Responder 304 sem consultar nada se os dados da empresa não mudaram
+        empresa_id_cookie = request.cookies.get("selected_company")
+        etag = None
+        if empresa_id_cookie:
+            etag = calcular_etag(request, db, current_user, escopo_empresa(empresa_id_cookie))
+            nao_modificada = resposta_nao_modificada(request, etag)
+            if nao_modificada:
+                return nao_modificada
+        
+        empresa_ativa = obter_empresa_ativa(request, db, current_user)
+        
+        if not empresa_ativa:
             raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Este funcionário não pertence à empresa selecionada"
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Nenhuma empresa selecionada"
             )
         
-        # Converter para dicionário
-        result = {
-            "id": str(funcionario.id),
-            "nome": funcionario.nome,
-            "codigo": funcionario.codigo,
-            "cpf": funcionario.cpf,
-            "matricula_funcionario": funcionario.matricula_funcionario,
-            "codigo_empresa": funcionario.codigo_empresa,
-            "nome_empresa": funcionario.nome_empresa,
-            "codigo_unidade": funcionario.codigo_unidade,
-            "nome_unidade": funcionario.nome_unidade,
-            "codigo_setor": funcionario.codigo_setor,
-            "nome_setor": funcionario.nome_setor,
-            "codigo_cargo": funcionario.codigo_cargo,
-            "nome_cargo": funcionario.nome_cargo,
-            "cbo_cargo": funcionario.cbo_cargo,
-            "situacao": funcionario.situacao,
-            "sexo": funcionario.sexo,
-            "estado_civil": funcionario.estado_civil,
-            "tipo_contratacao": funcionario.tipo_contratacao,
-            "escolaridade": funcionario.escolaridade,
-            "data_nascimento": funcionario.data_nascimento.isoformat() if funcionario.data_nascimento else None,
-            "data_admissao": funcionario.data_admissao.isoformat() if funcionario.data_admissao else None,
-            "data_demissao": funcionario.data_demissao.isoformat() if funcionario.data_demissao else None,
-            "endereco": funcionario.endereco,
-            "numero_endereco": funcionario.numero_endereco,
-            "bairro": funcionario.bairro,
-            "cidade": funcionario.cidade,
-            "uf": funcionario.uf,
-            "cep": funcionario.cep,
-            "telefone_residencial": funcionario.telefone_residencial,
-            "telefone_celular": funcionario.telefone_celular,
-            "tel_comercial": funcionario.tel_comercial,
-            "email": funcionario.email,
-            "rg": funcionario.rg,
-            "orgao_emissor_rg": funcionario.orgao_emissor_rg,
-            "uf_rg": funcionario.uf_rg,
-            "pis": funcionario.pis,
-            "ctps": funcionario.ctps,
-            "serie_ctps": funcionario.serie_ctps,
-            "nm_mae_funcionario": funcionario.nm_mae_funcionario,
-            "naturalidade": funcionario.naturalidade,
-            "deficiente": funcionario.deficiente,
-            "deficiencia": funcionario.deficiencia,
-            "ramal": funcionario.ramal,
-            "regime_revezamento": funcionario.regime_revezamento,
-            "regime_trabalho": funcionario.regime_trabalho,
-            "turno_trabalho": funcionario.turno_trabalho,
-            "nome_centro_custo": funcionario.nome_centro_custo
-        }
-        
-        return result
+        funcionario = buscar_funcionario(db, funcionario_id, empresa_ativa)
+        
+        linhas = db.execute(consulta_linha_do_tempo(funcionario.id, empresa_ativa.codigo, limit, posicao)).all()
+        
+        # A linha a mais só indica se há próxima página
+        proxima = codificar_cursor(linhas[limit - 1]) if len(linhas) > limit else None
+        
+        response = resposta_negociada(request, {
+            "items": linhas_para_dicts(linhas[:limit]),
+            "limit": limit,
+            "next_cursor": proxima
+        })
+        return aplicar_etag(response, etag) if etag else response
         
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Erro ao obter funcionário: {str(e)}")
+        logger.error(f"Erro ao obter linha do tempo do funcionário: {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Erro ao obter funcionário: {str(e)}"
-        )
\ No newline at end of file
+            detail=f"Erro ao obter linha do tempo do funcionário: {str(e)}"
+        )
@@ -1,13 +1,52 @@
 from fastapi import Request, HTTPException, status
+from sqlalchemy import select, delete, literal
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
 import logging
-from typing import Optional, List, Any
+import uuid
+import os
+from typing import Optional, List, Any, FrozenSet
 
 from models.UsuariosSchema import Usuario
 from models.EmpresasSchema import Empresa
+from models.UsuarioEmpresasSchema import UsuarioEmpresa
+from database.Invalidacao import ACESSO_USUARIO, USUARIO
+from src.utils.cache import CacheTTL
 
 logger = logging.getLogger("acesso_empresas")
 
+# Empresas de cada usuário; o admin publica ACESSO_USUARIO/USUARIO ao alterar vínculos
+CACHE_ACCESS_TTL = float(os.getenv("CACHE_ACCESS_TTL", "300"))
+cache_acesso = CacheTTL(
+    "acesso_usuarios",
+    ttl=CACHE_ACCESS_TTL,
+    invalidado_por={ACESSO_USUARIO: lambda chave: chave, USUARIO: lambda chave: chave},
+)
+
+def empresas_do_usuario(db: Session, usuario_id) -> FrozenSet[str]:
+    """
+    Ids (str) das empresas vinculadas ao usuário, em cache por usuário.
+    """
+    def carregar():
+        # Sempre do primário: uma réplica atrasada guardaria no cache um vínculo já revogado
+        linhas = db.execute(ids_empresas_usuario(usuario_id), bind_arguments={"primario": True})
+        return frozenset(str(empresa_id) for (empresa_id,) in linhas)
+
+    return cache_acesso.obter(str(usuario_id), carregar)
+
+def usuario_tem_acesso(db: Session, usuario_id, empresa_id) -> bool:
+    """
+    Verifica o vínculo usuário/empresa pelo cache de empresas do usuário.
+    """
+    return str(empresa_id) in empresas_do_usuario(db, usuario_id)
+
+def ids_empresas_usuario(usuario_id):
+    """
+    Subconsulta com os ids das empresas do usuário, para filtros como
+    Empresa.id.in_(ids_empresas_usuario(usuario.id)).
+    """
+    return select(UsuarioEmpresa.empresa_id).where(UsuarioEmpresa.usuario_id == usuario_id)
+
 def verificar_acesso_empresa(
     usuario: Usuario, 
     empresa_id: str, 
@@ -30,10 +69,8 @@ def verificar_acesso_empresa(
     if usuario.type_user in ["admin", "superadmin"]:
         return True
     
-    # Para outros usuários, verificar se a empresa está na lista de empresas do usuário
-    user_company_ids = [str(empresa.id) for empresa in usuario.empresas]
-    
-    if empresa_id in user_company_ids:
+    # Para outros usuários, verificar o vínculo na tabela de associação
+    if usuario_tem_acesso(db, usuario.id, empresa_id):
         return True
     
     # Se chegou aqui, não tem acesso
@@ -68,9 +105,9 @@ def obter_empresa_ativa(request: Request, db: Session, usuario: Usuario) -> Opti
     if not empresa_id:
         return None
     
-    # Buscar a empresa no banco de dados
+    # Buscar a empresa pela chave primária (usa o identity map da sessão, compartilhada no /api/batch)
     try:
-        empresa = db.query(Empresa).filter(Empresa.id == empresa_id).first()
+        empresa = db.get(Empresa, uuid.UUID(empresa_id))
         
         if not empresa:
             return None
@@ -84,13 +121,14 @@ def obter_empresa_ativa(request: Request, db: Session, usuario: Usuario) -> Opti
         logger.error(f"Erro ao buscar empresa ativa: {str(e)}")
         return None
 
-def filtrar_empresas_usuario(usuario: Usuario, empresas: List[Empresa]) -> List[Empresa]:
+def filtrar_empresas_usuario(usuario: Usuario, empresas: List[Empresa], db: Session) -> List[Empresa]:
     """
     Filtra uma lista de empresas com base nas permissões do usuário.
     
     Args:
         usuario: Objeto do usuário
         empresas: Lista de empresas a ser filtrada
+        db: Sessão do banco de dados
     
     Returns:
         Lista filtrada de empresas
@@ -100,10 +138,10 @@ def filtrar_empresas_usuario(usuario: Usuario, empresas: List[Empresa]) -> List[
         return empresas
     
     # Para outros usuários, filtrar apenas empresas a que têm acesso
-    user_company_ids = [str(empresa.id) for empresa in usuario.empresas]
+    user_company_ids = empresas_do_usuario(db, usuario.id)
     return [empresa for empresa in empresas if str(empresa.id) in user_company_ids]
 
-def filtrar_dados_por_empresa(usuario: Usuario, empresa_id: str, dados: List[Any], campo_empresa: str = "codigo_empresa") -> List[Any]:
+def filtrar_dados_por_empresa(usuario: Usuario, empresa_id: str, dados: List[Any], db: Session, campo_empresa: str = "codigo_empresa") -> List[Any]:
     """
     Filtra uma lista de dados com base na empresa e nas permissões do usuário.
     
@@ -111,6 +149,7 @@ def filtrar_dados_por_empresa(usuario: Usuario, empresa_id: str, dados: List[Any
         usuario: Objeto do usuário
         empresa_id: ID da empresa selecionada
         dados: Lista de dados a ser filtrada
+        db: Sessão do banco de dados
         campo_empresa: Nome do campo que contém o código da empresa nos dados
     
     Returns:
@@ -125,11 +164,48 @@ def filtrar_dados_por_empresa(usuario: Usuario, empresa_id: str, dados: List[Any
         return dados
     
     # Para outros usuários, verificar se tem acesso à empresa antes de filtrar
-    user_company_ids = [str(empresa.id) for empresa in usuario.empresas]
-    
-    if empresa_id not in user_company_ids:
+    if not usuario_tem_acesso(db, usuario.id, empresa_id):
         # Não tem acesso a esta empresa
         return []
     
     # Tem acesso, então retorna os dados da empresa selecionada
-    return dados
\ No newline at end of file
+    return dados
+
+def atribuir_empresas(db: Session, usuario_id, empresa_ids: List[Any]) -> List[Any]:
+    """
+    Concede acesso às empresas informadas num único INSERT ... SELECT.
+    Ids inexistentes e vínculos já existentes são ignorados.
+    
+    Returns:
+        Ids das empresas efetivamente vinculadas agora
+    """
+    if not empresa_ids:
+        return []
+    
+    stmt = pg_insert(UsuarioEmpresa).from_select(
+        ["usuario_id", "empresa_id"],
+        select(literal(usuario_id, UsuarioEmpresa.usuario_id.type), Empresa.id).where(Empresa.id.in_(empresa_ids))
+    ).on_conflict_do_nothing().returning(UsuarioEmpresa.empresa_id)
+    return list(db.execute(stmt).scalars())
+
+def revogar_empresas(db: Session, usuario_id, empresa_ids: Optional[List[Any]] = None, manter: Optional[List[Any]] = None) -> List[Any]:
+    """
+    Remove vínculos do usuário num único DELETE.
+    
+    Args:
+        db: Sessão do banco de dados
+        usuario_id: ID do usuário
+        empresa_ids: Empresas a revogar (None revoga todas)
+        manter: Empresas que não devem ser revogadas
+    
+    Returns:
+        Ids das empresas desvinculadas
+    """
+    stmt = delete(UsuarioEmpresa).where(UsuarioEmpresa.usuario_id == usuario_id)
+    if empresa_ids is not None:
+        if not empresa_ids:
+            return []
+        stmt = stmt.where(UsuarioEmpresa.empresa_id.in_(empresa_ids))
+    if manter:
+        stmt = stmt.where(UsuarioEmpresa.empresa_id.not_in(manter))
+    return list(db.execute(stmt.returning(UsuarioEmpresa.empresa_id)).scalars())
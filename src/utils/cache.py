@@ -0,0 +1,222 @@
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import threading
+import logging
+import select
+import time
+import os
+
+from sqlalchemy.engine import Engine
+
+from database.Invalidacao import CANAL_INVALIDACAO, ler_payload, entrega_local
+
+logger = logging.getLogger("cache")
+
+# "off" desliga o ouvinte de invalidação (os caches passam a usar só o TTL curto)
+CACHE_INVALIDATION = os.getenv("CACHE_INVALIDATION", "on").lower()
+# TTL máximo enquanto o ouvinte não está conectado (eventos podem estar se perdendo)
+CACHE_TTL_WITHOUT_BUS = float(os.getenv("CACHE_TTL_WITHOUT_BUS", "5"))
+INVALIDATION_RECONNECT_SECONDS = float(os.getenv("INVALIDATION_RECONNECT_SECONDS", "5"))
+# Intervalo do SELECT 1 que detecta conexão do LISTEN caída
+INVALIDATION_KEEPALIVE_SECONDS = float(os.getenv("INVALIDATION_KEEPALIVE_SECONDS", "30"))
+
+# Tipo de evento -> [(cache, função que converte a chave do evento na chave do cache)]
+caches_por_evento: Dict[str, List[Tuple["CacheTTL", Callable[[Optional[str]], Optional[str]]]]] = {}
+caches_registrados: List["CacheTTL"] = []
+
+class CacheTTL:
+    """
+    Cache em memória (por worker) com TTL, invalidado pelos eventos de database/Invalidacao.py.
+
+    invalidado_por mapeia o tipo de evento para a chave do cache afetada; se a função
+    devolver None, o cache inteiro é limpo.
+    """
+    def __init__(self, nome: str, ttl: float, invalidado_por: Dict[str, Callable[[Optional[str]], Optional[str]]], max_itens: int = 10000):
+        self.nome = nome
+        self.ttl = ttl
+        self.max_itens = max_itens
+        self._itens: Dict[Any, Tuple[float, Any]] = {}
+        self._geracao = 0
+        self._lock = threading.Lock()
+        self.acertos = 0
+        self.falhas = 0
+        self.invalidacoes = 0
+
+        caches_registrados.append(self)
+        for tipo, mapear in invalidado_por.items():
+            caches_por_evento.setdefault(tipo, []).append((self, mapear))
+
+    def ttl_efetivo(self) -> float:
+        return self.ttl if ouvinte.ativo else min(self.ttl, CACHE_TTL_WITHOUT_BUS)
+
+    def obter(self, chave: Any, carregar: Callable[[], Any]) -> Any:
+        """
+        Devolve o valor em cache ou chama carregar() e guarda o resultado.
+        """
+        with self._lock:
+            item = self._itens.get(chave)
+            if item is not None and item[0] > time.monotonic():
+                self.acertos += 1
+                return item[1]
+            self.falhas += 1
+            geracao = self._geracao
+
+        valor = carregar()
+
+        with self._lock:
+            # Uma invalidação durante a carga descarta o valor: ele pode ter sido lido antes da escrita
+            if self._geracao == geracao:
+                if chave not in self._itens and len(self._itens) >= self.max_itens:
+                    # dict mantém a ordem de inserção: sai a entrada mais antiga
+                    self._itens.pop(next(iter(self._itens)))
+                self._itens[chave] = (time.monotonic() + self.ttl_efetivo(), valor)
+        return valor
+
+    def invalidar(self, chave: Any = None) -> None:
+        with self._lock:
+            self._geracao += 1
+            self.invalidacoes += 1
+            if chave is None:
+                self._itens.clear()
+            else:
+                self._itens.pop(chave, None)
+
+    def __len__(self) -> int:
+        return len(self._itens)
+
+def invalidar_evento(tipo: str, chave: Optional[str]) -> None:
+    for cache, mapear in caches_por_evento.get(tipo, []):
+        cache.invalidar(mapear(chave))
+
+def limpar_caches() -> None:
+    for cache in caches_registrados:
+        cache.invalidar()
+
+# Eventos publicados por este processo chegam no commit (database/Invalidacao.entregar_pendentes)
+entrega_local.append(invalidar_evento)
+
+class OuvinteInvalidacao:
+    """
+    Thread que mantém uma conexão dedicada com LISTEN no canal de invalidação e
+    aplica os eventos recebidos. Ao (re)conectar limpa todos os caches, porque os
+    eventos publicados enquanto estava desconectado se perderam.
+    """
+    def __init__(self):
+        self.engine: Optional[Engine] = None
+        self.ativo = False
+        self.eventos_recebidos = 0
+        self.eventos_invalidos = 0
+        self.reconexoes = 0
+        self._parar = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def iniciar(self, engine: Engine) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self.engine = engine
+        self._parar.clear()
+        self._thread = threading.Thread(target=self._executar, name="ouvinte-invalidacao", daemon=True)
+        self._thread.start()
+
+    def parar(self) -> None:
+        self._parar.set()
+        if self._thread is not None:
+            self._thread.join(timeout=INVALIDATION_RECONNECT_SECONDS)
+        self._thread = None
+        self.ativo = False
+
+    def _processar(self, payload: str) -> None:
+        evento = ler_payload(payload)
+        if evento is None:
+            self.eventos_invalidos += 1
+            logger.warning(f"Evento de invalidação inválido: {payload[:200]}")
+            return
+        self.eventos_recebidos += 1
+        invalidar_evento(*evento)
+
+    def _executar(self) -> None:
+        while not self._parar.is_set():
+            dbapi = None
+            try:
+                # Fora do pool: a conexão fica presa ao LISTEN pela vida do worker
+                conexao = self.engine.raw_connection()
+                conexao.detach()
+                dbapi = conexao.dbapi_connection
+                dbapi.autocommit = True
+                cursor = dbapi.cursor()
+                cursor.execute(f"LISTEN {CANAL_INVALIDACAO}")
+                cursor.close()
+
+                limpar_caches()
+                self.ativo = True
+                logger.info(f"Ouvinte de invalidação conectado ao canal {CANAL_INVALIDACAO}")
+                self._escutar(dbapi)
+            except Exception as e:
+                if not self._parar.is_set():
+                    self.reconexoes += 1
+                    logger.warning(f"Ouvinte de invalidação desconectado: {str(e).splitlines()[0] if str(e) else e!r}")
+            finally:
+                self.ativo = False
+                # Fechada direto: o rollback do pool falharia numa conexão já caída
+                if dbapi is not None:
+                    try:
+                        dbapi.close()
+                    except Exception:
+                        pass
+            self._parar.wait(INVALIDATION_RECONNECT_SECONDS)
+
+    def _escutar(self, dbapi) -> None:
+        ultimo_keepalive = time.monotonic()
+        while not self._parar.is_set():
+            if hasattr(dbapi, "poll"):
+                # psycopg2: espera o socket ficar legível e consome as notificações
+                if select.select([dbapi], [], [], 1.0)[0]:
+                    dbapi.poll()
+            else:
+                # psycopg 3: o gerador devolve as notificações e para no timeout
+                for notificacao in dbapi.notifies(timeout=1.0):
+                    self._processar(notificacao.payload)
+
+            if time.monotonic() - ultimo_keepalive >= INVALIDATION_KEEPALIVE_SECONDS:
+                # Conexão caída sem aviso (rede, failover) só aparece ao usar o socket
+                cursor = dbapi.cursor()
+                cursor.execute("SELECT 1")
+                cursor.close()
+                ultimo_keepalive = time.monotonic()
+
+            notificacoes = getattr(dbapi, "notifies", None)
+            while isinstance(notificacoes, list) and notificacoes:
+                self._processar(notificacoes.pop(0).payload)
+
+ouvinte = OuvinteInvalidacao()
+
+def iniciar_invalidacao(engine: Engine) -> None:
+    """
+    Inicia o ouvinte de invalidação deste worker (só PostgreSQL e CACHE_INVALIDATION=on).
+    """
+    if CACHE_INVALIDATION == "off":
+        logger.info(f"Invalidação de cache desligada: caches limitados a {CACHE_TTL_WITHOUT_BUS}s")
+        return
+    if engine.dialect.name != "postgresql":
+        logger.info(f"Invalidação por LISTEN/NOTIFY requer PostgreSQL: caches limitados a {CACHE_TTL_WITHOUT_BUS}s")
+        return
+    ouvinte.iniciar(engine)
+
+def parar_invalidacao() -> None:
+    ouvinte.parar()
+
+def metricas_cache() -> Dict[str, Any]:
+    """
+    Estado do ouvinte de invalidação e acertos/falhas de cada cache.
+    """
+    dados = {
+        "barramento_ativo": 1 if ouvinte.ativo else 0,
+        "eventos_recebidos": ouvinte.eventos_recebidos,
+        "eventos_invalidos": ouvinte.eventos_invalidos,
+        "reconexoes": ouvinte.reconexoes,
+    }
+    for cache in caches_registrados:
+        dados[f"{cache.nome}_itens"] = len(cache)
+        dados[f"{cache.nome}_acertos"] = cache.acertos
+        dados[f"{cache.nome}_falhas"] = cache.falhas
+        dados[f"{cache.nome}_invalidacoes"] = cache.invalidacoes
+    return dados
@@ -0,0 +1,71 @@
+from typing import Any, Callable, Dict, Tuple
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# consumidor(conn, cursor, statement, parameters, executemany, duracao)
+Consumidor = Callable[[Any, Any, str, Any, bool, float], None]
+
+# Um único par de eventos por engine mede cada consulta uma vez e entrega a duração aos
+# consumidores (métricas por requisição, rastreio SQL). Tupla trocada inteira: o evento
+# lê sem lock enquanto outra thread registra um consumidor
+consumidores: Dict[Engine, Tuple[Consumidor, ...]] = {}
+# after_cursor_execute registrado em cada engine
+eventos: Dict[Engine, Callable] = {}
+# Quantas vezes cada (engine, consumidor) foi registrado (ex.: perfil sob demanda enquanto roda)
+referencias: Dict[Tuple[Engine, Consumidor], int] = {}
+lock = threading.Lock()
+
+def _antes_consulta(conn, cursor, statement, parameters, context, executemany):
+    # No contexto da execução, não na conexão: uma consulta que falha não deixa resto na conexão do pool.
+    # Sem contexto (SQL interno do SQLAlchemy) a consulta não é medida.
+    if context is not None:
+        context._inicio_consulta = time.perf_counter()
+
+def _depois_consulta(engine: Engine):
+    # Um por engine: conn.engine pode ser um engine derivado (execution_options), não o registrado
+    def depois_consulta(conn, cursor, statement, parameters, context, executemany):
+        inicio = getattr(context, "_inicio_consulta", None)
+        if inicio is None:
+            return
+        duracao = time.perf_counter() - inicio
+        for consumidor in consumidores.get(engine, ()):
+            consumidor(conn, cursor, statement, parameters, executemany, duracao)
+    return depois_consulta
+
+def registrar_consumidor(engine: Engine, consumidor: Consumidor) -> None:
+    """
+    Entrega a duração de cada consulta do engine ao consumidor, até remover_consumidor
+    ser chamado o mesmo número de vezes.
+    """
+    with lock:
+        referencias[(engine, consumidor)] = referencias.get((engine, consumidor), 0) + 1
+        atuais = consumidores.get(engine, ())
+        if consumidor not in atuais:
+            consumidores[engine] = atuais + (consumidor,)
+        if engine not in eventos:
+            eventos[engine] = _depois_consulta(engine)
+            event.listen(engine, "before_cursor_execute", _antes_consulta)
+            event.listen(engine, "after_cursor_execute", eventos[engine])
+
+def remover_consumidor(engine: Engine, consumidor: Consumidor) -> None:
+    """
+    Desfaz um registrar_consumidor. Sem consumidores, os eventos saem do engine e as
+    consultas deixam de ser medidas.
+    """
+    with lock:
+        restantes = referencias.pop((engine, consumidor), 0) - 1
+        if restantes > 0:
+            referencias[(engine, consumidor)] = restantes
+            return
+        atuais = tuple(c for c in consumidores.get(engine, ()) if c is not consumidor)
+        if atuais:
+            consumidores[engine] = atuais
+            return
+        consumidores.pop(engine, None)
+        depois = eventos.pop(engine, None)
+        if depois is not None:
+            event.remove(engine, "before_cursor_execute", _antes_consulta)
+            event.remove(engine, "after_cursor_execute", depois)
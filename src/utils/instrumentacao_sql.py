@@ -0,0 +1,235 @@
+from starlette.types import ASGIApp, Receive, Scope, Send
+from logging.handlers import TimedRotatingFileHandler
+from contextvars import ContextVar
+from collections import Counter
+from datetime import datetime
+from typing import Any, List, Optional, Sequence
+import hashlib
+import logging
+import json
+import time
+import re
+import os
+
+from sqlalchemy.engine import Engine
+
+from src.utils.eventos_sql import registrar_consumidor, remover_consumidor
+from src.utils.metricas import nome_rota
+
+logger = logging.getLogger("instrumentacao_sql")
+
+# "off": desligado; "production": N+1 e log de consultas lentas;
+# "development": também registra no log todas as consultas de cada requisição
+SQL_INSTRUMENTATION = os.getenv("SQL_INSTRUMENTATION", "off").lower()
+SQL_SLOW_QUERY_MS = float(os.getenv("SQL_SLOW_QUERY_MS", "200"))
+# Quantas execuções do mesmo fingerprint numa requisição caracterizam um N+1
+SQL_N_PLUS_ONE_THRESHOLD = int(os.getenv("SQL_N_PLUS_ONE_THRESHOLD", "5"))
+# Anexa o EXPLAIN (sem ANALYZE, não reexecuta a consulta) às consultas lentas
+SQL_EXPLAIN_SLOW = os.getenv("SQL_EXPLAIN_SLOW", "False").lower() == "true"
+
+INSTRUMENTACAO_ATIVA = SQL_INSTRUMENTATION in ("production", "development")
+
+slow_query_logger = logging.getLogger("slow_queries")
+
+# Normalização do SQL em fingerprint: parâmetros e literais viram "?", listas de IN viram "(?+)"
+_PARAMETROS = re.compile(r"%\(\w+\)s|%s|\?|:\w+|\$\d+")
+_STRINGS = re.compile(r"'(?:''|[^'])*'")
+_NUMEROS = re.compile(r"\b\d+(?:\.\d+)?\b")
+_LISTAS = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_ESPACOS = re.compile(r"\s+")
+
+def normalizar_sql(statement: str) -> str:
+    sql = _PARAMETROS.sub("?", statement)
+    sql = _STRINGS.sub("?", sql)
+    sql = _NUMEROS.sub("?", sql)
+    sql = _LISTAS.sub("(?+)", sql)
+    return _ESPACOS.sub(" ", sql).strip()
+
+def fingerprint_sql(sql_normalizado: str) -> str:
+    return hashlib.sha1(sql_normalizado.encode("utf-8")).hexdigest()[:12]
+
+def _formato_valor(valor: Any) -> str:
+    if valor is None:
+        return "null"
+    if isinstance(valor, (list, tuple, set)):
+        return f"{type(valor).__name__}[{len(valor)}]"
+    if isinstance(valor, str):
+        return f"str[{len(valor)}]"
+    return type(valor).__name__
+
+def formato_parametros(parameters: Any, executemany: bool) -> Any:
+    """
+    Descreve os parâmetros pelo tipo (e tamanho), nunca pelo valor: o log não
+    pode carregar CPFs, e-mails ou hashes de senha.
+    """
+    if executemany:
+        linhas = list(parameters or [])
+        return {"executemany": len(linhas), "linha": formato_parametros(linhas[0], False) if linhas else None}
+    if isinstance(parameters, dict):
+        return {nome: _formato_valor(valor) for nome, valor in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [_formato_valor(valor) for valor in parameters]
+    return _formato_valor(parameters)
+
+class RastreioRequisicao:
+    """
+    Consultas executadas durante uma requisição: (fingerprint, sql normalizado, duração).
+    """
+    __slots__ = ("metodo", "rota", "consultas")
+
+    def __init__(self, metodo: str):
+        self.metodo = metodo
+        self.rota: Optional[str] = None
+        self.consultas: List[tuple] = []
+
+rastreio_sql: ContextVar[Optional[RastreioRequisicao]] = ContextVar("rastreio_sql", default=None)
+
+def _rastrear_consulta(conn, cursor, statement, parameters, executemany, duracao):
+    if conn.info.get("explicando"):
+        return
+
+    # Os eventos também podem estar registrados só para o perfilamento sob demanda:
+    # nesse caso não há log de consultas lentas
+    rastreio = rastreio_sql.get()
+    lenta = INSTRUMENTACAO_ATIVA and duracao * 1000 >= SQL_SLOW_QUERY_MS
+    if rastreio is None and not lenta:
+        return
+
+    normalizado = normalizar_sql(statement)
+    fingerprint = fingerprint_sql(normalizado)
+    if rastreio is not None:
+        rastreio.consultas.append((fingerprint, normalizado, duracao))
+
+    if lenta:
+        registrar_consulta_lenta(conn, cursor, statement, parameters, executemany, fingerprint, normalizado, duracao, rastreio)
+
+def _explain(conn, statement: str, parameters: Any) -> Optional[List[str]]:
+    """
+    Executa EXPLAIN num cursor DBAPI separado (o cursor original ainda tem linhas a
+    ler), dentro de um SAVEPOINT para que uma falha não aborte a transação da requisição.
+    """
+    if conn.dialect.name != "postgresql" or not statement.lstrip().upper().startswith(("SELECT", "WITH")):
+        return None
+
+    cursor = conn.connection.cursor()
+    conn.info["explicando"] = True
+    try:
+        cursor.execute("SAVEPOINT sql_explain")
+        try:
+            cursor.execute("EXPLAIN " + statement, parameters)
+            plano = [linha[0] for linha in cursor.fetchall()]
+            cursor.execute("RELEASE SAVEPOINT sql_explain")
+            return plano
+        except Exception as e:
+            cursor.execute("ROLLBACK TO SAVEPOINT sql_explain")
+            return [f"EXPLAIN falhou: {str(e)}"]
+    except Exception as e:
+        logger.warning(f"Não foi possível obter o EXPLAIN: {str(e)}")
+        return None
+    finally:
+        conn.info["explicando"] = False
+        cursor.close()
+
+def registrar_consulta_lenta(conn, cursor, statement, parameters, executemany, fingerprint, normalizado, duracao, rastreio):
+    registro = {
+        "ts": datetime.utcnow().isoformat(timespec="milliseconds"),
+        "duracao_ms": round(duracao * 1000, 2),
+        "fingerprint": fingerprint,
+        "sql": normalizado,
+        "parametros": formato_parametros(parameters, executemany),
+        "linhas": getattr(cursor, "rowcount", None),
+    }
+    if rastreio is not None:
+        registro["metodo"] = rastreio.metodo
+        registro["rota"] = rastreio.rota
+    if SQL_EXPLAIN_SLOW and not executemany:
+        registro["explain"] = _explain(conn, statement, parameters)
+    slow_query_logger.warning(json.dumps(registro, ensure_ascii=False, default=str))
+
+def analisar_requisicao(rastreio: RastreioRequisicao, duracao: float) -> None:
+    """
+    Ao fim da requisição: avisa fingerprints repetidos (N+1) e, em desenvolvimento,
+    registra todas as consultas executadas.
+    """
+    if not rastreio.consultas:
+        return
+
+    repeticoes = Counter(fingerprint for fingerprint, _, _ in rastreio.consultas)
+    sql_por_fingerprint = {fingerprint: sql for fingerprint, sql, _ in rastreio.consultas}
+    tempo_db = sum(d for _, _, d in rastreio.consultas)
+
+    for fingerprint, quantidade in repeticoes.items():
+        if quantidade >= SQL_N_PLUS_ONE_THRESHOLD:
+            logger.warning(
+                f"Possível N+1 em {rastreio.metodo} {rastreio.rota}: {quantidade}x [{fingerprint}] "
+                f"{sql_por_fingerprint[fingerprint][:300]}"
+            )
+
+    if SQL_INSTRUMENTATION == "development":
+        linhas = [
+            f"  {d * 1000:8.2f} ms [{fingerprint}] {sql[:200]}"
+            for fingerprint, sql, d in rastreio.consultas
+        ]
+        logger.info(
+            f"{rastreio.metodo} {rastreio.rota}: {len(rastreio.consultas)} consultas, "
+            f"{tempo_db * 1000:.2f} ms de banco em {duracao * 1000:.2f} ms\n" + "\n".join(linhas)
+        )
+
+class SqlTraceMiddleware:
+    """
+    Registra as consultas SQL de cada requisição para a detecção de N+1.
+    Sub-requisições (ex.: /api/batch) são analisadas separadamente.
+    """
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        rastreio = RastreioRequisicao(scope["method"])
+        token = rastreio_sql.set(rastreio)
+        inicio = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            rastreio_sql.reset(token)
+            rastreio.rota = nome_rota(scope)
+            analisar_requisicao(rastreio, time.perf_counter() - inicio)
+
+def configurar_log_consultas_lentas() -> None:
+    if slow_query_logger.handlers:
+        return
+    log_dir = "log"
+    os.makedirs(log_dir, exist_ok=True)
+    handler = TimedRotatingFileHandler(os.path.join(log_dir, "slow_queries.log"), when="midnight", interval=1, backupCount=7)
+    # Cada linha já é um JSON completo
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    slow_query_logger.addHandler(handler)
+    slow_query_logger.setLevel(logging.WARNING)
+
+def registrar_eventos_sql(engine: Engine) -> None:
+    """
+    Registra o consumidor dos eventos do engine que alimenta o rastreio por requisição.
+    """
+    registrar_consumidor(engine, _rastrear_consulta)
+
+def remover_eventos_sql(engine: Engine) -> None:
+    remover_consumidor(engine, _rastrear_consulta)
+
+def instrumentar_sql(app, engines: Sequence[Engine]) -> None:
+    """
+    Liga a instrumentação conforme SQL_INSTRUMENTATION (off, production, development).
+    """
+    if not INSTRUMENTACAO_ATIVA:
+        return
+
+    configurar_log_consultas_lentas()
+    for engine in engines:
+        registrar_eventos_sql(engine)
+    app.add_middleware(SqlTraceMiddleware)
+    logger.info(
+        f"Instrumentação SQL ativa ({SQL_INSTRUMENTATION}): lentas >= {SQL_SLOW_QUERY_MS} ms, "
+        f"N+1 >= {SQL_N_PLUS_ONE_THRESHOLD} repetições, EXPLAIN {'ligado' if SQL_EXPLAIN_SLOW else 'desligado'}"
+    )
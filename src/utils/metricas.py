@@ -0,0 +1,170 @@
+from starlette.requests import Request
+from starlette.responses import Response, PlainTextResponse
+from starlette.types import ASGIApp, Receive, Scope, Send, Message
+from contextvars import ContextVar
+from typing import Callable, Dict, Optional
+import logging
+import time
+import os
+
+from sqlalchemy.engine import Engine
+
+from src.utils.eventos_sql import registrar_consumidor
+
+# prometheus_client é opcional: sem a biblioteca, o middleware não mede nada e /metrics responde 503
+try:
+    import prometheus_client
+    from prometheus_client import Counter, Gauge, Histogram, CONTENT_TYPE_LATEST, generate_latest
+except ImportError:  # pragma: no cover - depende do ambiente
+    prometheus_client = None
+
+logger = logging.getLogger("metricas")
+
+METRICS_PATH = "/metrics"
+
+# Se definido, /metrics exige "Authorization: Bearer <METRICS_TOKEN>"
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+
+# Rótulo usado para requisições que não casaram com nenhuma rota (evita explosão de cardinalidade)
+ROTA_DESCONHECIDA = "unmatched"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 250)
+
+if prometheus_client is not None:
+    REQUEST_LATENCY = Histogram(
+        "portal_http_request_duration_seconds", "Latência das requisições HTTP por rota",
+        ["app", "method", "route"], buckets=LATENCY_BUCKETS
+    )
+    REQUESTS = Counter(
+        "portal_http_requests_total", "Requisições HTTP por rota e status",
+        ["app", "method", "route", "status"]
+    )
+    IN_PROGRESS = Gauge(
+        "portal_http_requests_in_progress", "Requisições HTTP em andamento",
+        ["app"]
+    )
+    RESPONSE_SIZE = Histogram(
+        "portal_http_response_size_bytes", "Tamanho do corpo das respostas HTTP",
+        ["app", "route"], buckets=SIZE_BUCKETS
+    )
+    DB_QUERIES = Histogram(
+        "portal_db_queries_per_request", "Consultas SQL executadas por requisição",
+        ["app", "route"], buckets=QUERY_COUNT_BUCKETS
+    )
+    DB_TIME = Histogram(
+        "portal_db_time_per_request_seconds", "Tempo gasto em consultas SQL por requisição",
+        ["app", "route"], buckets=LATENCY_BUCKETS
+    )
+
+class MetricasRequisicao:
+    """
+    Acumula as consultas SQL de uma requisição (preenchido pelos eventos do engine).
+    """
+    __slots__ = ("consultas", "tempo_db")
+
+    def __init__(self):
+        self.consultas = 0
+        self.tempo_db = 0.0
+
+# O objeto é mutável, então rotas e dependências síncronas (threadpool) também o atualizam
+metricas_requisicao: ContextVar[Optional[MetricasRequisicao]] = ContextVar("metricas_requisicao", default=None)
+
+def _contar_consulta(conn, cursor, statement, parameters, executemany, duracao):
+    metricas = metricas_requisicao.get()
+    if metricas is not None:
+        metricas.consultas += 1
+        metricas.tempo_db += duracao
+
+def instrumentar_engine(engine: Engine) -> None:
+    """
+    Registra os eventos que contam consultas e tempo de banco por requisição.
+    """
+    registrar_consumidor(engine, _contar_consulta)
+
+def nome_rota(scope: Scope) -> str:
+    # O roteador grava a rota encontrada no próprio scope; usar o template evita um rótulo por id
+    rota = scope.get("route")
+    return getattr(rota, "path", None) or ROTA_DESCONHECIDA
+
+class MetricsMiddleware:
+    """
+    Middleware ASGI que mede latência, requisições em andamento, tamanho da resposta
+    e consultas SQL por rota. É ASGI puro (sem BaseHTTPMiddleware) para manter o custo baixo.
+    """
+    def __init__(self, app: ASGIApp, app_name: str):
+        self.app = app
+        self.app_name = app_name
+        if prometheus_client is None:
+            logger.warning(f"prometheus_client não instalado, métricas de {app_name} desativadas")
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or prometheus_client is None or scope["path"] == METRICS_PATH:
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        tamanho = 0
+
+        async def send_medindo(message: Message) -> None:
+            nonlocal status_code, tamanho
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body":
+                tamanho += len(message.get("body", b""))
+            await send(message)
+
+        # Sub-requisições (ex.: /api/batch, backend em processo) somam suas consultas na requisição externa
+        pai = metricas_requisicao.get()
+        metricas = MetricasRequisicao()
+        token = metricas_requisicao.set(metricas)
+
+        in_progress = IN_PROGRESS.labels(self.app_name)
+        in_progress.inc()
+        inicio = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_medindo)
+        finally:
+            duracao = time.perf_counter() - inicio
+            in_progress.dec()
+            metricas_requisicao.reset(token)
+            if pai is not None:
+                pai.consultas += metricas.consultas
+                pai.tempo_db += metricas.tempo_db
+
+            rota = nome_rota(scope)
+            REQUEST_LATENCY.labels(self.app_name, scope["method"], rota).observe(duracao)
+            REQUESTS.labels(self.app_name, scope["method"], rota, str(status_code)).inc()
+            RESPONSE_SIZE.labels(self.app_name, rota).observe(tamanho)
+            DB_QUERIES.labels(self.app_name, rota).observe(metricas.consultas)
+            DB_TIME.labels(self.app_name, rota).observe(metricas.tempo_db)
+
+gauges_registrados: Dict[str, "Gauge"] = {}
+
+def registrar_gauges(prefixo: str, descricao: str, obter: Callable[[], Dict[str, float]]) -> None:
+    """
+    Expõe os valores numéricos de um dict de estatísticas já existente como gauges
+    (ex.: pool de hash de senha, pool de conexões com o backend), lidos a cada coleta.
+    """
+    if prometheus_client is None:
+        return
+    for chave, valor in obter().items():
+        if isinstance(valor, (int, float)) and not isinstance(valor, bool):
+            nome = f"{prefixo}_{chave}"
+            # Registrar de novo (ex.: módulo recarregado) só troca a função de leitura
+            if nome not in gauges_registrados:
+                gauges_registrados[nome] = Gauge(nome, f"{descricao}: {chave}")
+            gauges_registrados[nome].set_function(lambda chave=chave: obter()[chave])
+
+async def metrics_endpoint(request: Request) -> Response:
+    """
+    Exporta as métricas no formato texto do Prometheus.
+    """
+    if prometheus_client is None:
+        return PlainTextResponse("prometheus_client não instalado", status_code=503)
+
+    if METRICS_TOKEN and request.headers.get("authorization") != f"Bearer {METRICS_TOKEN}":
+        return PlainTextResponse("Não autorizado", status_code=401)
+
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
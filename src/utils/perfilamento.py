@@ -0,0 +1,236 @@
+from starlette.datastructures import MutableHeaders
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from contextvars import ContextVar
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+from urllib.parse import parse_qs
+import asyncio
+import logging
+import json
+import time
+import uuid
+import re
+import os
+
+from sqlalchemy.engine import Engine
+
+from models.UsuariosSchema import Usuario
+from database.Dependencias import SessionLocal
+from src.autenticacao.Login import COOKIE_NAME, decode_token
+from src.utils.instrumentacao_sql import RastreioRequisicao, rastreio_sql, registrar_eventos_sql, remover_eventos_sql
+
+# pyinstrument é opcional; sem ele o perfil fica desligado. Não há alternativa com o cProfile:
+# no event loop ele atribuiria ao perfil as outras requisições que rodam ao mesmo tempo,
+# e o async_mode do pyinstrument mede só a task da requisição perfilada
+try:
+    from pyinstrument import Profiler
+except ImportError:  # pragma: no cover - depende do ambiente
+    Profiler = None
+
+logger = logging.getLogger("perfilamento")
+
+# Um admin pede o perfil com o cabeçalho "X-Profile: 1" ou com "?__profile=1" na URL
+PROFILE_HEADER = b"x-profile"
+PROFILE_QUERY_PARAM = "__profile"
+# Valores que não pedem perfil, no cabeçalho ou na URL
+PERFIL_DESLIGADO = ("", "0")
+PROFILE_ID_HEADER = "X-Profile-Id"
+
+PROFILES_DIR = Path(os.getenv("PROFILES_DIR", "log/profiles"))
+PROFILES_MAX_STORED = int(os.getenv("PROFILES_MAX_STORED", "50"))
+
+PERFIL_ID_VALIDO = re.compile(r"^\d{20}-[0-9a-f]{8}$")
+
+# Um perfil por vez: o pyinstrument não admite dois profilers ativos na mesma thread
+lock_perfil = asyncio.Lock()
+
+# Sub-requisições (ex.: /api/batch) herdam o cabeçalho, mas já estão dentro do perfil da requisição externa
+perfil_ativo: ContextVar[bool] = ContextVar("perfil_ativo", default=False)
+
+def perfil_solicitado(scope: Scope) -> bool:
+    query_string = scope.get("query_string", b"")
+    # Teste barato antes de decodificar a query string (a maioria das requisições não tem o parâmetro)
+    if PROFILE_QUERY_PARAM.encode() in query_string:
+        valores = parse_qs(query_string.decode("latin-1"), keep_blank_values=True).get(PROFILE_QUERY_PARAM)
+        if valores and valores[-1] not in PERFIL_DESLIGADO:
+            return True
+    for nome, valor in scope["headers"]:
+        if nome == PROFILE_HEADER:
+            return valor.decode("latin-1") not in PERFIL_DESLIGADO
+    return False
+
+def admin_da_requisicao(scope: Scope) -> Optional[str]:
+    """
+    E-mail do usuário se a sessão for de um admin/superadmin ativo, senão None.
+    Só é chamado quando o perfil foi pedido.
+    """
+    token = Request(scope).cookies.get(COOKIE_NAME)
+    if not token:
+        return None
+    try:
+        email = decode_token(token).get("sub")
+    except Exception:
+        return None
+
+    db = SessionLocal()
+    try:
+        usuario = db.query(Usuario.email, Usuario.type_user, Usuario.active).filter(Usuario.email == email).first()
+    finally:
+        db.close()
+
+    if usuario and usuario.active and usuario.type_user in ["admin", "superadmin"]:
+        return usuario.email
+    return None
+
+def novo_perfil_id() -> str:
+    # Prefixo com data e hora: a ordem alfabética dos arquivos é a ordem cronológica
+    return f"{datetime.utcnow():%Y%m%d%H%M%S%f}-{uuid.uuid4().hex[:8]}"
+
+def _resumo_sql(rastreio: RastreioRequisicao) -> Dict[str, Any]:
+    return {
+        "consultas": len(rastreio.consultas),
+        "tempo_ms": round(sum(d for _, _, d in rastreio.consultas) * 1000, 2),
+        "itens": [
+            {"fingerprint": fingerprint, "sql": sql, "duracao_ms": round(d * 1000, 3)}
+            for fingerprint, sql, d in rastreio.consultas
+        ],
+    }
+
+def _remover_antigos() -> None:
+    metadados = sorted(PROFILES_DIR.glob("*.json"))
+    for arquivo in metadados[:-PROFILES_MAX_STORED] if PROFILES_MAX_STORED > 0 else metadados:
+        for relacionado in PROFILES_DIR.glob(f"{arquivo.stem}.*"):
+            relacionado.unlink(missing_ok=True)
+
+def _gravar_perfil(profiler, metadados: Dict[str, Any]) -> None:
+    """
+    Gera o HTML e o resumo do perfil e grava os arquivos (no threadpool, fora do event loop).
+    """
+    perfil_id = metadados["id"]
+    try:
+        PROFILES_DIR.mkdir(parents=True, exist_ok=True)
+        arquivo = PROFILES_DIR / f"{perfil_id}.html"
+        arquivo.write_text(profiler.output_html(), encoding="utf-8")
+        metadados["arquivo"] = arquivo.name
+        metadados["resumo"] = profiler.output_text(unicode=True, color=False)
+        (PROFILES_DIR / f"{perfil_id}.json").write_text(
+            json.dumps(metadados, ensure_ascii=False, default=str), encoding="utf-8"
+        )
+        _remover_antigos()
+        logger.info(
+            f"Perfil {perfil_id} gravado: {metadados['metodo']} {metadados['path']} "
+            f"({metadados['duracao_ms']} ms) por {metadados['usuario']}"
+        )
+    except Exception as e:
+        logger.error(f"Erro ao gravar perfil {perfil_id}: {str(e)}")
+
+class ProfilingMiddleware:
+    """
+    Executa sob um profiler as requisições de admins que pedirem (X-Profile ou ?__profile=1),
+    grava o perfil com os tempos de SQL e devolve o id no cabeçalho X-Profile-Id.
+    Requisições sem o pedido passam direto, sem profiler nem consulta extra.
+    """
+    def __init__(self, app: ASGIApp, engines: Sequence[Engine]):
+        self.app = app
+        self.engines = engines
+        if Profiler is None:
+            logger.warning("pyinstrument não instalado, perfil sob demanda desativado")
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or Profiler is None or not perfil_solicitado(scope) or perfil_ativo.get():
+            await self.app(scope, receive, send)
+            return
+
+        # Consulta síncrona ao banco: fora do event loop
+        usuario = await run_in_threadpool(admin_da_requisicao, scope)
+        if usuario is None:
+            # Pedido de perfil de quem não é admin é ignorado
+            await self.app(scope, receive, send)
+            return
+
+        async with lock_perfil:
+            await self._perfilar(scope, receive, send, usuario)
+
+    async def _perfilar(self, scope: Scope, receive: Receive, send: Send, usuario: str) -> None:
+        # Eventos SQL só enquanto o perfil roda: fora dele as consultas não pagam pelo rastreio
+        for engine in self.engines:
+            registrar_eventos_sql(engine)
+        perfil_id = novo_perfil_id()
+        status_code = 500
+
+        async def send_com_id(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                MutableHeaders(scope=message).append(PROFILE_ID_HEADER, perfil_id)
+            await send(message)
+
+        # Se a instrumentação SQL também estiver ativa, as consultas seguem para o rastreio dela
+        pai = rastreio_sql.get()
+        rastreio = RastreioRequisicao(scope["method"])
+        token = rastreio_sql.set(rastreio)
+        token_ativo = perfil_ativo.set(True)
+
+        profiler = Profiler(async_mode="enabled")
+        inicio = time.perf_counter()
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_com_id)
+        finally:
+            profiler.stop()
+            duracao = time.perf_counter() - inicio
+            rastreio_sql.reset(token)
+            perfil_ativo.reset(token_ativo)
+            for engine in self.engines:
+                remover_eventos_sql(engine)
+            if pai is not None:
+                pai.consultas.extend(rastreio.consultas)
+
+            metadados = {
+                "id": perfil_id,
+                "criado_em": datetime.utcnow().isoformat(timespec="seconds"),
+                "usuario": usuario,
+                "metodo": scope["method"],
+                "path": scope["path"],
+                "query": scope.get("query_string", b"").decode("latin-1"),
+                "status": status_code,
+                "duracao_ms": round(duracao * 1000, 2),
+                "profiler": "pyinstrument",
+                "sql": _resumo_sql(rastreio),
+            }
+            await run_in_threadpool(_gravar_perfil, profiler, metadados)
+
+def listar_perfis(limite: int = 50) -> List[Dict[str, Any]]:
+    """
+    Perfis mais recentes primeiro, sem o resumo do profiler e a lista de consultas.
+    """
+    perfis = []
+    for arquivo in sorted(PROFILES_DIR.glob("*.json"), reverse=True)[:limite]:
+        try:
+            metadados = json.loads(arquivo.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            continue
+        metadados.pop("resumo", None)
+        sql = metadados.pop("sql", {})
+        metadados["consultas_sql"] = sql.get("consultas", 0)
+        metadados["tempo_sql_ms"] = sql.get("tempo_ms", 0.0)
+        perfis.append(metadados)
+    return perfis
+
+def obter_perfil(perfil_id: str) -> Optional[Dict[str, Any]]:
+    if not PERFIL_ID_VALIDO.match(perfil_id):
+        return None
+    arquivo = PROFILES_DIR / f"{perfil_id}.json"
+    if not arquivo.exists():
+        return None
+    return json.loads(arquivo.read_text(encoding="utf-8"))
+
+def arquivo_perfil(perfil_id: str) -> Optional[Path]:
+    metadados = obter_perfil(perfil_id)
+    if metadados is None:
+        return None
+    caminho = PROFILES_DIR / metadados["arquivo"]
+    return caminho if caminho.exists() else None
@@ -0,0 +1,72 @@
+from starlette.datastructures import MutableHeaders
+from starlette.requests import Request
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+import logging
+import time
+
+from sqlalchemy import event
+
+from database.Engine import engine
+from database.Replicas import (
+    EstadoRoteamento, roteamento_requisicao, registrar_escrita, pool_replicas, metricas_replicas,
+    REPLICA_PIN_SECONDS, REPLICA_MAX_LAG_SECONDS
+)
+from src.utils.metricas import registrar_gauges
+
+logger = logging.getLogger("replicas")
+
+# Guarda até quando (epoch) as leituras do usuário ficam no primário. O valor carrega o prazo
+# porque o proxy do frontend regrava os cookies sem Max-Age
+REPLICA_PIN_COOKIE = "portal_db_primary"
+
+def prazo_fixacao(scope: Scope) -> float:
+    try:
+        return float(Request(scope).cookies.get(REPLICA_PIN_COOKIE, 0))
+    except ValueError:
+        return 0.0
+
+class ReplicaRoutingMiddleware:
+    """
+    Marca as requisições de quem escreveu no primário há menos de REPLICA_PIN_SECONDS
+    (get_read_db então usa o primário) e grava o cookie quando a requisição atual escreve.
+    """
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        estado = EstadoRoteamento(fixar_primario=prazo_fixacao(scope) > time.time())
+        token = roteamento_requisicao.set(estado)
+
+        async def send_com_fixacao(message: Message) -> None:
+            if message["type"] == "http.response.start" and estado.escreveu:
+                prazo = int(time.time()) + REPLICA_PIN_SECONDS
+                MutableHeaders(scope=message).append(
+                    "set-cookie",
+                    f"{REPLICA_PIN_COOKIE}={prazo}; Max-Age={REPLICA_PIN_SECONDS}; Path=/; HttpOnly; SameSite=Lax"
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_com_fixacao)
+        finally:
+            roteamento_requisicao.reset(token)
+
+def configurar_replicas(app) -> None:
+    """
+    Liga o roteamento de leituras quando há réplicas em EXTERNAL_URL_DB_REPLICAS.
+    """
+    if not pool_replicas.replicas:
+        return
+
+    if not event.contains(engine, "commit", registrar_escrita):
+        event.listen(engine, "commit", registrar_escrita)
+    app.add_middleware(ReplicaRoutingMiddleware)
+    registrar_gauges("portal_db_replicas", "Roteamento de leituras para réplicas", metricas_replicas)
+    logger.info(
+        f"Leituras roteadas para {len(pool_replicas.replicas)} réplica(s): lag máximo {REPLICA_MAX_LAG_SECONDS}s, "
+        f"primário fixado por {REPLICA_PIN_SECONDS}s após escrita"
+    )
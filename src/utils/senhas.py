@@ -0,0 +1,143 @@
+from fastapi import HTTPException, status
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+import asyncio
+import threading
+import logging
+import time
+import os
+
+from passlib.hash import bcrypt
+
+logger = logging.getLogger("senhas")
+
+# Custo do bcrypt; hashes com outro custo são refeitos no próximo login bem-sucedido
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+
+# Máximo de hashes simultâneos (cada um ocupa um núcleo por centenas de ms)
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+# Acima desta fila as requisições recebem 503 em vez de esperar indefinidamente
+PASSWORD_HASH_MAX_QUEUE = int(os.getenv("PASSWORD_HASH_MAX_QUEUE", "100"))
+
+# min/max_desired_rounds fazem o needs_update() acusar hashes com custo diferente do configurado
+hasher = bcrypt.using(
+    rounds=BCRYPT_ROUNDS,
+    min_desired_rounds=BCRYPT_ROUNDS,
+    max_desired_rounds=BCRYPT_ROUNDS
+)
+
+# O bcrypt libera o GIL durante o hash, então threads dão paralelismo real sem o custo de processos
+executor: Optional[ThreadPoolExecutor] = None
+lock = threading.Lock()
+
+estatisticas = {
+    "executando": 0,
+    "aguardando": 0,
+    "pico_aguardando": 0,
+    "concluidas": 0,
+    "rejeitadas": 0,
+    "rehashes": 0,
+    "tempo_total": 0.0,
+}
+
+def obter_executor() -> ThreadPoolExecutor:
+    global executor
+    if executor is None:
+        with lock:
+            if executor is None:
+                executor = ThreadPoolExecutor(
+                    max_workers=PASSWORD_HASH_WORKERS,
+                    thread_name_prefix="password-hash"
+                )
+    return executor
+
+def _executar(funcao: Callable, *args) -> Any:
+    with lock:
+        estatisticas["aguardando"] -= 1
+        estatisticas["executando"] += 1
+
+    inicio = time.perf_counter()
+    try:
+        return funcao(*args)
+    finally:
+        with lock:
+            estatisticas["executando"] -= 1
+            estatisticas["concluidas"] += 1
+            estatisticas["tempo_total"] += time.perf_counter() - inicio
+
+async def _no_pool(funcao: Callable, *args) -> Any:
+    """
+    Executa a função no pool de hash, fora do event loop.
+    Rejeita com 503 quando a fila já está cheia.
+    """
+    with lock:
+        if estatisticas["aguardando"] >= PASSWORD_HASH_MAX_QUEUE:
+            estatisticas["rejeitadas"] += 1
+            logger.warning(f"Fila de hash de senha cheia ({PASSWORD_HASH_MAX_QUEUE}), requisição rejeitada")
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Servidor ocupado. Tente novamente em instantes.",
+                headers={"Retry-After": "1"}
+            )
+        estatisticas["aguardando"] += 1
+        estatisticas["pico_aguardando"] = max(estatisticas["pico_aguardando"], estatisticas["aguardando"])
+
+    futuro = obter_executor().submit(_executar, funcao, *args)
+    # Cancelada ainda na fila (ex.: cliente desconectou), _executar nunca roda e não desconta a espera
+    futuro.add_done_callback(_descontar_se_cancelada)
+    return await asyncio.wrap_future(futuro)
+
+def _descontar_se_cancelada(futuro: Future) -> None:
+    if futuro.cancelled():
+        with lock:
+            estatisticas["aguardando"] -= 1
+
+async def gerar_hash_senha(senha: str) -> str:
+    """
+    Gera o hash bcrypt da senha com o custo configurado.
+    """
+    return await _no_pool(hasher.hash, senha)
+
+async def verificar_senha(senha: str, senha_hash: str) -> bool:
+    """
+    Verifica a senha contra o hash armazenado.
+    """
+    return await _no_pool(hasher.verify, senha, senha_hash)
+
+def _verificar_e_refazer(senha: str, senha_hash: str) -> Tuple[bool, Optional[str]]:
+    if not hasher.verify(senha, senha_hash):
+        return False, None
+    if hasher.needs_update(senha_hash):
+        return True, hasher.hash(senha)
+    return True, None
+
+async def verificar_senha_e_atualizar(senha: str, senha_hash: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verifica a senha e, se o hash foi gerado com outro custo, devolve um novo hash
+    com o custo atual (a senha em texto só está disponível neste momento).
+
+    Returns:
+        (senha confere, novo hash ou None se o atual continua válido)
+    """
+    valida, novo_hash = await _no_pool(_verificar_e_refazer, senha, senha_hash)
+    if novo_hash:
+        with lock:
+            estatisticas["rehashes"] += 1
+    return valida, novo_hash
+
+def metricas_hash_senha() -> Dict[str, Any]:
+    """
+    Estado do pool de hash de senha (profundidade da fila, execuções e tempos).
+    """
+    with lock:
+        dados = dict(estatisticas)
+
+    tempo_total = dados.pop("tempo_total")
+    dados["tempo_medio_ms"] = round(tempo_total / dados["concluidas"] * 1000, 2) if dados["concluidas"] else 0.0
+    dados.update({
+        "workers": PASSWORD_HASH_WORKERS,
+        "max_fila": PASSWORD_HASH_MAX_QUEUE,
+        "bcrypt_rounds": BCRYPT_ROUNDS,
+    })
+    return dados
@@ -0,0 +1,98 @@
+from fastapi import Request
+from fastapi.responses import JSONResponse
+from starlette.responses import Response
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional
+import logging
+import uuid
+
+import orjson
+
+# MessagePack é opcional: sem a biblioteca instalada, todas as respostas saem em JSON
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - depende do ambiente
+    msgpack = None
+
+logger = logging.getLogger("serializacao")
+
+MSGPACK_MEDIA_TYPES = ("application/msgpack", "application/x-msgpack")
+
+# orjson já serializa UUID, date e datetime nativamente; NON_STR_KEYS cobre dicts com chaves int
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+def _orjson_default(obj: Any) -> Any:
+    """
+    Converte tipos que o orjson não serializa nativamente.
+    """
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if hasattr(obj, "_asdict"):
+        return obj._asdict()
+    raise TypeError(f"Tipo não serializável: {type(obj).__name__}")
+
+def _msgpack_default(obj: Any) -> Any:
+    """
+    Converte tipos que o msgpack não serializa nativamente.
+    """
+    if isinstance(obj, uuid.UUID):
+        return str(obj)
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    return _orjson_default(obj)
+
+class ORJSONResponse(JSONResponse):
+    """
+    Resposta JSON serializada com orjson (UUID e datas sem conversão manual).
+    """
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=_orjson_default, option=ORJSON_OPTIONS)
+
+class MsgPackResponse(Response):
+    """
+    Resposta em MessagePack, usada quando o cliente pede via cabeçalho Accept.
+    """
+    media_type = "application/msgpack"
+
+    def render(self, content: Any) -> bytes:
+        return msgpack.packb(content, default=_msgpack_default, use_bin_type=True)
+
+def aceita_msgpack(request: Request) -> bool:
+    """
+    Verifica se o cliente aceita MessagePack e se a biblioteca está disponível.
+    """
+    if msgpack is None:
+        return False
+    accept = request.headers.get("accept", "")
+    return any(media_type in accept for media_type in MSGPACK_MEDIA_TYPES)
+
+def resposta_negociada(
+    request: Request,
+    conteudo: Any,
+    status_code: int = 200,
+    headers: Optional[Dict[str, str]] = None
+) -> Response:
+    """
+    Retorna o conteúdo em MessagePack ou JSON conforme o cabeçalho Accept.
+
+    Args:
+        request: Objeto de requisição
+        conteudo: Dados a serializar (dicts, listas, UUID, datas)
+        status_code: Código HTTP da resposta
+        headers: Cabeçalhos adicionais
+
+    Returns:
+        Response já renderizada
+    """
+    response_class = MsgPackResponse if aceita_msgpack(request) else ORJSONResponse
+    response = response_class(content=conteudo, status_code=status_code, headers=headers)
+    response.headers["Vary"] = "Accept"
+    return response
+
+def linhas_para_dicts(linhas: Iterable[Any]) -> List[Dict[str, Any]]:
+    """
+    Converte linhas de consultas com colunas selecionadas (query.with_entities)
+    em dicts, sem montar campo a campo nem converter UUID/datas.
+    """
+    return [linha._asdict() for linha in linhas]
@@ -0,0 +1,133 @@
+from fastapi import Request
+from starlette.responses import Response
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from datetime import datetime
+from typing import Iterable, Optional
+import hashlib
+import logging
+import os
+
+from models.UsuariosSchema import Usuario
+from models.VersoesDadosSchema import VersaoDados
+from database.Invalidacao import EMPRESA_DADOS, DIRETORIO_EMPRESAS, publicar
+from src.utils.cache import CacheTTL
+from src.utils.serializacao import aceita_msgpack
+
+logger = logging.getLogger("versao_dados")
+
+# Escopo do diretório de empresas (listagens e empresas por usuário)
+ESCOPO_EMPRESAS = "empresas"
+PREFIXO_ESCOPO_EMPRESA = "empresa:"
+
+def escopo_empresa(empresa_id) -> str:
+    """
+    Escopo dos dados de uma empresa (funcionários, exames, atestados).
+    """
+    return f"{PREFIXO_ESCOPO_EMPRESA}{empresa_id}"
+
+# Versões por escopo; incrementar_versao e os jobs de importação publicam os eventos.
+# EMPRESA_DADOS sem chave (importação de todas as empresas) limpa o cache inteiro
+CACHE_VERSION_TTL = float(os.getenv("CACHE_VERSION_TTL", "60"))
+cache_versoes = CacheTTL(
+    "versoes_dados",
+    ttl=CACHE_VERSION_TTL,
+    invalidado_por={
+        EMPRESA_DADOS: lambda chave: escopo_empresa(chave) if chave is not None else None,
+        DIRETORIO_EMPRESAS: lambda chave: ESCOPO_EMPRESAS,
+    },
+)
+
+def obter_versao(db: Session, escopo: str) -> int:
+    """
+    Obtém a versão atual de um escopo (0 se nunca foi incrementado).
+    """
+    def carregar():
+        # Sempre do primário: com a réplica atrasada o ETag antigo ficaria no cache até o TTL
+        versao = db.execute(
+            select(VersaoDados.versao).where(VersaoDados.escopo == escopo),
+            bind_arguments={"primario": True}
+        ).scalar()
+        return versao or 0
+
+    return cache_versoes.obter(escopo, carregar)
+
+def incrementar_versao(db: Session, escopos: Iterable[str]) -> None:
+    """
+    Incrementa a versão dos escopos informados na transação atual.
+    O commit fica a cargo de quem chama, junto com a escrita que invalidou os dados.
+    """
+    escopos = set(escopos)
+    if not escopos:
+        return
+
+    existentes = {
+        escopo for (escopo,) in db.query(VersaoDados.escopo).filter(VersaoDados.escopo.in_(escopos))
+    }
+    if existentes:
+        db.query(VersaoDados).filter(VersaoDados.escopo.in_(existentes)).update(
+            {VersaoDados.versao: VersaoDados.versao + 1, VersaoDados.dt_atualizacao: datetime.utcnow()},
+            synchronize_session=False
+        )
+    for escopo in escopos - existentes:
+        db.add(VersaoDados(escopo=escopo, versao=1))
+
+    # Os demais workers descartam a versão em cache quando esta transação fizer commit
+    empresas = [escopo[len(PREFIXO_ESCOPO_EMPRESA):] for escopo in escopos if escopo.startswith(PREFIXO_ESCOPO_EMPRESA)]
+    if empresas:
+        publicar(db, EMPRESA_DADOS, empresas)
+    if ESCOPO_EMPRESAS in escopos:
+        publicar(db, DIRETORIO_EMPRESAS)
+
+def calcular_etag(request: Request, db: Session, usuario: Usuario, escopo: str) -> str:
+    """
+    Calcula um ETag fraco a partir da versão do escopo, dos parâmetros da
+    consulta e do escopo do usuário (id, tipo e formato negociado).
+    """
+    versao = obter_versao(db, escopo)
+    parametros = "&".join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items()))
+    chave = "|".join([
+        escopo,
+        str(versao),
+        parametros,
+        str(usuario.id),
+        usuario.type_user or "",
+        "msgpack" if aceita_msgpack(request) else "json",
+    ])
+    return f'W/"{hashlib.sha1(chave.encode("utf-8")).hexdigest()[:32]}"'
+
+def _etag_confere(if_none_match: str, etag: str) -> bool:
+    # Comparação fraca: ignora o prefixo W/ dos dois lados
+    if if_none_match.strip() == "*":
+        return True
+    alvo = etag[2:] if etag.startswith("W/") else etag
+    for candidato in if_none_match.split(","):
+        candidato = candidato.strip()
+        if candidato.startswith("W/"):
+            candidato = candidato[2:]
+        if candidato == alvo:
+            return True
+    return False
+
+def resposta_nao_modificada(request: Request, etag: str) -> Optional[Response]:
+    """
+    Retorna uma resposta 304 se o cliente já possui a versão atual, ou None.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _etag_confere(if_none_match, etag):
+        return Response(status_code=304, headers=cabecalhos_cache(etag))
+    return None
+
+def cabecalhos_cache(etag: str) -> dict:
+    """
+    Cabeçalhos que obrigam o navegador a revalidar usando o ETag.
+    """
+    return {"ETag": etag, "Cache-Control": "private, no-cache", "Vary": "Accept, Cookie"}
+
+def aplicar_etag(response: Response, etag: str) -> Response:
+    """
+    Adiciona o ETag e os cabeçalhos de cache a uma resposta.
+    """
+    for nome, valor in cabecalhos_cache(etag).items():
+        response.headers[nome] = valor
+    return response